@@ -0,0 +1,98 @@
+import threading
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from .symbols import Symbol
+
+ARCHETYPE_KINDS = ("walker", "node", "object", "edge", "enum")
+
+
+class Archetype:
+    """An archetype symbol and its abilities by name."""
+
+    __slots__ = ("symbol", "abilities")
+
+    def __init__(self, symbol: "Symbol") -> None:
+        self.symbol = symbol
+        self.abilities: dict[str, "Symbol"] = {}
+        for child in symbol.children:
+            if child.sym_type == "ability" and not child.is_use:
+                self.abilities.setdefault(child.sym_name, child)
+
+
+def _walk_symbols(symbols: Iterable["Symbol"]) -> Iterable["Symbol"]:
+    """The symbols and their children, depth first."""
+    for symbol in symbols:
+        yield symbol
+        try:
+            children = list(symbol.children)
+        except Exception:
+            continue
+        yield from _walk_symbols(children)
+
+
+class ArchetypeIndex:
+    """
+    Archetypes declared in the workspace modules, keyed by module, kind and name.
+
+    Entries are replaced per module whenever it is rebuilt. Lookups take the
+    modules visible from a document, usually itself and its imports, in the
+    order they should be searched.
+    """
+
+    def __init__(self) -> None:
+        self.modules: dict[str, dict[str, dict[str, Archetype]]] = {}
+        # modules are rebuilt on compile threads while requests look them up
+        self._lock = threading.Lock()
+
+    def set_module(self, module: str, symbols: Iterable["Symbol"]) -> None:
+        """Index the archetypes among the symbols of a module, at any depth."""
+        kinds: dict[str, dict[str, Archetype]] = {}
+        for symbol in _walk_symbols(symbols):
+            try:
+                if symbol.sym_type not in ARCHETYPE_KINDS or symbol.is_use:
+                    continue
+                kinds.setdefault(symbol.sym_type, {}).setdefault(
+                    symbol.sym_name, Archetype(symbol)
+                )
+            except Exception:
+                continue
+        with self._lock:
+            self.modules[module] = kinds
+
+    def remove_module(self, module: str) -> None:
+        with self._lock:
+            self.modules.pop(module, None)
+
+    def get_archetypes(self, kind: str, modules: Iterable[str]) -> list[Archetype]:
+        """The archetypes of a kind declared in the given modules."""
+        with self._lock:
+            return [
+                archetype
+                for module in modules
+                for archetype in self.modules.get(module, {}).get(kind, {}).values()
+            ]
+
+    def get_archetype(
+        self, kind: str, name: str, modules: Iterable[str]
+    ) -> Optional[Archetype]:
+        """The first archetype of a kind and name found in the given modules."""
+        with self._lock:
+            for module in modules:
+                archetype = self.modules.get(module, {}).get(kind, {}).get(name)
+                if archetype is not None:
+                    return archetype
+        return None
+
+    def find_archetype(
+        self, name: str, modules: Iterable[str], kinds: Iterable[str] = ARCHETYPE_KINDS
+    ) -> Optional[Archetype]:
+        """The first archetype of a name and of one of the kinds, in module order."""
+        with self._lock:
+            for module in modules:
+                by_kind = self.modules.get(module, {})
+                for kind in kinds:
+                    archetype = by_kind.get(kind, {}).get(name)
+                    if archetype is not None:
+                        return archetype
+        return None
@@ -0,0 +1,296 @@
+import hashlib
+import os
+import pickle
+import sys
+from importlib import metadata
+from typing import Optional
+
+import jaclang.compiler.absyntree as ast
+from jaclang.compiler.symtable import SymbolTable
+from jaclang.compiler.workspace import ModuleInfo
+
+from .constants import ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_FORMAT
+
+# Jac ASTs are deeply nested, the default limit is not enough to pickle them.
+PICKLE_RECURSION_LIMIT = 20000
+
+
+def ensure_recursion_limit() -> None:
+    if sys.getrecursionlimit() < PICKLE_RECURSION_LIMIT:
+        sys.setrecursionlimit(PICKLE_RECURSION_LIMIT)
+
+
+def get_jaclang_version() -> str:
+    try:
+        return metadata.version("jaclang")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def hash_source(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def source_dependencies(ir) -> set[str]:
+    """Paths of the files annexed to a compiled module, e.g. its impl files."""
+    deps = set()
+    mods = list(getattr(ir, "mod_deps", {}).values()) if ir is not None else []
+    for mod in mods:
+        deps.add(mod.loc.mod_path)
+        annexed = list(getattr(mod, "impl_mod", []))
+        if getattr(mod, "test_mod", None):
+            annexed.append(mod.test_mod)
+        deps.update(i.loc.mod_path for i in annexed)
+    return deps
+
+
+def get_imported_modules(ir) -> dict[str, ast.Module]:
+    """The jac modules a compiled module imports, attached to its import paths."""
+    imported: dict[str, ast.Module] = {}
+    if ir is None:
+        return imported
+    stack = [ir]
+    while stack:
+        node = stack.pop()
+        sub_module = getattr(node, "sub_module", None)
+        if isinstance(node, ast.ModulePath) and isinstance(sub_module, ast.Module):
+            imported.setdefault(sub_module.loc.mod_path, sub_module)
+        stack.extend(i for i in node.kid if i is not sub_module)
+    return imported
+
+
+class ModuleIndex:
+    """
+    The nodes, symbol tables and symbols of a module tree in a stable order,
+    which is the same for a module compiled on its own and for the copy of it
+    attached to the modules importing it.
+    """
+
+    def __init__(self, ir: ast.Module) -> None:
+        self.nodes = list(self._iter_nodes(ir))
+        self.tables = list(self._iter_tables(ir.sym_tab)) if ir.sym_tab else []
+
+    @staticmethod
+    def _iter_nodes(ir: ast.Module):
+        seen, stack = set(), [ir]
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            yield node
+            stack.extend(reversed(node.kid))
+
+    @staticmethod
+    def _iter_tables(table: SymbolTable):
+        seen, stack = set(), [table]
+        while stack:
+            table = stack.pop()
+            if id(table) in seen:
+                continue
+            seen.add(id(table))
+            yield table
+            stack.extend(reversed(table.kid))
+
+    def refs(self) -> dict[int, tuple]:
+        """References to the objects of the module, by object id."""
+        refs: dict[int, tuple] = {}
+        for index, node in enumerate(self.nodes):
+            refs[id(node)] = ("node", index)
+        for index, table in enumerate(self.tables):
+            refs[id(table)] = ("table", index)
+            for name, symbol in table.tab.items():
+                refs.setdefault(id(symbol), ("symbol", index, name))
+        return refs
+
+    def resolve(self, ref: tuple):
+        if ref[0] == "node":
+            return self.nodes[ref[1]]
+        if ref[0] == "table":
+            return self.tables[ref[1]]
+        return self.tables[ref[1]].tab[ref[2]]
+
+
+class ModulePickler(pickle.Pickler):
+    """Pickles a module, replacing the imported modules by references to them."""
+
+    def __init__(self, file, refs: dict[int, tuple]) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.refs = refs
+
+    def persistent_id(self, obj):
+        return self.refs.get(id(obj))
+
+
+class ModuleUnpickler(pickle.Unpickler):
+    """Loads a module, linking it to the loaded modules it imports."""
+
+    def __init__(self, file, indexes: dict[str, ModuleIndex]) -> None:
+        super().__init__(file)
+        self.indexes = indexes
+
+    def persistent_load(self, pid):
+        return self.indexes[pid[0]].resolve(pid[1:])
+
+
+class AnalysisCache:
+    """
+    Persistent on-disk cache of per-module compile results.
+
+    Entries hold the compiled ModuleInfo (IR with its symbol tables and uses,
+    errors and warnings) of a single module. The modules it imports are stored
+    in entries of their own and only referenced, by their source hashes, so
+    every module is stored once however many modules import it. Loading an
+    entry loads the entries of its imports first and links them back into the
+    IR, a module is loaded once per session and shared by its importers.
+
+    An entry is keyed by the module source, the jaclang version and the type
+    check flag, and is only valid while the sources of its imports and
+    annexed files did not change.
+    """
+
+    def __init__(self, root_path: str, type_check: bool = False) -> None:
+        self.cache_dir = os.path.join(
+            os.getenv("LS_CACHE_DIR", ANALYSIS_CACHE_DIR),
+            hashlib.sha1(os.path.abspath(root_path).encode("utf-8")).hexdigest()[:16],
+        )
+        self.type_check = type_check
+        self.jaclang_version = get_jaclang_version()
+        self.hits = 0
+        self.misses = 0
+        self._file_hashes: dict[tuple, str] = {}
+        self._loaded: dict[str, ModuleInfo] = {}
+        self._indexes: dict[str, ModuleIndex] = {}
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def key(self, file_path: str, source: str) -> str:
+        return hash_source(
+            f"{ANALYSIS_CACHE_FORMAT}:{self.jaclang_version}:{self.type_check}:"
+            f"{file_path}:{source}"
+        )
+
+    def file_hash(self, file_path: str) -> Optional[str]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        stamp = (file_path, stat.st_mtime_ns, stat.st_size)
+        if stamp not in self._file_hashes:
+            with open(file_path, "r") as f:
+                self._file_hashes[stamp] = hash_source(f.read())
+        return self._file_hashes[stamp]
+
+    def load(self, file_path: str, source: str) -> Optional[ModuleInfo]:
+        """Return the cached ModuleInfo of a module, or None on a miss."""
+        module = self._load(file_path, source, set())
+        if module is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return module
+
+    def store(self, file_path: str, source: str, module: ModuleInfo) -> None:
+        """Store a module, and the modules it imports that are not stored yet."""
+        self._store(file_path, source, module, True)
+
+    def _load(
+        self, file_path: str, source: str, loading: set[str]
+    ) -> Optional[ModuleInfo]:
+        key = self.key(file_path, source)
+        if key in self._loaded:
+            return self._loaded[key]
+        entry_path = self._entry_path(key)
+        if file_path in loading or not os.path.isfile(entry_path):
+            return None  # not stored, or an import cycle
+        try:
+            ensure_recursion_limit()
+            with open(entry_path, "rb") as f:
+                entry = pickle.load(f)
+                if any(
+                    self.file_hash(dep) != dep_hash
+                    for dep, dep_hash in entry["deps"].items()
+                ):
+                    return None
+                indexes = {}
+                for path, source_hash in entry["modules"].items():
+                    imported = self._load_import(
+                        path, source_hash, loading | {file_path}
+                    )
+                    if imported is None:
+                        return None
+                    indexes[path] = imported
+                module = ModuleUnpickler(f, indexes).load()
+        except Exception:
+            return None
+        self._loaded[key] = module
+        return module
+
+    def _load_import(
+        self, file_path: str, source_hash: str, loading: set[str]
+    ) -> Optional[ModuleIndex]:
+        if self.file_hash(file_path) != source_hash:
+            return None
+        with open(file_path, "r") as f:
+            source = f.read()
+        module = self._load(file_path, source, loading)
+        if module is None:
+            return None
+        key = self.key(file_path, source)
+        if key not in self._indexes:
+            self._indexes[key] = ModuleIndex(module.ir)
+        return self._indexes[key]
+
+    def _store(
+        self, file_path: str, source: str, module: ModuleInfo, replace: bool
+    ) -> None:
+        entry_path = self._entry_path(self.key(file_path, source))
+        if not replace and os.path.isfile(entry_path):
+            return
+        refs: dict[int, tuple] = {}
+        modules = {}
+        for path, imported in get_imported_modules(module.ir).items():
+            index = ModuleIndex(imported)
+            if path == file_path or any(i is module.ir for i in index.nodes):
+                continue  # an import cycle, the module stays inline
+            imported_source = imported.source.code
+            self._store(
+                path,
+                imported_source,
+                ModuleInfo(
+                    ir=imported,
+                    errors=[i for i in module.errors if i.loc.mod_path == path],
+                    warnings=[i for i in module.warnings if i.loc.mod_path == path],
+                ),
+                False,
+            )
+            modules[path] = hash_source(imported_source)
+            for obj_id, ref in index.refs().items():
+                refs.setdefault(obj_id, (path, *ref))
+        deps = {
+            dep: self.file_hash(dep)
+            for dep in source_dependencies(module.ir)
+            if dep != file_path
+        }
+        entry = {"path": file_path, "deps": deps, "modules": modules}
+        self._write(entry_path, entry, module, refs)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def _write(
+        self, entry_path: str, entry: dict, module: ModuleInfo, refs: dict[int, tuple]
+    ) -> None:
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            ensure_recursion_limit()
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                ModulePickler(f, refs).dump(module)
+            os.replace(tmp_path, entry_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -1,20 +1,21 @@
+import os
 import re
-import inspect
-import importlib
+from functools import partial
 from typing import Optional
 
 from pygls.server import LanguageServer
 from lsprotocol.types import (
     CompletionParams,
     CompletionItem,
+    CompletionList,
     CompletionItemKind,
     InsertTextFormat,
     InlineCompletionParams,
 )
 
 from .constants import (
+    COMPLETION_LIMIT,
     JAC_KW,
-    PY_LIBS,
     SNIPPETS,
     WALKER_SNIPPET,
     NODE_SNIPPET,
@@ -23,13 +24,15 @@ from .constants import (
     ABILITY_SNIPPETS,
 )
 
-from .symbols import get_symbol_by_name
+from .symbols import Symbol, get_symbol_by_name
 from .utils import (
     get_relative_path,
     get_all_symbols,
     get_scope_at_pos,
-    get_cached_symbol_names,
+    get_completion_candidates,
+    get_visible_modules,
 )
+from .workspace_symbols import SymbolEntry
 
 
 SCOPE_SNIPPETS = {
@@ -68,10 +71,71 @@ def _get_completion_kind(sym_type: str) -> CompletionItemKind:
         "field": CompletionItemKind.Field,
         "method": CompletionItemKind.Method,
         "constructor": CompletionItemKind.Constructor,
+        "class": CompletionItemKind.Class,
+        "function": CompletionItemKind.Function,
+        "variable": CompletionItemKind.Variable,
     }
     return architype_map.get(sym_type, CompletionItemKind.Variable)
 
 
+def _get_symbol_completion_item(entry: SymbolEntry, doc_path: str) -> CompletionItem:
+    """
+    Returns the completion item of an indexed symbol name.
+
+    Args:
+        entry (SymbolEntry): The indexed symbol.
+        doc_path (str): The path of the document being completed.
+
+    Returns:
+        CompletionItem: The completion item, detailed with the module it comes from.
+    """
+    try:
+        kind = _get_completion_kind(entry.symbol.sym_type)
+    except Exception:
+        kind = CompletionItemKind.Variable
+    return CompletionItem(
+        label=entry.name,
+        kind=kind,
+        detail=os.path.basename(entry.module) if entry.module != doc_path else None,
+        insert_text=entry.name,
+    )
+
+
+def _get_deferred_symbol_item(
+    ls: LanguageServer, symbol: Symbol, label: str, insert_text: str
+) -> CompletionItem:
+    """
+    Returns the completion item of a symbol, its documentation and detail are
+    only looked up once the item is resolved.
+
+    Args:
+        ls (LanguageServer): The language server instance.
+        symbol (Symbol): The completed symbol.
+        label (str): The label of the item.
+        insert_text (str): The text inserted by the item.
+
+    Returns:
+        CompletionItem: The completion item, with the data key to resolve it.
+    """
+    return ls.completion_resolver.defer(
+        CompletionItem(
+            label=label,
+            kind=_get_completion_kind(symbol.sym_type),
+            insert_text=insert_text,
+        ),
+        documentation=partial(getattr, symbol, "sym_doc"),
+        detail=partial(_get_symbol_detail, symbol),
+    )
+
+
+def _get_symbol_detail(symbol: Symbol) -> str:
+    return f"({symbol.sym_type}) {symbol.sym_name}"
+
+
+def _get_module_doc(mod_info) -> str:
+    return mod_info.ir.doc.value if mod_info.ir.doc else ""
+
+
 def get_completion_items(
     ls: LanguageServer, params: Optional[CompletionParams | InlineCompletionParams]
 ) -> list[CompletionItem]:
@@ -85,8 +149,28 @@ def get_completion_items(
     Returns:
         list: A list of completion items.
     """
+    return get_completion_list(ls, params).items
+
+
+def get_completion_list(
+    ls: LanguageServer, params: Optional[CompletionParams | InlineCompletionParams]
+) -> CompletionList:
+    """
+    Returns the completion list based on the text document and cursor position.
+
+    Identifier completions are limited to COMPLETION_LIMIT names, the list is
+    marked incomplete when more names match so the client asks again as the
+    user keeps typing.
+
+    Args:
+        ls (LanguageServer): The language server instance.
+        params (Optional[CompletionParams]): The completion parameters.
+
+    Returns:
+        CompletionList: The completion items and whether the list is incomplete.
+    """
     doc = ls.workspace.get_text_document(params.text_document.uri)
-    line = doc.source.splitlines()[params.position.line]
+    line = doc.line(params.position.line)
     before_cursor = line[: params.position.character]
     last_word = before_cursor.split()[-1] if len(before_cursor.split()) else ""
 
@@ -94,37 +178,36 @@ def get_completion_items(
         ls, doc, params.position, get_all_symbols(ls, doc, False, True)
     )
 
+    ls.completion_resolver.reset()
     completion_items = []
+    is_incomplete = False
 
     """
     eg- {node}. {walker}. {object}.
     """
     if before_cursor.endswith("."):
         last_symbol_name = re.match(r"(\w+).", last_word).group(1)
-        last_symbol = get_symbol_by_name(last_symbol_name, get_all_symbols(ls, doc))
+        last_symbol = get_symbol_by_name(ls, doc, last_symbol_name)
         if last_symbol:
             for child in last_symbol.instance_symbols:
                 completion_items.append(
-                    CompletionItem(
-                        label=child.sym_name,
-                        kind=_get_completion_kind(child.sym_type),
-                        documentation=child.sym_doc,
-                        insert_text=child.sym_name,
-                    )
+                    _get_deferred_symbol_item(ls, child, child.sym_name, child.sym_name)
                 )
 
     if before_cursor.endswith(":"):
+        modules = get_visible_modules(ls, doc)
         if before_cursor == ":":
             completion_items += [
-                CompletionItem(
-                    label=f"{symbol.sym_name} ({symbol.sym_type})",
-                    kind=_get_completion_kind(symbol.sym_type),
-                    documentation=symbol.sym_doc,
-                    insert_text=f"{symbol.sym_type}:{symbol.sym_name}",
+                _get_deferred_symbol_item(
+                    ls,
+                    symbol,
+                    f"{symbol.sym_name} ({symbol.sym_type})",
+                    f"{symbol.sym_type}:{symbol.sym_name}",
+                )
+                for kind in ("walker", "node")
+                for symbol in (
+                    i.symbol for i in ls.archetype_index.get_archetypes(kind, modules)
                 )
-                for symbol in get_all_symbols(ls, doc)
-                if symbol.sym_type == "walker" or symbol.sym_type == "node"
-                if not symbol.is_use
             ]
             completion_items += [
                 CompletionItem(
@@ -145,14 +228,16 @@ def get_completion_items(
         if match:
             sym_type = match.group(1)
             completion_items += [
-                CompletionItem(
-                    label=f"{symbol.sym_name} ({symbol.sym_type})",
-                    kind=_get_completion_kind(symbol.sym_type),
-                    documentation=symbol.sym_doc,
-                    insert_text=symbol.sym_name,
+                _get_deferred_symbol_item(
+                    ls,
+                    symbol,
+                    f"{symbol.sym_name} ({symbol.sym_type})",
+                    symbol.sym_name,
+                )
+                for symbol in (
+                    i.symbol
+                    for i in ls.archetype_index.get_archetypes(sym_type, modules)
                 )
-                for symbol in get_all_symbols(ls, doc)
-                if symbol.sym_type == sym_type and not symbol.is_use
             ]
         """
         eg- :walker:GuessGame:, :node:turn:
@@ -161,17 +246,13 @@ def get_completion_items(
         if match:
             sym_type = match.group(1)
             sym_name = match.group(2)
-            symbol = get_symbol_by_name(sym_name, get_all_symbols(ls, doc), sym_type)
-            if symbol:
+            archetype = ls.archetype_index.get_archetype(sym_type, sym_name, modules)
+            if archetype:
                 completion_items += [
-                    CompletionItem(
-                        label=child.sym_name,
-                        kind=_get_completion_kind(child.sym_type),
-                        documentation=child.sym_doc,
-                        insert_text=f"ability:{child.sym_name}",
+                    _get_deferred_symbol_item(
+                        ls, child, child.sym_name, f"ability:{child.sym_name}"
                     )
-                    for child in symbol.children
-                    if child.sym_type == "ability" and not child.is_use
+                    for child in archetype.abilities.values()
                 ]
         """
         eg- :walker:GuessGame:ability:
@@ -180,17 +261,11 @@ def get_completion_items(
         if match:
             sym_type = match.group(1)
             sym_name = match.group(2)
-            symbol = get_symbol_by_name(sym_name, get_all_symbols(ls, doc), sym_type)
-            if symbol:
+            archetype = ls.archetype_index.get_archetype(sym_type, sym_name, modules)
+            if archetype:
                 completion_items += [
-                    CompletionItem(
-                        label=child.sym_name,
-                        kind=_get_completion_kind(child.sym_type),
-                        documentation=child.sym_doc,
-                        insert_text=child.sym_name,
-                    )
-                    for child in symbol.children
-                    if child.sym_type == "ability" and not child.is_use
+                    _get_deferred_symbol_item(ls, child, child.sym_name, child.sym_name)
+                    for child in archetype.abilities.values()
                 ]
 
     # Snippets at the start of the line
@@ -233,28 +308,36 @@ def get_completion_items(
     3. import:py from {py_libs}, {classes_and_functions_in_py_lib}
     """
     if before_cursor in ["import:py from ", "import:py "]:
-        completion_items += [
-            CompletionItem(
-                label=py_lib,
-                kind=CompletionItemKind.Module,
-                insert_text=py_lib,
-                documentation="",
-            )
-            for py_lib in PY_LIBS
-        ]
+        py_libs = ls.py_libs.get(wait=0)
+        if py_libs is None:
+            is_incomplete = True  # still listing the modules, the client asks again
+        else:
+            completion_items += [
+                CompletionItem(
+                    label=py_lib,
+                    kind=CompletionItemKind.Module,
+                    insert_text=py_lib,
+                    documentation="",
+                )
+                for py_lib in py_libs
+            ]
     py_import_match = re.match(r"import:py from (\w+),", before_cursor)
     if py_import_match:
         py_module = py_import_match.group(1)
-        completion_items += [
-            CompletionItem(
-                label=name,
-                kind=CompletionItemKind.Function
-                if inspect.isfunction(obj)
-                else CompletionItemKind.Class,
-                documentation=obj.__doc__,
-            )
-            for name, obj in inspect.getmembers(importlib.import_module(py_module))
-        ]
+        # completions run on the event loop, they never wait for an import
+        members = ls.py_introspector.get_members(py_module, wait=0)
+        if members is None:
+            is_incomplete = True  # still importing, the client asks again
+        else:
+            completion_items += [
+                ls.completion_resolver.defer(
+                    CompletionItem(
+                        label=member.name, kind=_get_completion_kind(member.kind)
+                    ),
+                    documentation=partial(getattr, member, "doc"),
+                )
+                for member in members
+            ]
     if last_word == "include:jac":
         for mod, mod_info in ls.jlws.modules.items():
             rel_path = get_relative_path(doc.uri.replace("file://", ""), mod).replace(
@@ -266,11 +349,11 @@ def get_completion_items(
                 else rel_path.replace("/", ".")
             )
             completion_items.append(
-                CompletionItem(
-                    label=text,
-                    kind=CompletionItemKind.File,
-                    insert_text=text,
-                    documentation=mod_info.ir.doc.value if mod_info.ir.doc else "",
+                ls.completion_resolver.defer(
+                    CompletionItem(
+                        label=text, kind=CompletionItemKind.File, insert_text=text
+                    ),
+                    documentation=partial(_get_module_doc, mod_info),
                 )
             )
 
@@ -364,16 +447,32 @@ def get_completion_items(
         ]
 
     # inside a jac scope
+    """
+    names visible in the document first, then the names declared anywhere in
+    the workspace, matched by prefix or word starts ignoring case
+    """
     if re.match(r"^[a-zA-Z0-9_]*$", last_word):
-        all_symbol_names = get_cached_symbol_names(ls, doc)
-        completion_items += [
-            CompletionItem(
-                label=name,
-                kind=CompletionItemKind.Variable,
-                insert_text=name,
+        doc_path = doc.uri.replace("file://", "")
+        local, local_incomplete = get_completion_candidates(ls, doc).search(
+            last_word, COMPLETION_LIMIT
+        )
+        workspace, workspace_incomplete = ls.symbol_index.prefix_index.search(
+            last_word, COMPLETION_LIMIT
+        )
+        is_incomplete = local_incomplete or workspace_incomplete
+        names = set()
+        for entry in local + workspace:
+            if entry.name in names or not entry.name.isidentifier():
+                continue
+            if len(names) == COMPLETION_LIMIT:
+                is_incomplete = True
+                break
+            names.add(entry.name)
+            completion_items.append(
+                ls.completion_resolver.defer(
+                    _get_symbol_completion_item(entry, doc_path),
+                    documentation=partial(getattr, entry.symbol, "sym_doc"),
+                )
             )
-            for name in all_symbol_names
-            if name.startswith(last_word)
-        ]
 
-    return completion_items
+    return CompletionList(is_incomplete=is_incomplete, items=completion_items)
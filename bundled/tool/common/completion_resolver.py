@@ -0,0 +1,52 @@
+import threading
+from typing import Callable, Optional
+
+from lsprotocol.types import CompletionItem
+
+
+class CompletionResolver:
+    """
+    Documentation and details of the items of the last completion list, looked
+    up on `completionItem/resolve` for the item the client highlights.
+
+    Deferred items carry a data key pointing to their lookups, which are
+    dropped when the next completion list is computed.
+    """
+
+    def __init__(self) -> None:
+        self._list = 0
+        self._lookups: dict[int, tuple[Callable, Optional[Callable]]] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._list += 1
+            self._lookups = {}
+
+    def defer(
+        self,
+        item: CompletionItem,
+        documentation: Callable[[], Optional[str]],
+        detail: Optional[Callable[[], Optional[str]]] = None,
+    ) -> CompletionItem:
+        with self._lock:
+            key = len(self._lookups)
+            self._lookups[key] = (documentation, detail)
+            item.data = {"list": self._list, "item": key}
+        return item
+
+    def resolve(self, item: CompletionItem) -> CompletionItem:
+        data = item.data if isinstance(item.data, dict) else {}
+        with self._lock:
+            lookups = (
+                self._lookups.get(data.get("item"))
+                if data.get("list") == self._list
+                else None
+            )
+        if lookups is None:
+            return item
+        documentation, detail = lookups
+        item.documentation = documentation() or None
+        if detail is not None:
+            item.detail = detail()
+        return item
@@ -1,6 +1,5 @@
 import os
 import threading
-import pkgutil
 
 SERVER_CWD = os.getcwd()
 CWD_LOCK = threading.Lock()
@@ -9,6 +8,37 @@ SEE_HREF_PREFIX = "See LINK"
 SEE_PREFIX_LEN = len("See ")
 NOTE_CODE = "note"
 LINE_OFFSET = CHAR_OFFSET = 1
+ANALYSIS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "jac-analyzer")
+ANALYSIS_CACHE_FORMAT = 2
+
+# did_change validation delays (seconds), scaled from each document's compile time
+DEBOUNCE_DELAY = 2
+DEBOUNCE_MIN_DELAY = 0.25
+DEBOUNCE_MAX_DELAY = 5
+DEBOUNCE_COMPILE_FACTOR = 1.5
+
+# isolated compiler processes are replaced after this many jobs or once their peak
+# RSS exceeds the cap, and are killed when a job runs longer than the timeout. The
+# address space limit (virtual memory, which thread stacks and mapped libraries
+# count against) only stops runaway jobs, it is well above the RSS cap.
+WORKER_MAX_JOBS = 50
+WORKER_MAX_RSS_MB = 2048
+WORKER_MAX_ADDRESS_SPACE_MB = 16384
+WORKER_JOB_TIMEOUT = 120
+# the workspace is only compiled in worker processes when this many modules miss
+# the analysis cache
+PARALLEL_MIN_MODULES = 8
+
+# flattened symbol lists kept in memory, least recently used ones are evicted first
+SYMBOL_CACHE_SIZE = 64
+
+# identifier completions returned at once, the list is marked incomplete beyond it
+COMPLETION_LIMIT = 200
+
+# python module introspection for import:py completions, run in a subprocess
+INTROSPECTION_TIMEOUT = 30
+# how long a completion waits for an introspection before returning without it
+INTROSPECTION_WAIT = 2
 
 SEMANTIC_TOKEN_TYPES = [
     "type",  # 0
@@ -246,5 +276,3 @@ JAC_KW = {
         "positions": ["inside"],
     },
 }
-
-PY_LIBS = [name for _, name, _ in pkgutil.iter_modules() if "_" not in name]
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+
+class CompileExecutor:
+    """
+    Thread pool running the compile jobs of the server off the event loop.
+
+    Jobs only hand their results back to the event loop once they are complete,
+    requests keep being served from the last completed results meanwhile. The
+    pool records how long jobs waited in the queue and how long they ran.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+        self.max_run_time = 0.0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="jac")
+
+    def submit(self, fn: Callable, *args) -> Future:
+        self.submitted += 1
+        return self._executor.submit(self._run, time.perf_counter(), fn, args)
+
+    async def run(self, fn: Callable, *args):
+        """Run fn(*args) in the pool and wait for it on the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def resize(self, max_workers: int) -> None:
+        """Use a pool of another size, jobs already queued still complete."""
+        if max_workers == self.max_workers:
+            return
+        old, self.max_workers = self._executor, max_workers
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="jac")
+        old.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def pending(self) -> int:
+        return self.submitted - self.completed - self.failed
+
+    @property
+    def stats(self) -> dict:
+        done = self.completed + self.failed
+        return {
+            "workers": self.max_workers,
+            "submitted": self.submitted,
+            "pending": self.pending,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.wait_time * 1000 / done, 1) if done else 0,
+            "avg_run_ms": round(self.run_time * 1000 / done, 1) if done else 0,
+            "max_run_ms": round(self.max_run_time * 1000, 1),
+        }
+
+    def _run(self, queued: float, fn: Callable, args: tuple):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = fn(*args)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.wait_time += start - queued
+                self.run_time += elapsed
+                self.max_run_time = max(self.max_run_time, elapsed)
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
@@ -0,0 +1,61 @@
+from typing import Iterable
+
+
+class ImportGraph:
+    """
+    Bidirectional import graph of the workspace modules, keyed by file path.
+
+    Edges are replaced per module whenever its imports are recomputed, so both
+    "what does X import" and "who imports X" are dictionary lookups.
+    """
+
+    def __init__(self) -> None:
+        self.imports: dict[str, set[str]] = {}
+        self.importers: dict[str, set[str]] = {}
+
+    def set_imports(self, module: str, deps: Iterable[str]) -> None:
+        deps = set(deps)
+        for dep in self.imports.get(module, set()) - deps:
+            self._discard_importer(dep, module)
+        for dep in deps:
+            self.importers.setdefault(dep, set()).add(module)
+        self.imports[module] = deps
+
+    def remove_module(self, module: str) -> None:
+        """
+        Drop the imports of a module. Edges pointing to it are kept, its
+        importers still import it and should see it again if it is recreated.
+        """
+        for dep in self.imports.pop(module, set()):
+            self._discard_importer(dep, module)
+
+    def get_imports(self, module: str) -> set[str]:
+        return set(self.imports.get(module, ()))
+
+    def get_importers(self, module: str) -> set[str]:
+        return set(self.importers.get(module, ()))
+
+    def get_dependents(self, modules: Iterable[str]) -> set[str]:
+        """Modules importing any of the given ones, directly or transitively."""
+        return self._walk(modules, self.importers)
+
+    def get_dependencies(self, modules: Iterable[str]) -> set[str]:
+        """Modules imported by any of the given ones, directly or transitively."""
+        return self._walk(modules, self.imports)
+
+    def _walk(self, modules: Iterable[str], edges: dict[str, set[str]]) -> set[str]:
+        seen: set[str] = set()
+        stack = list(modules)
+        while stack:
+            for nxt in edges.get(stack.pop(), ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def _discard_importer(self, dep: str, module: str) -> None:
+        importers = self.importers.get(dep)
+        if importers is not None:
+            importers.discard(module)
+            if not importers:
+                del self.importers[dep]
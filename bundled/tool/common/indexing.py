@@ -0,0 +1,89 @@
+import asyncio
+import os
+import uuid
+
+from pygls.server import LanguageServer
+from lsprotocol.types import (
+    WorkDoneProgressBegin,
+    WorkDoneProgressEnd,
+    WorkDoneProgressReport,
+)
+
+from .logging import log_error, log_to_output
+from .symbols import build_module_in_executor, get_built_modules, sync_documents
+
+
+def is_lazy_indexing(ls: LanguageServer) -> bool:
+    return ls.settings.get("indexingMode", "eager") == "lazy"
+
+
+def is_indexed(ls: LanguageServer, file_path: str) -> bool:
+    mod_info = ls.jlws.modules.get(file_path)
+    return mod_info is not None and mod_info.ir is not None
+
+
+async def index_document(ls: LanguageServer, doc_uri: str) -> None:
+    """
+    Build a module and everything it imports ahead of the rest of the workspace.
+    """
+    file_path = doc_uri.replace("file://", "")
+    if is_indexed(ls, file_path) or not os.path.isfile(file_path):
+        return
+    await index_module(ls, file_path)
+
+
+async def index_module(ls: LanguageServer, file_path: str) -> None:
+    """
+    Compile a module in the compile executor, then install it and make it and
+    the modules it imported documents on the event loop.
+    """
+    built = get_built_modules(ls)
+    await build_module_in_executor(ls, file_path)
+    sync_documents(ls, sorted(get_built_modules(ls) - built))
+
+
+def start_background_indexing(ls: LanguageServer) -> None:
+    if ls.indexing_task is None:
+        ls.indexing_task = asyncio.ensure_future(index_workspace(ls))
+
+
+async def index_workspace(ls: LanguageServer) -> None:
+    """
+    Build the modules that are not indexed yet, reporting work done progress.
+
+    Modules are compiled in the compile executor so requests keep being served
+    from whatever is already indexed; modules are installed and documents are
+    updated on the event loop.
+    """
+    pending = [i for i in ls.jlws.file_list() if not is_indexed(ls, i)]
+    token = str(uuid.uuid4())
+    try:
+        await ls.progress.create_async(token)
+        ls.progress.begin(
+            token,
+            WorkDoneProgressBegin(
+                title="Indexing Jac workspace", percentage=0, cancellable=False
+            ),
+        )
+    except Exception:
+        token = None  # client does not support server initiated progress
+
+    for count, file_path in enumerate(pending, start=1):
+        if not is_indexed(ls, file_path):
+            try:
+                await index_module(ls, file_path)
+            except Exception as e:
+                log_error(ls, f"Error indexing {file_path}: {e}")
+        if token:
+            ls.progress.report(
+                token,
+                WorkDoneProgressReport(
+                    message=f"{count}/{len(pending)} {os.path.basename(file_path)}",
+                    percentage=int(count * 100 / len(pending)),
+                ),
+            )
+
+    if token:
+        ls.progress.end(token, WorkDoneProgressEnd(message="Done"))
+    ls.workspace_filled = True
+    log_to_output(ls, f"Indexed {len(pending)} modules in the background")
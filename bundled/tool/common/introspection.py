@@ -0,0 +1,356 @@
+"""
+Python module introspection for `import:py` completions.
+
+Modules are imported in a `python -m common.introspection <module>` process
+of the selected interpreter that prints their members as JSON, so slow imports
+and their side effects stay out of the server. Results are cached in memory
+and on disk, keyed by the interpreter, the module file and its modification
+time, as that interpreter finds them.
+
+The names of the importable modules are listed in the background and cached
+on disk, keyed by the interpreter and the state of its `sys.path`.
+"""
+
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import pkgutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import NamedTuple, Optional
+
+from .constants import ANALYSIS_CACHE_DIR, INTROSPECTION_TIMEOUT, INTROSPECTION_WAIT
+
+# docstrings are cut to this many characters, completions only show their start
+MAX_DOC_LENGTH = 2000
+
+
+class ModuleMember(NamedTuple):
+    name: str
+    kind: str  # "class", "function", "module" or "variable"
+    doc: Optional[str]
+
+
+def describe_module(name: str) -> list[ModuleMember]:
+    """Import a module and describe its members."""
+    module = importlib.import_module(name)
+    members = []
+    for member_name in dir(module):
+        try:
+            obj = getattr(module, member_name)
+        except Exception:
+            continue
+        if inspect.isclass(obj):
+            kind = "class"
+        elif inspect.ismodule(obj):
+            kind = "module"
+        elif callable(obj):
+            kind = "function"
+        else:
+            kind = "variable"
+        try:
+            doc = inspect.getdoc(obj) if kind != "variable" else None
+        except Exception:
+            doc = None
+        members.append(ModuleMember(member_name, kind, doc and doc[:MAX_DOC_LENGTH]))
+    return members
+
+
+def locate_module(name: str) -> Optional[list]:
+    """
+    The file of a module and its modification time, as this interpreter finds
+    it, or None if it cannot be found.
+    """
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None:
+        return None
+    if not spec.has_location:
+        # builtin and frozen modules change with the interpreter
+        return [f"{spec.origin}:{sys.version}", 0]
+    try:
+        return [spec.origin, os.stat(spec.origin).st_mtime_ns]
+    except OSError:
+        return [spec.origin, 0]
+
+
+def list_modules() -> list[str]:
+    """Names of the top level modules importable from sys.path."""
+    return [name for _, name, _ in pkgutil.iter_modules() if "_" not in name]
+
+
+# lists the modules of another interpreter, which may not see this package
+LIST_MODULES_SCRIPT = """
+import json, pkgutil, sys
+modules = [name for _, name, _ in pkgutil.iter_modules() if "_" not in name]
+json.dump({"sys_path": sys.path, "modules": modules}, sys.stdout)
+"""
+
+
+def sys_path_fingerprint(interpreter: str, sys_path: list[str]) -> str:
+    """Changes when a path is added or removed, or a package is (un)installed."""
+    stamps = [interpreter]
+    for path in sys_path:
+        try:
+            stamps.append(f"{path}:{os.stat(path or '.').st_mtime_ns}")
+        except OSError:
+            stamps.append(f"{path}:-")
+    return hashlib.sha1("\n".join(stamps).encode("utf-8")).hexdigest()
+
+
+def _get_cache_dir() -> str:
+    return os.path.join(os.getenv("LS_CACHE_DIR", ANALYSIS_CACHE_DIR), "python-modules")
+
+
+def _write_json(entry_path: str, data) -> None:
+    tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, entry_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _introspect_main() -> None:
+    results = sys.stdout
+    # anything the module prints while importing must not corrupt the results
+    sys.stdout = sys.stderr
+    if sys.argv[1] == "--locate":
+        json.dump(locate_module(sys.argv[2]), results)
+        return
+    try:
+        members = describe_module(sys.argv[1])
+    except Exception as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(1)
+    json.dump([list(i) for i in members], results)
+
+
+def _run_tool(python: str, *args: str) -> subprocess.CompletedProcess:
+    """
+    Run `python -m common.introspection *args`, with this package importable.
+
+    The interpreter running the server gets the paths of the server, as the
+    lookups made in this process. Another interpreter only gets this package
+    on top of its own paths: the paths of the server hold the standard library
+    and the packages of another python, which it must not import.
+    """
+    tool_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = [tool_dir]
+    if python == sys.executable:
+        paths += [i for i in sys.path if i]
+    elif os.environ.get("PYTHONPATH"):
+        paths.append(os.environ["PYTHONPATH"])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+    return subprocess.run(
+        [python, "-m", "common.introspection", *args],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        env=env,
+        timeout=INTROSPECTION_TIMEOUT,
+    )
+
+
+class ModuleIntrospector:
+    """
+    Members of python modules, described in a process of the selected
+    interpreter.
+
+    A module is introspected once per interpreter and version of its file, the
+    result is kept in memory for the session and stored on disk (under
+    LS_CACHE_DIR or ~/.cache/jac-analyzer) for the next sessions. Locating the
+    module, reading the disk cache and introspecting all run in the background.
+    """
+
+    def __init__(
+        self, python: str = sys.executable, cache_dir: Optional[str] = None
+    ) -> None:
+        self.python = python
+        self.cache_dir = cache_dir or _get_cache_dir()
+        self.hits = 0
+        self.misses = 0
+        self._members: dict[str, list[ModuleMember]] = {}
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(2, thread_name_prefix="jac-introspect")
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "modules": len(self._members)}
+
+    def key(self, name: str) -> Optional[str]:
+        """
+        The cache key of a module, or None if the interpreter cannot find it.
+        Another interpreter than the server's is asked in a subprocess.
+        """
+        if self.python == sys.executable:
+            location = locate_module(name)
+        else:
+            try:
+                location = json.loads(_run_tool(self.python, "--locate", name).stdout)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                location = None
+        if not location:
+            return None
+        origin, mtime = location
+        return hashlib.sha1(
+            f"{self.python}:{name}:{origin}:{mtime}".encode("utf-8")
+        ).hexdigest()
+
+    def get_members(
+        self, name: str, wait: float = INTROSPECTION_WAIT
+    ) -> Optional[list[ModuleMember]]:
+        """
+        The members of a module, waiting at most `wait` seconds for it to be
+        introspected. None if it is still being introspected after that, a
+        `wait` of 0 never blocks.
+        """
+        with self._lock:
+            members = self._members.get(name)
+            if members is not None:
+                self.hits += 1
+                return members
+            future = self._pending.get(name)
+            if future is None:
+                future = self._executor.submit(self._load, name)
+                self._pending[name] = future
+        try:
+            return future.result(wait)
+        except TimeoutError:
+            return None
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self, name: str) -> list[ModuleMember]:
+        key = self.key(name)
+        members = self._read(key) if key is not None else []
+        missed = members is None
+        if missed:
+            members = self._introspect(name, key)
+        with self._lock:
+            if key is not None and missed:
+                self.misses += 1
+            elif key is not None:
+                self.hits += 1
+            self._members[name] = members
+            self._pending.pop(name, None)
+        return members
+
+    def _introspect(self, name: str, key: str) -> list[ModuleMember]:
+        try:
+            result = _run_tool(self.python, name)
+            if result.returncode == 0:
+                members = [ModuleMember(*i) for i in json.loads(result.stdout)]
+                self._write(key, members)
+                return members
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            pass  # not cached on disk, retried in the next session
+        return []
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[list[ModuleMember]]:
+        try:
+            with open(self._entry_path(key), "r") as f:
+                return [ModuleMember(*i) for i in json.load(f)]
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write(self, key: str, members: list[ModuleMember]) -> None:
+        _write_json(self._entry_path(key), [list(i) for i in members])
+
+
+class PythonLibraries:
+    """
+    Names of the modules importable by an interpreter, for `import:py` completions.
+
+    The list is computed in the background when an interpreter is selected:
+    in this process for the interpreter running the server, in a subprocess
+    for another one. It is stored on disk with the interpreter's sys.path and
+    reused while the fingerprint of those paths stays the same.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None) -> None:
+        self.cache_dir = cache_dir or _get_cache_dir()
+        self.interpreter: Optional[str] = None
+        self._future: Optional[Future] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="jac-py-libs")
+
+    def start(self, interpreter: str = sys.executable) -> None:
+        """List the modules of an interpreter, unless it is already selected."""
+        with self._lock:
+            if interpreter == self.interpreter and self._future is not None:
+                return
+            self.interpreter = interpreter
+            self._future = self._executor.submit(self._load, interpreter)
+
+    def get(self, wait: float = INTROSPECTION_WAIT) -> Optional[list[str]]:
+        """
+        The module names, waiting at most `wait` seconds for them to be listed.
+        None if they are still being listed after that, a `wait` of 0 never
+        blocks.
+        """
+        if self._future is None:
+            self.start()
+        try:
+            return self._future.result(wait)
+        except TimeoutError:
+            return None
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self, interpreter: str) -> list[str]:
+        entry_path = os.path.join(
+            self.cache_dir,
+            f"libs-{hashlib.sha1(interpreter.encode('utf-8')).hexdigest()}.json",
+        )
+        in_process = interpreter == sys.executable
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+            sys_path = list(sys.path) if in_process else entry["sys_path"]
+            if entry["fingerprint"] == sys_path_fingerprint(interpreter, sys_path):
+                return entry["modules"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        if in_process:
+            sys_path, modules = list(sys.path), list_modules()
+        else:
+            try:
+                result = subprocess.run(
+                    [interpreter, "-c", LIST_MODULES_SCRIPT],
+                    stdin=subprocess.DEVNULL,
+                    capture_output=True,
+                    timeout=INTROSPECTION_TIMEOUT,
+                )
+                listed = json.loads(result.stdout)
+                sys_path, modules = listed["sys_path"], listed["modules"]
+            except (OSError, ValueError, KeyError, subprocess.TimeoutExpired):
+                return list_modules()  # not a usable interpreter
+        entry = {
+            "interpreter": interpreter,
+            "sys_path": sys_path,
+            "fingerprint": sys_path_fingerprint(interpreter, sys_path),
+            "modules": modules,
+        }
+        _write_json(entry_path, entry)
+        return modules
+
+
+if __name__ == "__main__":
+    _introspect_main()
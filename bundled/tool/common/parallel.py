@@ -0,0 +1,87 @@
+"""
+Helpers to compile the jac workspace in compiler worker processes.
+
+The functions run inside the workers (see `common.workers`) must stay
+importable without the language server.
+"""
+
+from typing import NamedTuple
+
+import jaclang.compiler.absyntree as ast
+from jaclang.compiler.parser import JacParser
+from jaclang.compiler.passes.main import SubNodeTabPass
+from jaclang.compiler.passes.transform import Alert
+from jaclang.compiler.workspace import ModuleInfo, Workspace
+
+
+def scan_imports(file_path: str, source: str) -> list[str]:
+    """Parse a module and return the path strings of its jac imports."""
+    prse = JacParser(ast.JacSource(source, file_path))
+    if not isinstance(prse.ir, ast.Module):
+        return []
+    prse = SubNodeTabPass(input_ir=prse.ir, prior=prse)
+    return [
+        i.path_str
+        for i in prse.ir.get_all_sub_nodes(ast.ModulePath)
+        if i.parent_of_type(ast.Import).hint.tag.value == "jac"
+    ]
+
+
+def compile_source(file_path: str, source: str, type_check: bool) -> ModuleInfo:
+    """Compile a module exactly like Workspace.rebuild_file does."""
+    jlws = Workspace(path="", lazy_parse=True, type_check=type_check)
+    jlws.lazy_parse = False
+    jlws.rebuild_file(file_path, False, source)
+    return jlws.modules[file_path]
+
+
+class AlertLoc(NamedTuple):
+    """The part of a code location diagnostics need, without the tokens."""
+
+    first_line: int
+    col_start: int
+    last_line: int
+    col_end: int
+
+
+def parse_source(file_path: str, source: str) -> tuple[list[Alert], list[Alert]]:
+    """
+    Parse a module and return its syntax errors and warnings, detached from
+    the syntax tree so they are cheap to send back from a worker.
+    """
+    prse = JacParser(ast.JacSource(source, file_path))
+    return (
+        [Alert(i.msg, _detach_loc(i.loc)) for i in prse.errors_had],
+        [Alert(i.msg, _detach_loc(i.loc)) for i in prse.warnings_had],
+    )
+
+
+def _detach_loc(loc) -> AlertLoc:
+    return AlertLoc(loc.first_line, loc.col_start, loc.last_line, loc.col_end)
+
+
+def import_waves(files: list[str], imports: dict[str, set[str]]) -> list[list[str]]:
+    """
+    Group modules by their level in the import graph, leaves first.
+
+    The first wave holds the modules importing none of the other modules, the
+    next one the modules importing only modules of the first wave and so on,
+    so every module is built after the modules it imports. When every
+    remaining module is part of an import cycle the first one (in file order)
+    is picked to break it. Order within a wave follows `files`.
+    """
+    remaining = list(files)
+    pending = set(files)
+    waves = []
+    while remaining:
+        wave = [
+            mod
+            for mod in remaining
+            if not any(dep in pending and dep != mod for dep in imports.get(mod, ()))
+        ]
+        if not wave:
+            wave = remaining[:1]
+        waves.append(wave)
+        pending.difference_update(wave)
+        remaining = [mod for mod in remaining if mod in pending]
+    return waves
@@ -0,0 +1,40 @@
+from bisect import bisect_right
+from typing import Iterable, Optional
+
+from lsprotocol.types import Position
+
+
+class PositionIndex:
+    """
+    Sorted intervals of symbol ranges, answering "symbol at (line, character)".
+
+    Entries are ((start line, start character, end line, end character), item)
+    pairs. Ranges are bucketed by line and sorted by their start character, so
+    a lookup is a dictionary access and a bisection. When ranges overlap the
+    item that came first wins, like a linear scan.
+    """
+
+    def __init__(self, entries: Iterable[tuple[tuple[int, int, int, int], object]]):
+        lines: dict[int, list[tuple[int, int, int, object]]] = {}
+        for order, (sym_range, item) in enumerate(entries):
+            start_line, start_char, end_line, end_char = sym_range
+            for line in range(start_line, end_line + 1):
+                lines.setdefault(line, []).append((start_char, end_char, order, item))
+        self._lines = {}
+        for line, entries in lines.items():
+            entries.sort(key=lambda i: (i[0], i[2]))
+            self._lines[line] = ([i[0] for i in entries], entries)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for _, entries in self._lines.values())
+
+    def find(self, pos: Position) -> Optional[object]:
+        bucket = self._lines.get(pos.line)
+        if bucket is None:
+            return None
+        starts, entries = bucket
+        best = None
+        for start, end, order, sym in entries[: bisect_right(starts, pos.character)]:
+            if end >= pos.character and (best is None or order < best[0]):
+                best = (order, sym)
+        return best[1] if best else None
@@ -0,0 +1,82 @@
+import asyncio
+import os
+from typing import Optional
+
+from lsprotocol.types import (
+    PROGRESS,
+    Location,
+    ProgressParams,
+    ProgressToken,
+    WorkDoneProgressBegin,
+    WorkDoneProgressEnd,
+    WorkDoneProgressReport,
+)
+from pygls.server import LanguageServer
+
+from .symbols import Symbol
+
+
+def is_progress_cancelled(ls: LanguageServer, token: Optional[ProgressToken]) -> bool:
+    future = ls.progress.tokens.get(token) if token is not None else None
+    return future is not None and future.cancelled()
+
+
+async def find_references(
+    ls: LanguageServer,
+    symbol: Symbol,
+    partial_result_token: Optional[ProgressToken] = None,
+    work_done_token: Optional[ProgressToken] = None,
+) -> list[Location]:
+    """
+    Locations of the uses of a symbol, found one module at a time.
+
+    With a partial result token the locations of each module are sent to the
+    client as soon as they are found and the returned list is empty. Between
+    modules the event loop can cancel the request, a cancelled work done
+    progress stops the search with the locations found so far.
+    """
+    try:
+        modules = ls.use_index.get_uses_by_module(symbol.ws_symbol)
+    except Exception:
+        return []
+    if work_done_token is not None:
+        ls.progress.begin(
+            work_done_token,
+            WorkDoneProgressBegin(
+                title="Finding references", percentage=0, cancellable=True
+            ),
+        )
+    locations = []
+    try:
+        for count, (module, nodes) in enumerate(modules, start=1):
+            if is_progress_cancelled(ls, work_done_token):
+                break
+            uri = f"file://{module}"
+            found = []
+            for node in nodes:
+                try:
+                    found.append(Symbol(node, uri, is_use=symbol).location)
+                except Exception:
+                    continue
+            if partial_result_token is not None:
+                if found:
+                    ls.send_notification(
+                        PROGRESS,
+                        ProgressParams(token=partial_result_token, value=found),
+                    )
+            else:
+                locations.extend(found)
+            if work_done_token is not None:
+                ls.progress.report(
+                    work_done_token,
+                    WorkDoneProgressReport(
+                        message=os.path.basename(module),
+                        percentage=int(count * 100 / len(modules)),
+                    ),
+                )
+            await asyncio.sleep(0)  # lets a $/cancelRequest cancel the search
+    finally:
+        if work_done_token is not None:
+            ls.progress.end(work_done_token, WorkDoneProgressEnd())
+            ls.progress.tokens.pop(work_done_token, None)
+    return locations
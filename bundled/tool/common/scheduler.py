@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+from .constants import (
+    DEBOUNCE_COMPILE_FACTOR,
+    DEBOUNCE_DELAY,
+    DEBOUNCE_MAX_DELAY,
+    DEBOUNCE_MIN_DELAY,
+)
+
+
+class DebounceScheduler:
+    """
+    Debounces work per document on the server event loop.
+
+    A new call for a uri only replaces the pending call of that same uri. The
+    delay of each document follows its measured compile time, so cheap files
+    are validated quickly while expensive ones wait for typing to settle.
+    """
+
+    def __init__(
+        self,
+        delay: float = DEBOUNCE_DELAY,
+        min_delay: float = DEBOUNCE_MIN_DELAY,
+        max_delay: float = DEBOUNCE_MAX_DELAY,
+        factor: float = DEBOUNCE_COMPILE_FACTOR,
+    ) -> None:
+        self.delay = delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.compile_times: dict[str, float] = {}
+        self._handles: dict[str, asyncio.TimerHandle] = {}
+
+    def schedule(
+        self, uri: str, fn: Callable, *args, delay: Optional[float] = None
+    ) -> None:
+        """Schedule fn(*args), `delay` overrides the adaptive delay of the uri."""
+        self.cancel(uri)
+        loop = asyncio.get_running_loop()
+        self._handles[uri] = loop.call_later(
+            self.get_delay(uri) if delay is None else delay, self._run, uri, fn, args
+        )
+
+    def cancel(self, uri: str) -> None:
+        handle = self._handles.pop(uri, None)
+        if handle is not None:
+            handle.cancel()
+
+    def is_pending(self, uri: str) -> bool:
+        return uri in self._handles
+
+    def get_delay(self, uri: str) -> float:
+        if uri not in self.compile_times:
+            return self.delay
+        return min(
+            self.max_delay,
+            max(self.min_delay, self.compile_times[uri] * self.factor),
+        )
+
+    def record(self, uri: str, seconds: float) -> None:
+        """Record how long handling a document took (exponential moving average)."""
+        prev = self.compile_times.get(uri)
+        self.compile_times[uri] = (
+            seconds if prev is None else 0.7 * prev + 0.3 * seconds
+        )
+
+    def _run(self, uri: str, fn: Callable, args: tuple) -> None:
+        self._handles.pop(uri, None)
+        start = time.perf_counter()
+        result = None
+        try:
+            result = fn(*args)
+        finally:
+            if asyncio.iscoroutine(result):
+                # coroutines are timed until they complete
+                asyncio.ensure_future(result).add_done_callback(
+                    lambda _: self.record(uri, time.perf_counter() - start)
+                )
+            else:
+                self.record(uri, time.perf_counter() - start)
@@ -0,0 +1,118 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import sub
+from typing import Iterable, Sequence
+
+from lsprotocol.types import (
+    Range,
+    SemanticTokens,
+    SemanticTokensDelta,
+    SemanticTokensEdit,
+    TextDocumentItem,
+)
+from pygls.server import LanguageServer
+
+from .utils import get_snapshot
+
+TOKEN_FIELDS = 5
+
+
+def get_semantic_tokens(ls: LanguageServer, doc: TextDocumentItem) -> SemanticTokens:
+    """
+    The semantic tokens of a document, encoded once per snapshot. The result is
+    remembered on the document as the base of the next delta request.
+    """
+    snapshot = get_snapshot(ls, doc)
+    if snapshot.encoded_tokens is None:
+        snapshot.encoded_tokens = encode_tokens(snapshot.tokens)
+    doc.semantic_tokens_result = (snapshot.result_id, snapshot.encoded_tokens)
+    return SemanticTokens(data=snapshot.encoded_tokens, result_id=snapshot.result_id)
+
+
+def get_semantic_tokens_delta(
+    ls: LanguageServer, doc: TextDocumentItem, previous_result_id: str
+) -> SemanticTokens | SemanticTokensDelta:
+    """
+    Edits turning the previously sent tokens into the current ones, or all the
+    tokens if the previous result is not known anymore.
+    """
+    previous = getattr(doc, "semantic_tokens_result", None)
+    tokens = get_semantic_tokens(ls, doc)
+    if previous is None or previous[0] != previous_result_id:
+        return tokens
+    return SemanticTokensDelta(
+        edits=diff_tokens(previous[1], tokens.data), result_id=tokens.result_id
+    )
+
+
+def get_semantic_tokens_range(
+    ls: LanguageServer, doc: TextDocumentItem, range: Range
+) -> SemanticTokens:
+    """The semantic tokens starting on the lines of a range."""
+    tokens = get_snapshot(ls, doc).sorted_tokens
+    lines = [i[0] for i in tokens]
+    visible = tokens[
+        bisect_left(lines, range.start.line) : bisect_right(lines, range.end.line)
+    ]
+    return SemanticTokens(data=encode_tokens(visible))
+
+
+def encode_tokens(tokens: Iterable[Sequence[int]]) -> list[int]:
+    """
+    Relative encoding of absolute (line, start, length, type, modifiers) tokens.
+
+    Same output as `flatten_chunks(sort_chunks_relative_to_previous(tokens))`,
+    negative values included: tokens are packed in a flat array of signed
+    64-bit integers, ordered by (line, start) and their line and start columns
+    are delta-encoded one column after the other.
+    """
+    packed = array("q")
+    for token in tokens:
+        packed.extend(token)
+    count = len(packed) // TOKEN_FIELDS
+    if count == 0:
+        return []
+    lines, starts = packed[0::TOKEN_FIELDS], packed[1::TOKEN_FIELDS]
+    # a stable sort on one key per token, ties keep their original order; the
+    # key orders by (line, start) for any start column in [-2**32, 2**32)
+    keys = [(line << 33) + start for line, start in zip(lines, starts)]
+    order = sorted(range(count), key=keys.__getitem__)
+
+    encoded = array("q", bytes(packed.itemsize * len(packed)))
+    for field in range(2, TOKEN_FIELDS):
+        column = packed[field::TOKEN_FIELDS]
+        encoded[field::TOKEN_FIELDS] = array("q", map(column.__getitem__, order))
+    lines = array("q", map(lines.__getitem__, order))
+    starts = array("q", map(starts.__getitem__, order))
+    line_deltas = array("q", lines[:1])
+    line_deltas.extend(map(sub, lines[1:], lines))
+    start_deltas = array("q", starts[:1])
+    start_deltas.extend(
+        map(
+            lambda delta, start, prev: start if delta else start - prev,
+            line_deltas[1:],
+            starts[1:],
+            starts,
+        )
+    )
+    encoded[0::TOKEN_FIELDS] = line_deltas
+    encoded[1::TOKEN_FIELDS] = start_deltas
+    return encoded.tolist()
+
+
+def diff_tokens(old: list[int], new: list[int]) -> list[SemanticTokensEdit]:
+    """A single edit replacing what differs between two token arrays, if anything."""
+    start, max_start = 0, min(len(old), len(new))
+    while start < max_start and old[start] == new[start]:
+        start += 1
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    if old_end == start and new_end == start:
+        return []
+    return [
+        SemanticTokensEdit(
+            start=start, delete_count=old_end - start, data=new[start:new_end]
+        )
+    ]
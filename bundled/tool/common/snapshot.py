@@ -0,0 +1,165 @@
+import itertools
+import threading
+from functools import cached_property
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from lsprotocol.types import (
+    DocumentSymbol,
+    Location,
+    Position,
+    Range,
+    SymbolInformation,
+    SymbolKind,
+)
+
+from .positions import PositionIndex
+from .symbols import OFFSET, Symbol
+
+_result_ids = itertools.count(1)
+
+
+class SymbolRecord(NamedTuple):
+    """
+    Immutable, precomputed view of a Symbol, built once per document rebuild.
+
+    Ranges are (start line, start character, end line, end character) tuples
+    and the token is the absolute semantic token of the symbol name.
+    """
+
+    symbol: Symbol
+    name: str
+    sym_type: str
+    kind: SymbolKind
+    range: tuple[int, int, int, int]
+    token: tuple[int, int, int, int, int]
+    doc_uri: str
+    origin_uri: str
+
+    @classmethod
+    def from_symbol(cls, symbol: Symbol) -> "SymbolRecord":
+        loc = symbol.node.sym_name_node.loc
+        sym_type = symbol.sym_type
+        name = symbol.sym_name
+        sym_range = (
+            loc.first_line - OFFSET,
+            loc.col_start - OFFSET,
+            loc.last_line - OFFSET,
+            loc.col_end - OFFSET,
+        )
+        return cls(
+            symbol,
+            name,
+            sym_type,
+            Symbol._get_symbol_kind(sym_type),
+            sym_range,
+            (
+                sym_range[0],
+                sym_range[1],
+                len(name),
+                Symbol._get_token_type(sym_type),
+                Symbol._get_token_modifier(sym_type),
+            ),
+            symbol.doc_uri,
+            symbol.node_origin_file,
+        )
+
+    def __repr__(self) -> str:
+        return f"SymbolRecord({self.sym_type} {self.name} at {self.range})"
+
+    @property
+    def location(self) -> Location:
+        start_line, start_char, end_line, end_char = self.range
+        return Location(
+            uri=self.doc_uri,
+            range=Range(
+                start=Position(line=start_line, character=start_char),
+                end=Position(line=end_line, character=end_char),
+            ),
+        )
+
+
+class DocumentSnapshot:
+    """
+    Everything the request handlers read about a document, materialized from
+    its symbols after each rebuild: in the compile executor once the rebuild
+    is installed (see `build`), or by the first request that needs it.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        source: tuple,
+        symbols: list[Symbol],
+        all_symbols: Callable[[], Iterable[Symbol]],
+    ) -> None:
+        # what the snapshot was built from, to tell when it is outdated
+        self.uri = uri
+        self.source = source
+        self._symbols = symbols
+        self._all_symbols = all_symbols
+        # identifies the semantic tokens of this snapshot for delta requests
+        self.result_id = str(next(_result_ids))
+        # encoded semantic tokens, filled on the first semantic tokens request
+        self.encoded_tokens: Optional[list[int]] = None
+        self._records: Optional[tuple[SymbolRecord, ...]] = None
+        self._lock = threading.Lock()
+
+    def is_current(self, source: tuple) -> bool:
+        return len(source) == len(self.source) and all(
+            i is j for i, j in zip(source, self.source)
+        )
+
+    def build(self) -> "DocumentSnapshot":
+        """Materialize what requests read, e.g. in the compile executor."""
+        self.records, self.tokens, self.positions
+        return self
+
+    @property
+    def records(self) -> tuple[SymbolRecord, ...]:
+        """
+        Records of every symbol and use located in the document, once per
+        location and kind: the flattened symbols repeat uses.
+        """
+        # a request waits for a build already running in the compile executor
+        with self._lock:
+            if self._records is None:
+                self._records = self._build_records()
+                self._all_symbols = None
+        return self._records
+
+    def _build_records(self) -> tuple[SymbolRecord, ...]:
+        records = {}
+        for sym in self._all_symbols():
+            if sym.doc_uri != self.uri:
+                continue
+            try:
+                record = SymbolRecord.from_symbol(sym)
+            except Exception:
+                continue
+            records.setdefault((record.doc_uri, record.range, record.kind), record)
+        return tuple(records.values())
+
+    @cached_property
+    def tokens(self) -> tuple[tuple[int, int, int, int, int], ...]:
+        """Absolute semantic tokens of the symbols originating from the document."""
+        return tuple(r.token for r in self.records if r.origin_uri == self.uri)
+
+    @cached_property
+    def sorted_tokens(self) -> list[list[int]]:
+        """The tokens ordered by position, for range requests."""
+        return sorted((list(i) for i in self.tokens), key=lambda i: (i[0], i[1]))
+
+    @cached_property
+    def positions(self) -> PositionIndex:
+        return PositionIndex((r.range, r) for r in self.records)
+
+    @cached_property
+    def outline(self) -> list[DocumentSymbol]:
+        return [s.doc_sym for s in self._symbols if not s.do_skip]
+
+    @cached_property
+    def symbol_infos(self) -> list[SymbolInformation]:
+        return [s.sym_info for s in self._symbols]
+
+    def symbol_at(self, pos: Position) -> Optional[SymbolRecord]:
+        return self.positions.find(pos)
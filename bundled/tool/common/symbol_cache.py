@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from .constants import SYMBOL_CACHE_SIZE
+
+
+class SymbolCache:
+    """
+    Least recently used cache of what is derived from the symbols of documents,
+    like their flattened symbol lists or completion candidates.
+
+    Entries are keyed by document uri and by what was flattened, and hold the
+    version they were built from: a (document version, *symbol lists) tuple.
+    An entry built from another version is rebuilt, and
+    `invalidate` drops every entry of a document once it or one of its
+    dependencies is rebuilt.
+    """
+
+    def __init__(self, max_entries: int = SYMBOL_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[tuple, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, uri: str, key: Hashable, version: tuple, build: Callable):
+        """The cached value of (uri, key) for a version, built on a miss."""
+        entry_key = (uri, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and _same_version(entry[0], version):
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._entries[entry_key] = (version, value)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, uri: str) -> None:
+        with self._lock:
+            for entry_key in [i for i in self._entries if i[0] == uri]:
+                del self._entries[entry_key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+
+def _same_version(a: tuple, b: tuple) -> bool:
+    # symbol lists are compared by identity, they are replaced on every rebuild
+    return (
+        len(a) == len(b) and a[0] == b[0] and all(i is j for i, j in zip(a[1:], b[1:]))
+    )
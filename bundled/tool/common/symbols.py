@@ -1,6 +1,7 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from pygls.server import LanguageServer
 from lsprotocol.types import (
@@ -13,7 +14,7 @@ from lsprotocol.types import (
     DocumentSymbol,
 )
 
-from jaclang.compiler.workspace import Workspace
+from jaclang.compiler.workspace import Workspace, ModuleInfo
 from jaclang.compiler.absyntree import (
     AstNode,
     Ability,
@@ -33,59 +34,355 @@ from jaclang.compiler.absyntree import (
     InForStmt,
     ModuleCode,
     AstImplOnlyNode,
+    Import,
 )
 from jaclang.compiler.symtable import SymbolTable, Symbol as JSymbol
 
+from .archetypes import ARCHETYPE_KINDS
+from .cache import AnalysisCache
+from .constants import PARALLEL_MIN_MODULES
+from .parallel import compile_source, import_waves, scan_imports
+from .uses import index_module_uses
+from .validation import is_stale, is_tiered_validation
+from .workers import WorkerPool
+
 OFFSET = 1
 
 
 def fill_workspace(ls: LanguageServer) -> None:
-    ls.jlws = Workspace(
-        path=ls.workspace.root_path, type_check=ls.settings.get("typeCheck", False)
-    )
+    build_workspace(ls)
+    sync_workspace(ls)
+
+
+def build_workspace(ls: LanguageServer) -> None:
+    """
+    Discover and compile the jac workspace. Only the jac workspace is written
+    to, so the build can run off the event loop.
+    """
+    discover_workspace(ls)
+    workers = ls.settings.get("compileWorkers", 0)
+    if workers > 1:
+        build_modules_parallel(ls, ls.jlws.file_list(), workers)
+    else:
+        for mod_path in ls.jlws.file_list():
+            if ls.jlws.modules[mod_path].ir is None:
+                build_module(ls, mod_path)
+
+
+def sync_workspace(ls: LanguageServer) -> None:
+    """
+    Make the modules of a built workspace documents and index them. Documents
+    the client opened while the workspace was built keep their text.
+    """
     for mod_path, mod_info in ls.jlws.modules.items():
-        doc = TextDocumentItem(
-            uri=f"file://{mod_path}",
-            language_id="jac",
-            version=0,
-            text=mod_info.ir.source.code,
-        )
-        ls.workspace.put_document(doc)
-        update_doc_tree(ls, doc.uri)
+        uri = f"file://{mod_path}"
+        if uri not in ls.workspace.documents:
+            ls.workspace.put_document(
+                TextDocumentItem(
+                    uri=uri,
+                    language_id="jac",
+                    version=0,
+                    text=mod_info.ir.source.code,
+                )
+            )
+        update_doc_tree(ls, uri)
     for doc in ls.workspace.documents.values():
         update_doc_deps(ls, doc.uri)
     ls.workspace_filled = True
 
 
-def update_doc_tree(ls: LanguageServer, doc_uri: str) -> None:
+def discover_workspace(ls: LanguageServer) -> None:
+    """
+    Create the jac workspace with every module discovered but none compiled,
+    modules are then compiled (or loaded from the analysis cache) on demand.
+    """
+    # With tiered validation type checking is its own tier, the workspace
+    # itself only runs up to the def-use pass.
+    type_check = ls.settings.get("typeCheck", False) and not is_tiered_validation(ls)
+    ls.jlws = Workspace(
+        path=ls.workspace.root_path, lazy_parse=True, type_check=type_check
+    )
+    ls.jlws.lazy_parse = False
+    ls.analysis_cache = (
+        AnalysisCache(ls.workspace.root_path, type_check)
+        if ls.settings.get("analysisCache", True)
+        else None
+    )
+
+
+def get_built_modules(ls: LanguageServer) -> set[str]:
+    return {path for path, info in list(ls.jlws.modules.items()) if info.ir}
+
+
+def sync_documents(ls: LanguageServer, mod_paths: List[str]) -> None:
+    """
+    Make built modules available as documents. Documents the client already
+    opened keep their text, only their symbols are refreshed.
+    """
+    uris = []
+    for mod_path in mod_paths:
+        mod_info = ls.jlws.modules[mod_path]
+        uri = f"file://{mod_path}"
+        if uri not in ls.workspace.documents:
+            ls.workspace.put_document(
+                TextDocumentItem(
+                    uri=uri,
+                    language_id="jac",
+                    version=0,
+                    text=mod_info.ir.source.code,
+                )
+            )
+        update_doc_tree(ls, uri)
+        uris.append(uri)
+    for uri in uris:
+        update_doc_deps(ls, uri)
+
+
+async def add_modules(ls: LanguageServer, file_paths: List[str]) -> None:
+    """Build new modules into the jac workspace and make them documents."""
+    built = get_built_modules(ls)
+    added = [i for i in file_paths if i.endswith(".jac") and os.path.isfile(i)]
+    for file_path in added:
+        await build_module_in_executor(ls, file_path)
+    sync_documents(ls, sorted((get_built_modules(ls) - built) | set(added)))
+
+
+def remove_modules(ls: LanguageServer, file_paths: List[str]) -> None:
+    """Drop modules from the jac workspace, the documents and the dep table."""
+    for file_path in file_paths:
+        ls.jlws.modules.pop(file_path, None)
+        ls.dep_table.pop(file_path, None)
+        ls.import_graph.remove_module(file_path)
+        ls.use_index.remove_module(file_path)
+        ls.symbol_index.remove_module(file_path)
+        ls.archetype_index.remove_module(file_path)
+        invalidate_symbol_lists(ls, file_path)
+        uri = f"file://{file_path}"
+        if uri in ls.workspace.documents:
+            ls.workspace.remove_text_document(uri)
+
+
+async def rebuild_modules(ls: LanguageServer, file_paths: List[str]) -> None:
+    """Rebuild existing modules, e.g. after one of their imports changed."""
+    file_paths = [i for i in file_paths if os.path.isfile(i)]
+    for file_path in file_paths:
+        await build_module_in_executor(ls, file_path)
+    sync_documents(ls, file_paths)
+
+
+def get_importers(ls: LanguageServer, file_paths: List[str]) -> set[str]:
+    """Paths of the modules that directly import any of the given modules."""
+    importers = set()
+    for file_path in file_paths:
+        importers |= ls.import_graph.get_importers(file_path)
+    return importers
+
+
+def build_module(ls: LanguageServer, file_path: str) -> List[str]:
+    """
+    Compile a module into the jac workspace, see load_module. Returns the
+    paths of the modules it replaced, see register_module.
+    """
+    return register_module(ls, file_path, load_module(ls, file_path))
+
+
+async def build_module_in_executor(ls: LanguageServer, file_path: str) -> None:
+    """
+    Compile a module in the compile executor, then install it and refresh the
+    indexes of the modules it replaced on the event loop.
+    """
+    module = await ls.compile_executor.run(load_module, ls, file_path)
+    for path in register_module(ls, file_path, module):
+        reindex_module(ls, path)
+
+
+def load_module(ls: LanguageServer, file_path: str) -> ModuleInfo:
+    """
+    Compile a module, or load it from the analysis cache if neither its source
+    nor the sources of its dependencies changed. The jac workspace is left
+    untouched, the module is installed with register_module.
+    """
+    with open(file_path, "r") as f:
+        source = f.read()
+    cache = getattr(ls, "analysis_cache", None)
+    module = cache.load(file_path, source) if cache else None
+    if module is None:
+        module = compile_source(file_path, source, ls.jlws.type_check)
+        if cache:
+            cache.store(file_path, source, module)
+    return module
+
+
+def build_modules_parallel(ls: LanguageServer, files: List[str], workers: int) -> None:
+    """
+    Build the given modules in a pool of compiler worker processes.
+
+    Modules found in the analysis cache are loaded first, in this process.
+    The others are compiled in waves following their level in the import
+    graph, starting with the ones importing no other module. Each module is
+    compiled once, on its own, after the modules it imports were built: their
+    results are kept rather than replaced by the copies attached to their
+    importers. Starting the workers costs more than it saves with a single CPU
+    or only a few modules to compile, these are compiled in this process.
+    """
+    sources = {}
+    for file_path in files:
+        with open(file_path, "r") as f:
+            sources[file_path] = f.read()
+    cache = getattr(ls, "analysis_cache", None)
+    type_check = ls.jlws.type_check
+    misses = []
+    for file_path in files:
+        if ls.jlws.modules[file_path].ir is not None:
+            continue
+        module = cache.load(file_path, sources[file_path]) if cache else None
+        if module is None:
+            misses.append(file_path)
+        else:
+            register_module(ls, file_path, module, deep=False)
+    workers = min(workers, os.cpu_count() or 1)
+    if workers < 2 or len(misses) < PARALLEL_MIN_MODULES:
+        for file_path in misses:
+            module = compile_source(file_path, sources[file_path], type_check)
+            if cache:
+                cache.store(file_path, sources[file_path], module)
+            register_module(ls, file_path, module, deep=False)
+        return
+    pool = WorkerPool(workers)
+    try:
+        with ThreadPoolExecutor(workers) as threads:
+            scans = {
+                file_path: threads.submit(
+                    pool.run, scan_imports, file_path, sources[file_path]
+                )
+                for file_path in misses
+            }
+            imports = {}
+            for file_path, scan in scans.items():
+                try:
+                    imports[file_path] = {
+                        get_import_path(file_path, i) for i in scan.result()
+                    }
+                except Exception:
+                    imports[file_path] = set()
+
+            for wave in import_waves(misses, imports):
+                jobs = {
+                    file_path: threads.submit(
+                        pool.run,
+                        compile_source,
+                        file_path,
+                        sources[file_path],
+                        type_check,
+                    )
+                    for file_path in wave
+                }
+                for file_path in wave:
+                    try:
+                        module = jobs[file_path].result()
+                    except Exception:
+                        # Results that can't cross the process boundary
+                        # are compiled locally instead.
+                        ls.jlws.rebuild_file(file_path, False, sources[file_path])
+                        module = ls.jlws.modules[file_path]
+                    if cache:
+                        cache.store(file_path, sources[file_path], module)
+                    register_module(ls, file_path, module, deep=False)
+    finally:
+        pool.shutdown()
+
+
+def register_module(
+    ls: LanguageServer, file_path: str, module: ModuleInfo, deep: bool = True
+) -> List[str]:
+    """
+    Add a built module to the jac workspace, and unless `deep` is False the
+    modules it imported too. Returns the paths of the modules whose IR was
+    replaced, their uses have to be indexed again.
+    """
+    ls.jlws.modules[file_path] = module
+    if not deep:
+        return [file_path]
+    for sub in getattr(module.ir, "mod_deps", {}):
+        ls.jlws.modules[sub] = ModuleInfo(
+            ir=module.ir.mod_deps[sub],
+            errors=module.errors,
+            warnings=module.warnings,
+        )
+    return [file_path, *getattr(module.ir, "mod_deps", {})]
+
+
+def reindex_module(ls: LanguageServer, file_path: str) -> None:
+    """
+    Refresh the indexes read from the IR of a module whenever it is replaced,
+    its document tree is only updated when it has no errors.
+    """
+    index_module_uses(ls, file_path)
+    try:
+        symbols = get_doc_symbols(ls, f"file://{file_path}")
+    except Exception:
+        symbols = []
+    ls.archetype_index.set_module(file_path, symbols)
+
+
+def get_import_path(doc_url: str, path_str: str) -> str:
+    return f"{Path(doc_url).parent.joinpath(path_str.replace('.', os.sep))}.jac"
+
+
+def update_doc_tree(
+    ls: LanguageServer, doc_uri: str, version: Optional[int] = None
+) -> None:
     doc = ls.workspace.get_text_document(doc_uri)
+    if is_stale(ls, doc_uri, version):
+        return  # symbols of an outdated version
     try:
+        index_module_uses(ls, doc_uri.replace("file://", ""))
         doc.symbols = get_doc_symbols(ls, doc.uri)
         doc.use_symbols = get_use_symbols(ls, doc.uri)
     except Exception:
         doc.symbols = []
         doc.use_symbols = []
+    ls.symbol_index.set_module(doc_uri.replace("file://", ""), doc.symbols)
+    ls.archetype_index.set_module(doc_uri.replace("file://", ""), doc.symbols)
+    invalidate_symbol_lists(ls, doc_uri.replace("file://", ""))
+
+
+def invalidate_symbol_lists(ls: LanguageServer, file_path: str) -> None:
+    """
+    Drop the flattened symbols of a module and of the modules it shares symbols
+    with: its importers list its symbols and its imports list their uses in it.
+    """
+    graph = ls.import_graph
+    related = graph.get_importers(file_path) | graph.get_imports(file_path)
+    for path in {file_path} | related:
+        ls.symbol_cache.invalidate(f"file://{path}")
+        ls.completion_cache.invalidate(f"file://{path}")
 
 
 def update_doc_deps(ls: LanguageServer, doc_uri: str) -> None:
     doc = ls.workspace.get_text_document(doc_uri)
     doc_url = doc.uri.replace("file://", "")
     doc.dependencies = {}
+    ls.symbol_cache.invalidate(doc.uri)
+    ls.completion_cache.invalidate(doc.uri)
 
     jlws_imports = ls.jlws.get_dependencies(doc_url)
     imports = [
         {
-            "path": f"{Path(doc_url).parent.joinpath(i.path_str.replace('.', os.sep))}.jac",
-            "is_jac_import": i.parent.lang.tag.value == "jac",
+            "path": get_import_path(doc_url, i.path_str),
+            "is_jac_import": i.parent_of_type(Import).hint.tag.value == "jac",
             "line": i.loc.first_line,
-            "uri": f"file://{Path(doc_url).parent.joinpath(i.path_str.replace('.', os.sep))}.jac",
+            "uri": f"file://{get_import_path(doc_url, i.path_str)}",
         }
         for i in jlws_imports
     ]
 
     ls.dep_table[doc_url] = [s for s in imports if s["is_jac_import"]]
+    ls.import_graph.set_imports(doc_url, [s["path"] for s in ls.dep_table[doc_url]])
     for dep in imports:
         if dep["is_jac_import"]:
+            if dep["path"] not in ls.jlws.modules:
+                continue  # missing module, the edge stays in the dep table
             dep_doc = ls.workspace.get_text_document(dep["uri"])
             if not hasattr(dep_doc, "symbols"):
                 update_doc_tree(ls, dep_doc.uri)
@@ -207,9 +504,10 @@ class Symbol:
 
     @property
     def doc_sym(self):
+        sym_info = self.sym_info
         return DocumentSymbol(
             name=self.sym_name,
-            kind=self.sym_info.kind,
+            kind=sym_info.kind,
             range=Range(
                 start=Position(
                     line=self.node.loc.first_line - OFFSET,
@@ -220,7 +518,7 @@ class Symbol:
                     character=self.node.loc.col_end - OFFSET,
                 ),
             ),
-            selection_range=self.sym_info.location.range,
+            selection_range=sym_info.location.range,
             detail=self.sym_doc,
             children=self._get_children_doc_sym(),
         )
@@ -303,13 +601,12 @@ class Symbol:
         yield kid_symbol
 
     def uses(self, ls: LanguageServer) -> List["Symbol"]:
-        for mod_url in ls.jlws.modules.keys():
-            for x in ls.jlws.get_uses(mod_url):
-                try:
-                    if x.sym_link == self.ws_symbol:
-                        yield Symbol(x, f"file://{mod_url}", is_use=self)
-                except Exception:
-                    continue
+        try:
+            ws_symbol = self.ws_symbol
+        except Exception:
+            return
+        for mod_url, x in ls.use_index.get_uses(ws_symbol):
+            yield Symbol(x, f"file://{mod_url}", is_use=self)
 
     def _get_children_doc_sym(self):
         children = []
@@ -402,14 +699,28 @@ def get_use_symbols(ls: LanguageServer, doc_uri: str) -> List[Symbol]:
 
 
 def get_symbol_by_name(
-    name: str, symbol_list: List[Symbol], sym_type: str = None
-) -> Symbol:
-    for symbol in symbol_list:
+    ls: LanguageServer, doc: TextDocumentItem, name: str, sym_type: str = None
+) -> Optional[Symbol]:
+    """
+    The first declaration of a name visible from a document, of `sym_type` if
+    given. Archetypes are looked up in the archetype index, only other names
+    are searched in the flattened symbols of the document.
+    """
+    # imported here, utils imports this module
+    from .utils import get_all_symbols, get_visible_modules
+
+    if sym_type is None or sym_type in ARCHETYPE_KINDS:
+        archetype = ls.archetype_index.find_archetype(
+            name,
+            get_visible_modules(ls, doc),
+            (sym_type,) if sym_type else ARCHETYPE_KINDS,
+        )
+        if archetype is not None:
+            return archetype.symbol
+        if sym_type is not None:
+            return None  # every archetype of the visible modules is indexed
+    for symbol in get_all_symbols(ls, doc):
         if symbol.sym_name == name and not symbol.is_use:
-            if sym_type:
-                if symbol.sym_type == sym_type:
-                    return symbol
-            else:
+            if not sym_type or symbol.sym_type == sym_type:
                 return symbol
-            return symbol
     return None
@@ -0,0 +1,211 @@
+"""
+Line-indexed text documents for incremental text sync.
+
+pygls keeps open documents as one string, rebuilds it for every incremental
+change and splits it again whenever a line is read. The documents of the
+workspace are instead kept as a list of lines: a change only splits and
+replaces the lines it touches, and a line is read by its index. The source
+is joined once per version, when the compiler asks for it.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import NamedTuple, Optional
+
+from lsprotocol import types
+from pygls.workspace import TextDocument, Workspace
+
+# the line boundaries of str.splitlines, which pygls uses for its lines
+LINE_BREAKS = (
+    "\n",
+    "\r",
+    "\x0b",
+    "\x0c",
+    "\x1c",
+    "\x1d",
+    "\x1e",
+    "\x85",
+    "\u2028",
+    "\u2029",
+)
+
+
+class LineChange(NamedTuple):
+    start: int  # the first replaced line
+    end: int  # the line after the last replaced line, in the previous text
+    new_end: int  # the line after the last inserted line, in the new text
+
+
+class LineBuffer:
+    """
+    The lines of a text, with their line breaks, and their start offsets.
+
+    A line is read by its index, the line holding an offset is found by a
+    binary search over the line starts. An edit only splits the text of the
+    lines it touches. The joined text and the line starts are computed on
+    demand, once per edit.
+    """
+
+    def __init__(self, text: str = "") -> None:
+        self._lines = text.splitlines(True)
+        self._text: Optional[str] = text
+        self._starts: Optional[list[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def lines(self) -> list[str]:
+        return self._lines
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._lines)
+        return self._text
+
+    def line(self, index: int) -> str:
+        """A line without its line break, "" past the end of the text."""
+        if index >= len(self._lines):
+            return ""
+        line = self._lines[index]
+        return line.splitlines()[0] if line.endswith(LINE_BREAKS) else line
+
+    def line_start(self, index: int) -> int:
+        """The offset of the start of a line."""
+        return self._get_starts()[min(index, len(self._lines))]
+
+    def line_at(self, offset: int) -> int:
+        """The index of the line holding an offset."""
+        starts = self._get_starts()
+        return max(bisect_right(starts, offset, 0, len(self._lines)) - 1, 0)
+
+    def _get_starts(self) -> list[int]:
+        if self._starts is None:
+            self._starts = [0, *accumulate(len(line) for line in self._lines)]
+        return self._starts
+
+    def replace(
+        self, start_line: int, start_col: int, end_line: int, end_col: int, text: str
+    ) -> LineChange:
+        """
+        Replace the text between two positions, in characters, and return the
+        lines that changed. Positions past the end of the text are clamped to
+        it.
+        """
+        lines = self._lines
+        start = min(start_line, len(lines))
+        stop = min(end_line + 1, len(lines))
+        prefix = lines[start][:start_col] if start < len(lines) else ""
+        suffix = lines[end_line][end_col:] if end_line < len(lines) else ""
+        new_text = prefix + text + suffix
+        # take in the neighbouring lines when the edit joins them, e.g. by
+        # deleting a line break or writing "\n" after a lone "\r"
+        while start > 0 and (
+            not lines[start - 1].endswith(LINE_BREAKS)
+            or (lines[start - 1].endswith("\r") and new_text.startswith("\n"))
+        ):
+            start -= 1
+            new_text = lines[start] + new_text
+        while stop < len(lines) and (
+            not new_text.endswith(LINE_BREAKS)
+            or (new_text.endswith("\r") and lines[stop].startswith("\n"))
+        ):
+            new_text += lines[stop]
+            stop += 1
+        new_lines = new_text.splitlines(True)
+        lines[start:stop] = new_lines
+        self._text = None
+        self._starts = None
+        return LineChange(start, stop, start + len(new_lines))
+
+
+class BufferedTextDocument(TextDocument):
+    """
+    A text document kept in a LineBuffer.
+
+    `line_changes` holds the line ranges replaced by the changes applied to
+    the document, in order, for consumers that only need to look at the
+    changed lines. The workspace clears it when the version changes, so it
+    holds the changes of the latest version.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # documents that are not open are read from disk, as in pygls
+        self._buffer = LineBuffer(self._source) if self._source is not None else None
+        self._source = None
+        self.line_changes: list[LineChange] = []
+
+    @property
+    def buffer(self) -> LineBuffer:
+        if self._buffer is None:
+            return LineBuffer(super().source)
+        return self._buffer
+
+    @property
+    def source(self) -> str:
+        return self.buffer.text
+
+    @property
+    def lines(self) -> list[str]:
+        return self.buffer.lines
+
+    def line(self, index: int) -> str:
+        """A line without its line break, "" past the end of the document."""
+        return self.buffer.line(index)
+
+    def _apply_incremental_change(
+        self, change: types.TextDocumentContentChangeEvent_Type1
+    ) -> None:
+        buffer = self.buffer
+        change_range = self.position_codec.range_from_client_units(
+            buffer.lines, change.range
+        )
+        self._buffer = buffer
+        self.line_changes.append(
+            buffer.replace(
+                change_range.start.line,
+                change_range.start.character,
+                change_range.end.line,
+                change_range.end.character,
+                change.text,
+            )
+        )
+
+    def _apply_full_change(self, change: types.TextDocumentContentChangeEvent) -> None:
+        lines = len(self._buffer) if self._buffer is not None else 0
+        self._buffer = LineBuffer(change.text)
+        self.line_changes.append(LineChange(0, lines, len(self._buffer)))
+
+
+class BufferedWorkspace(Workspace):
+    """A workspace keeping its text documents in line buffers."""
+
+    def _create_text_document(
+        self,
+        doc_uri: str,
+        source: Optional[str] = None,
+        version: Optional[int] = None,
+        language_id: Optional[str] = None,
+    ) -> BufferedTextDocument:
+        return BufferedTextDocument(
+            doc_uri,
+            source=source,
+            version=version,
+            language_id=language_id,
+            sync_kind=self._sync_kind,
+            position_codec=self.position_codec,
+        )
+
+    def update_text_document(
+        self,
+        text_doc: types.VersionedTextDocumentIdentifier,
+        change: types.TextDocumentContentChangeEvent,
+    ):
+        # the changes of a version are applied one by one, the version is set
+        # after each of them
+        doc = self._text_documents[text_doc.uri]
+        if doc.version != text_doc.version:
+            doc.line_changes = []
+        super().update_text_document(text_doc, change)
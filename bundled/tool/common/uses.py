@@ -0,0 +1,71 @@
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from jaclang.compiler.absyntree import AstSymbolNode
+    from jaclang.compiler.symtable import Symbol
+    from pygls.server import LanguageServer
+
+
+class DefUseIndex:
+    """
+    Index of the uses of every workspace symbol, keyed by the symbol they link to.
+
+    Entries are replaced per module whenever it is rebuilt, so looking up the
+    uses of a symbol never scans the workspace.
+    """
+
+    def __init__(self) -> None:
+        self.uses: dict["Symbol", dict[str, list["AstSymbolNode"]]] = {}
+        self.modules: dict[str, set["Symbol"]] = {}
+
+    def set_module(self, module: str, uses: Iterable["AstSymbolNode"]) -> None:
+        """
+        Index the uses of a module. Nodes of other modules are skipped: the IR
+        of a module holds the trees of the modules it imports, which are shared
+        with their other importers when loaded from the analysis cache.
+        """
+        self.remove_module(module)
+        links = set()
+        for node in uses:
+            link = getattr(node, "sym_link", None)
+            if link is None or node.loc.mod_path != module:
+                continue
+            self.uses.setdefault(link, {}).setdefault(module, []).append(node)
+            links.add(link)
+        self.modules[module] = links
+
+    def remove_module(self, module: str) -> None:
+        for link in self.modules.pop(module, ()):
+            by_module = self.uses.get(link)
+            if by_module is None:
+                continue
+            by_module.pop(module, None)
+            if not by_module:
+                del self.uses[link]
+
+    def get_uses_by_module(
+        self, link: "Symbol"
+    ) -> list[tuple[str, list["AstSymbolNode"]]]:
+        """The use nodes of a symbol, grouped by module path."""
+        return [
+            (module, list(nodes))
+            for module, nodes in list(self.uses.get(link, {}).items())
+        ]
+
+    def get_uses(self, link: "Symbol") -> list[tuple[str, "AstSymbolNode"]]:
+        """The (module path, use node) pairs of a symbol."""
+        return [
+            (module, node)
+            for module, nodes in list(self.uses.get(link, {}).items())
+            for node in nodes
+        ]
+
+
+def index_module_uses(ls: "LanguageServer", file_path: str) -> None:
+    """Index the uses of a module from its IR, whenever the IR is replaced."""
+    try:
+        uses = ls.jlws.get_uses(file_path)
+    except Exception:
+        ls.use_index.remove_module(file_path)
+        return
+    ls.use_index.set_module(file_path, uses)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, List, Tuple, Union, Optional
+from typing import Any, Iterator, List, Tuple, Union, Optional
 import os
 import pathlib
 import sysconfig
@@ -10,7 +10,9 @@ import platform
 from lsprotocol.types import Position, Range, TextDocumentItem
 from pygls.server import LanguageServer
 
-from .symbols import Symbol, update_doc_deps
+from .snapshot import DocumentSnapshot
+from .workspace_symbols import PrefixIndex, SymbolEntry
+from .symbols import Symbol, update_doc_deps, update_doc_tree
 from .logging import log_to_output
 
 
@@ -106,12 +108,38 @@ def is_contained(sym_range: Range, hover_position: Position) -> bool:
 def get_symbol_at_pos(
     ls: LanguageServer, doc: TextDocumentItem, pos: Position
 ) -> Optional[Symbol]:
-    for sym in get_all_symbols(ls, doc, True, True):
-        if sym.doc_uri != doc.uri:
-            continue
-        if is_contained(sym.location.range, pos):
-            return sym
-    return None
+    record = get_snapshot(ls, doc).symbol_at(pos)
+    return record.symbol if record is not None else None
+
+
+def get_snapshot(ls: LanguageServer, doc: TextDocumentItem) -> DocumentSnapshot:
+    """
+    The materialized symbols of a document, replaced only when its symbols or
+    dependencies were rebuilt since it was taken.
+    """
+    if not hasattr(doc, "symbols"):
+        update_doc_tree(ls, doc.uri)
+    if not hasattr(doc, "dependencies"):
+        update_doc_deps(ls, doc.uri)
+    source = (doc.symbols, doc.use_symbols, doc.dependencies)
+    snapshot = getattr(doc, "snapshot", None)
+    if snapshot is None or not snapshot.is_current(source):
+        snapshot = DocumentSnapshot(
+            doc.uri,
+            source,
+            doc.symbols,
+            lambda: get_all_symbols(ls, doc, True, True),
+        )
+        doc.snapshot = snapshot
+    return snapshot
+
+
+def prepare_snapshot(ls: LanguageServer, doc: TextDocumentItem) -> None:
+    """
+    Take the snapshot of a rebuilt document and materialize it in the compile
+    executor, rather than on the event loop at the next request.
+    """
+    ls.compile_executor.submit(get_snapshot(ls, doc).build)
 
 
 def get_relative_path(file_path, target_path):
@@ -183,6 +211,36 @@ def get_all_symbols(
     include_dep: bool = True,
     include_impl: bool = False,
 ) -> list[Symbol]:
+    """
+    The symbols of a document, their children and uses, and the symbols of its
+    dependencies, flattened once per document version.
+    """
+    if include_dep and not hasattr(doc, "dependencies"):
+        update_doc_deps(ls, doc.uri)
+    return ls.symbol_cache.get(
+        doc.uri,
+        ("all", include_dep, include_impl),
+        get_symbols_version(doc),
+        lambda: list(iter_all_symbols(ls, doc, include_dep, include_impl)),
+    )
+
+
+def get_symbols_version(doc: TextDocumentItem) -> tuple:
+    """What the flattened symbols of a document are built from."""
+    return (
+        doc.version,
+        doc.symbols,
+        doc.use_symbols,
+        getattr(doc, "dependencies", None),
+    )
+
+
+def iter_all_symbols(
+    ls: LanguageServer,
+    doc: TextDocumentItem,
+    include_dep: bool = True,
+    include_impl: bool = False,
+) -> Iterator[Symbol]:
     all_symbols = []
     all_symbols.extend(doc.symbols)
     all_symbols.extend(doc.use_symbols)
@@ -210,19 +268,57 @@ def extract_current_doc_symbols(
     include_dep: bool = True,
     include_impl: bool = False,
 ) -> list[Symbol]:
-    all_symbols = list(get_all_symbols(ls, doc, include_dep, include_impl))
-    return [sym for sym in all_symbols if sym.node_origin_file == doc.uri]
+    all_symbols = get_all_symbols(ls, doc, include_dep, include_impl)
+    return ls.symbol_cache.get(
+        doc.uri,
+        ("current", include_dep, include_impl),
+        get_symbols_version(doc),
+        lambda: [sym for sym in all_symbols if sym.node_origin_file == doc.uri],
+    )
 
 
-def get_cached_symbol_names(ls, doc):
-    if not hasattr(doc, "cahched_symbol_names"):
-        cahched_symbol_names = list(
-            set(get_all_symbol_names(get_all_symbols(ls, doc, False, True)))
-        )
-        doc.cahched_symbol_names = cahched_symbol_names
-        return cahched_symbol_names
-    else:
-        return doc.cahched_symbol_names
+def get_visible_modules(ls: LanguageServer, doc: TextDocumentItem) -> list[str]:
+    """Paths of a document and of the jac modules it imports, in that order."""
+    if not hasattr(doc, "dependencies"):
+        update_doc_deps(ls, doc.uri)
+    return [doc.uri.replace("file://", ""), *doc.dependencies]
+
+
+def get_completion_candidates(ls: LanguageServer, doc: TextDocumentItem) -> PrefixIndex:
+    """
+    The names visible in a document (its symbols, their children and uses, and
+    the symbols it imports) indexed for prefix completion, built once for each
+    version of the document and of its dependencies.
+    """
+    if not hasattr(doc, "dependencies"):
+        update_doc_deps(ls, doc.uri)
+    versions = [doc.version]
+    for dep_path in doc.dependencies:
+        dep_uri = f"file://{dep_path}"
+        if dep_uri in ls.workspace.documents:
+            versions.append(ls.workspace.get_text_document(dep_uri).version)
+    return ls.completion_cache.get(
+        doc.uri,
+        "candidates",
+        (tuple(versions), *get_symbols_version(doc)[1:]),
+        lambda: _build_completion_candidates(ls, doc),
+    )
+
+
+def _build_completion_candidates(
+    ls: LanguageServer, doc: TextDocumentItem
+) -> PrefixIndex:
+    entries = {}
+    for sym in get_all_symbols(ls, doc, True, True):
+        try:
+            name = sym.sym_name
+            if name not in entries or entries[name].symbol.is_use:
+                entries[name] = SymbolEntry(
+                    sym.node_origin_file.replace("file://", ""), sym
+                )
+        except Exception:
+            continue
+    return PrefixIndex(entries.values())
 
 
 def get_all_symbol_names(symbols: list[Symbol]) -> list[str]:
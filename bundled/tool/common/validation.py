@@ -1,6 +1,7 @@
 from jaclang.compiler.passes.transform import Alert
 from jaclang.compiler.parser import JacParser
 from jaclang.compiler.absyntree import JacSource
+from jaclang.compiler.workspace import ModuleInfo
 from jaclang.compiler.passes.main import (
     SubNodeTabPass,
     JacImportPass,
@@ -10,9 +11,18 @@ from jaclang.compiler.passes.main import (
     DefUsePass,
 )
 
+from typing import Callable, Optional
+
 from lsprotocol.types import Diagnostic, DiagnosticSeverity, Position, Range
 from pygls.server import LanguageServer
 
+from .parallel import compile_source, parse_source
+
+
+# Validation tiers, from the cheapest to the most expensive one.
+SYNTAX_TIER = "syntax"
+SEMANTIC_TIER = "semantic"
+TYPE_TIER = "types"
 
 default_schedule = [
     SubNodeTabPass,
@@ -34,59 +44,208 @@ def jac_to_errors(
     return prse.errors_had, prse.warnings_had
 
 
+def is_tiered_validation(ls: LanguageServer) -> bool:
+    """Whether keystrokes only run the parser, deferring the other passes."""
+    return ls.settings.get("changeValidation", SEMANTIC_TIER) == SYNTAX_TIER
+
+
+def run_isolated(ls: LanguageServer, fn: Callable, *args):
+    """Run a compile job in the worker pool when compiles are isolated."""
+    if ls.worker_pool is None:
+        return fn(*args)
+    return ls.worker_pool.run(fn, *args)
+
+
+def get_version(ls: LanguageServer, doc_uri: str) -> Optional[int]:
+    return ls.workspace.get_text_document(doc_uri).version
+
+
+def is_stale(ls: LanguageServer, doc_uri: str, version: Optional[int]) -> bool:
+    """Whether the document changed since a job started on `version` of it."""
+    if version is None:
+        return False
+    current = get_version(ls, doc_uri)
+    return current is not None and current > version
+
+
+def publish_diagnostics(
+    ls: LanguageServer,
+    doc_uri: str,
+    diagnostics: list[Diagnostic],
+    version: Optional[int] = None,
+    tier: Optional[str] = None,
+) -> bool:
+    """
+    Publish the diagnostics of a document version, unless diagnostics of a
+    newer version were already published. Returns whether they were sent.
+
+    Diagnostics of the syntax tier are published along with the ones only the
+    semantic passes found at their last run, see merge_tier_diagnostics.
+    """
+    if version is not None:
+        if version < ls.published_versions.get(doc_uri, version):
+            return False
+        ls.published_versions[doc_uri] = version
+    ls.publish_diagnostics(
+        doc_uri, merge_tier_diagnostics(ls, doc_uri, diagnostics, version, tier)
+    )
+    return True
+
+
+def _diagnostic_key(diagnostic: Diagnostic) -> tuple:
+    start, end = diagnostic.range.start, diagnostic.range.end
+    return (
+        diagnostic.message,
+        diagnostic.severity,
+        start.line,
+        start.character,
+        end.line,
+        end.character,
+    )
+
+
+def merge_tier_diagnostics(
+    ls: LanguageServer,
+    doc_uri: str,
+    diagnostics: list[Diagnostic],
+    version: Optional[int] = None,
+    tier: Optional[str] = None,
+) -> list[Diagnostic]:
+    """
+    Keep the semantic diagnostics of a document while keystrokes only parse it.
+
+    Results of the other tiers replace every diagnostic and are remembered,
+    without the ones the parser found for the same version. Results of the
+    syntax tier are merged with those until the next semantic result.
+    """
+    syntax_version, syntax, semantic = ls.tier_diagnostics.get(doc_uri, (None, [], []))
+    if tier == SYNTAX_TIER:
+        ls.tier_diagnostics[doc_uri] = (version, diagnostics, semantic)
+        parsed = {_diagnostic_key(i) for i in diagnostics}
+        return diagnostics + [i for i in semantic if _diagnostic_key(i) not in parsed]
+    parsed = (
+        {_diagnostic_key(i) for i in syntax}
+        if version is not None and syntax_version == version
+        else set()
+    )
+    semantic = [i for i in diagnostics if _diagnostic_key(i) not in parsed]
+    ls.tier_diagnostics[doc_uri] = (syntax_version, syntax, semantic)
+    return diagnostics
+
+
 def validate(
-    ls: LanguageServer, params: any, use_source: bool = False, rebuild: bool = False
+    ls: LanguageServer,
+    params: any,
+    use_source: bool = False,
+    rebuild: bool = False,
+    tier: str = SEMANTIC_TIER,
+    version: Optional[int] = None,
 ) -> list[Diagnostic]:
     text_doc = ls.workspace.get_text_document(params.text_document.uri)
     source = text_doc.source
     doc_path = params.text_document.uri.replace("file://", "")
-    diagnostics = (
-        _validate_jac(ls, doc_path, source, use_source, rebuild) if source else []
+    if not source:
+        return []
+    diagnostics, module = _validate_jac(ls, doc_path, source, use_source, rebuild, tier)
+    install_module(ls, doc_path, module, version)
+    return diagnostics
+
+
+async def validate_in_executor(
+    ls: LanguageServer,
+    params: any,
+    use_source: bool = False,
+    rebuild: bool = False,
+    tier: str = SEMANTIC_TIER,
+    version: Optional[int] = None,
+) -> list[Diagnostic]:
+    """
+    Validate a document in the compile executor.
+
+    The source is read on the event loop before the job starts, the rebuilt
+    module is installed on the event loop once the job completes, so requests
+    are served from the last installed module meanwhile.
+    """
+    text_doc = ls.workspace.get_text_document(params.text_document.uri)
+    source = text_doc.source
+    doc_path = params.text_document.uri.replace("file://", "")
+    if not source:
+        return []
+    diagnostics, module = await ls.compile_executor.run(
+        _validate_jac, ls, doc_path, source, use_source, rebuild, tier
     )
+    install_module(ls, doc_path, module, version)
     return diagnostics
 
 
+def install_module(
+    ls: LanguageServer,
+    doc_path: str,
+    module: Optional[ModuleInfo],
+    version: Optional[int] = None,
+) -> bool:
+    """
+    Replace the module of a document in the jac workspace, unless the document
+    changed since the job that built it started on `version` of it.
+    """
+    # imported here, symbols imports this module
+    from .symbols import reindex_module
+
+    if module is None or is_stale(ls, f"file://{doc_path}", version):
+        return False
+    ls.jlws.modules[doc_path] = module
+    reindex_module(ls, doc_path)
+    return True
+
+
 def _validate_jac(
     ls: LanguageServer,
     doc_path: str,
     source: str,
     use_source: bool = False,
     rebuild: bool = False,
-) -> list[Diagnostic]:
+    tier: str = SEMANTIC_TIER,
+) -> tuple[list[Diagnostic], Optional[ModuleInfo]]:
     """
-    Validate a JAC file.
+    Validate a JAC file. Only reads the state of the server, so it can run in
+    the compile executor; the rebuilt module is returned for the caller to
+    install.
 
     Args:
         doc_path (str): The path to the JAC file.
         source (str): The source code of the JAC file.
         use_source (bool, optional): Whether to use the source code to validate the JAC file. Defaults to False.
         rebuild (bool, optional): Whether to rebuild the JAC file. Defaults to False.
+        tier (str, optional): The passes to run on the source, the parser only
+            (SYNTAX_TIER), the workspace schedule (SEMANTIC_TIER) or the type
+            checking schedule (TYPE_TIER). Defaults to SEMANTIC_TIER.
 
     Returns:
-        list[Diagnostic]: A list of diagnostics for the JAC file.
+        tuple[list[Diagnostic], Optional[ModuleInfo]]: A list of diagnostics
+            for the JAC file and the module to install in the workspace, if
+            any.
     """
     diagnostics = []
-    if use_source:
-        errors, warnings = jac_to_errors(doc_path, source)
-        if rebuild and len(errors) == 0:
-            ls.jlws.rebuild_file(doc_path, False, source)
-            errors, warnings = (
-                ls.jlws.modules[doc_path].errors,
-                ls.jlws.modules[doc_path].warnings,
-            )
+    module = None
+    if use_source and tier == SYNTAX_TIER:
+        errors, warnings = run_isolated(ls, parse_source, doc_path, source)
+    elif use_source:
+        # A single compile gives the diagnostics and the rebuilt module, which
+        # only replaces the last good one in the workspace if it has no errors.
+        type_check = ls.jlws.type_check or tier == TYPE_TIER
+        module = run_isolated(ls, compile_source, doc_path, source, type_check)
+        errors, warnings = list(module.errors), list(module.warnings)
+        if not rebuild or len(errors) > 0:
+            module = None
     else:
         if rebuild:
-            ls.jlws.rebuild_file(doc_path)
-        errors, warnings = (
-            ls.jlws.modules[doc_path].errors,
-            ls.jlws.modules[doc_path].warnings,
-        )
+            module = run_isolated(ls, compile_source, doc_path, "", ls.jlws.type_check)
+        mod_info = module or ls.jlws.modules[doc_path]
+        errors, warnings = mod_info.errors, mod_info.warnings
 
     if not ls.settings.get("showWarning", False):
         warnings = []
 
-    print(errors, warnings)
-
     for alert in errors + warnings:
         msg = alert.msg
         loc = alert.loc
@@ -102,4 +261,4 @@ def _validate_jac(
                 else DiagnosticSeverity.Warning,
             )
         )
-    return diagnostics
+    return diagnostics, module
@@ -0,0 +1,276 @@
+"""
+Crash-isolated compiler processes.
+
+Each worker is a `python -m common.workers` process running one job at a
+time: a picklable function and its arguments are written to its stdin and the
+result (diagnostics, or a compiled module with its symbol tables) is pickled
+back on its stdout. Workers never import the language server itself. A worker
+that crashes, runs out of memory or runs past the job timeout only fails the
+job it was running, and is replaced.
+"""
+
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+import traceback
+from typing import Callable
+
+from .cache import ensure_recursion_limit
+from .constants import (
+    WORKER_JOB_TIMEOUT,
+    WORKER_MAX_ADDRESS_SPACE_MB,
+    WORKER_MAX_JOBS,
+    WORKER_MAX_RSS_MB,
+)
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class WorkerCrashedError(Exception):
+    """A worker process died while running a job."""
+
+
+class WorkerTimeoutError(WorkerCrashedError):
+    """A job ran past the job timeout, its worker process was killed."""
+
+
+def get_peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def limit_address_space(max_mb: float) -> None:
+    """
+    Make allocations past `max_mb` of address space fail with MemoryError.
+    This caps virtual memory, not RSS.
+    """
+    if resource is None or max_mb <= 0:
+        return
+    limit = int(max_mb * 1024 * 1024)
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        pass  # e.g. macOS does not enforce it
+
+
+def _worker_main(max_address_space_mb: float) -> None:
+    ensure_recursion_limit()
+    limit_address_space(max_address_space_mb)
+    jobs, results = sys.stdin.buffer, sys.stdout.buffer
+    # anything the compiler prints must not corrupt the results stream
+    sys.stdout = sys.stderr
+    while True:
+        try:
+            job = pickle.load(jobs)
+        except EOFError:
+            return
+        if job is None:
+            return
+        fn, args = job
+        try:
+            reply = ("ok", fn(*args))
+        except MemoryError as e:
+            reply = ("memory", f"MemoryError: {e}\n{traceback.format_exc()}")
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}\n{traceback.format_exc()}")
+        pickle.dump((*reply, get_peak_rss_mb()), results, pickle.HIGHEST_PROTOCOL)
+        results.flush()
+
+
+class Worker:
+    """A single compiler process, started on its first job."""
+
+    def __init__(
+        self,
+        max_address_space_mb: float = WORKER_MAX_ADDRESS_SPACE_MB,
+        timeout: float = WORKER_JOB_TIMEOUT,
+    ) -> None:
+        self.max_address_space_mb = max_address_space_mb
+        self.timeout = timeout
+        self.process = None
+        self.jobs = 0
+        self.rss_mb = 0.0
+        self.out_of_memory = False
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        tool_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join([tool_dir] + [i for i in sys.path if i])
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "common.workers", str(self.max_address_space_mb)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+        self.jobs = 0
+        self.rss_mb = 0.0
+        self.out_of_memory = False
+
+    def stop(self) -> None:
+        if self.process is None:
+            return
+        try:
+            pickle.dump(None, self.process.stdin)
+            self.process.stdin.close()
+            self.process.wait(1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        for pipe in (self.process.stdin, self.process.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+        self.process = None
+
+    def call(self, fn: Callable, args: tuple):
+        if not self.is_alive():
+            self.start()
+        # a job past the timeout kills the process, which ends the read below
+        timer = (
+            threading.Timer(self.timeout, self.process.kill) if self.timeout else None
+        )
+        try:
+            if timer:
+                timer.start()
+            pickle.dump((fn, args), self.process.stdin, pickle.HIGHEST_PROTOCOL)
+            self.process.stdin.flush()
+            status, value, self.rss_mb = pickle.load(self.process.stdout)
+        except (EOFError, OSError, pickle.UnpicklingError) as e:
+            timed_out = timer is not None and timer.finished.is_set()
+            code = self.process.poll()
+            self.stop()
+            if timed_out:
+                raise WorkerTimeoutError(
+                    f"compiler worker killed after {self.timeout}s running {fn.__name__}"
+                ) from e
+            raise WorkerCrashedError(
+                f"compiler worker crashed running {fn.__name__} (exit code {code})"
+            ) from e
+        finally:
+            if timer:
+                timer.cancel()
+        self.jobs += 1
+        self.out_of_memory = status == "memory"
+        if status != "ok":
+            raise RuntimeError(value)
+        return value
+
+
+class WorkerPool:
+    """
+    Pool of crash-isolated compiler processes, safe to use from many threads.
+
+    Workers are replaced after `max_jobs` jobs, once their peak RSS exceeds
+    `max_rss_mb` or after a job ran out of memory. Allocations past
+    `max_address_space_mb` of address space fail with MemoryError, and
+    workers are killed when a job runs longer than `timeout` seconds. A
+    crashed or killed worker is replaced on its next job.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_jobs: int = WORKER_MAX_JOBS,
+        max_rss_mb: float = WORKER_MAX_RSS_MB,
+        max_address_space_mb: float = WORKER_MAX_ADDRESS_SPACE_MB,
+        timeout: float = WORKER_JOB_TIMEOUT,
+    ) -> None:
+        # results hold whole syntax trees, unpickling them needs a higher limit
+        ensure_recursion_limit()
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.timeout = timeout
+        self.crashes = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self._workers = [
+            Worker(max_address_space_mb, timeout) for _ in range(workers)
+        ]
+        self._idle: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def run(self, fn: Callable, *args):
+        """Run fn(*args) in the next free worker and return its result."""
+        worker = self._idle.get()
+        try:
+            return worker.call(fn, args)
+        except WorkerCrashedError as e:
+            with self._lock:
+                self.crashes += 1
+                if isinstance(e, WorkerTimeoutError):
+                    self.timeouts += 1
+            raise
+        finally:
+            if worker.is_alive() and (
+                worker.jobs >= self.max_jobs
+                or worker.rss_mb > self.max_rss_mb
+                or worker.out_of_memory
+            ):
+                worker.stop()
+                with self._lock:
+                    self.recycled += 1
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._idle.put(worker)
+            if closed:
+                # the pool was shut down while the job ran
+                worker.stop()
+                self._idle.put(worker)
+
+    def shutdown(self) -> None:
+        """
+        Stop the workers. Jobs already running complete first, their workers
+        stop once they are done; jobs started afterwards still run, in a
+        worker that stops right after them.
+        """
+        with self._lock:
+            self._closed = True
+            idle = []
+            while True:
+                try:
+                    idle.append(self._idle.get_nowait())
+                except queue.Empty:
+                    break
+        for worker in idle:
+            worker.stop()
+            self._idle.put(worker)
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "workers": self.size,
+            "crashes": self.crashes,
+            "timeouts": self.timeouts,
+            "recycled": self.recycled,
+            "rss_mb": [round(i.rss_mb) for i in self._workers if i.is_alive()],
+        }
+
+
+if __name__ == "__main__":
+    _worker_main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else WORKER_MAX_ADDRESS_SPACE_MB
+    )
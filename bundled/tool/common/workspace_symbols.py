@@ -0,0 +1,182 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from .symbols import Symbol
+
+# the start of a word in a name: after an underscore, a digit run or a hump
+_WORD_START = re.compile(r"(?<=_)[^_]|(?<=[a-z0-9])[A-Z]|(?<=[A-Za-z])[0-9]")
+
+EXACT, PREFIX, WORD_PREFIX, HUMPS, SUBSTRING, SUBSEQUENCE = range(6)
+
+
+def match_rank(query: str, name: str, lower: str, starts: str) -> Optional[int]:
+    """
+    How well a name matches a lowercase query, lower is better, or None.
+
+    `starts` holds the lowercase first letters of the words of the name, so
+    `gsap` matches `get_symbol_at_pos` and `GetSymbolAtPos` by their humps.
+    """
+    if lower == query:
+        return EXACT
+    if lower.startswith(query):
+        return PREFIX
+    position = lower.find(query)
+    if position > 0 and (name[position - 1] == "_" or name[position].isupper()):
+        return WORD_PREFIX
+    if starts.startswith(query):
+        return HUMPS
+    if position >= 0:
+        return SUBSTRING
+    index = 0
+    for char in query:
+        index = lower.find(char, index) + 1
+        if not index:
+            return None
+    return SUBSEQUENCE
+
+
+class SymbolEntry:
+    __slots__ = ("name", "lower", "starts", "module", "symbol")
+
+    def __init__(self, module: str, symbol: "Symbol") -> None:
+        self.name = symbol.sym_name
+        self.lower = self.name.lower()
+        self.starts = (self.name[:1] + "".join(_WORD_START.findall(self.name))).lower()
+        self.module = module
+        self.symbol = symbol
+
+
+class PrefixIndex:
+    """
+    Symbol names sorted for completion, matching a typed prefix against the
+    start of names or against the starts of their words, ignoring case.
+    """
+
+    def __init__(self, entries: Iterable[SymbolEntry]) -> None:
+        entries = list(entries)
+        self._by_name = sorted(entries, key=lambda i: (i.lower, i.name, i.module))
+        self._names = [i.lower for i in self._by_name]
+        self._by_starts = sorted(entries, key=lambda i: (i.starts, i.name, i.module))
+        self._starts = [i.starts for i in self._by_starts]
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def search(self, prefix: str, limit: int = 0) -> tuple[list[SymbolEntry], bool]:
+        """
+        Entries whose name starts with the prefix, then the ones whose word
+        starts do (`gsa` for `get_symbol_at`), a name only once. Also returns
+        whether more than `limit` names matched, a limit of 0 returns all.
+        """
+        prefix = prefix.lower()
+        found, names = [], set()
+        for keys, entries in (
+            (self._names, self._by_name),
+            (self._starts, self._by_starts),
+        ):
+            index = bisect_left(keys, prefix)
+            while index < len(keys) and keys[index].startswith(prefix):
+                entry = entries[index]
+                index += 1
+                if entry.name in names:
+                    continue
+                if limit and len(found) == limit:
+                    return found, True
+                names.add(entry.name)
+                found.append(entry)
+        return found, False
+
+
+class WorkspaceSymbolIndex:
+    """
+    Symbols declared in the workspace modules, searchable by name.
+
+    Entries are replaced per module whenever it is rebuilt. A search first
+    narrows the candidates to the names containing every character of the
+    query through a character index, then ranks exact, prefix, word and hump
+    matches before plain substring and subsequence matches.
+    """
+
+    def __init__(self) -> None:
+        self.modules: dict[str, list[SymbolEntry]] = {}
+        self._chars: dict[str, set[SymbolEntry]] = {}
+        self._prefix_index: Optional[PrefixIndex] = None
+        # modules are rebuilt on compile threads while requests search
+        self._lock = threading.Lock()
+
+    def set_module(self, module: str, symbols: Iterable["Symbol"]) -> None:
+        entries = []
+        for symbol in symbols:
+            try:
+                entries.append(SymbolEntry(module, symbol))
+            except Exception:
+                continue
+        with self._lock:
+            self._remove_module(module)
+            for entry in entries:
+                for char in set(entry.lower):
+                    self._chars.setdefault(char, set()).add(entry)
+            self.modules[module] = entries
+            self._prefix_index = None
+
+    def remove_module(self, module: str) -> None:
+        with self._lock:
+            self._remove_module(module)
+
+    def _remove_module(self, module: str) -> None:
+        self._prefix_index = None
+        for entry in self.modules.pop(module, ()):
+            for char in set(entry.lower):
+                entries = self._chars.get(char)
+                if entries is None:
+                    continue
+                entries.discard(entry)
+                if not entries:
+                    del self._chars[char]
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.modules.values())
+
+    @property
+    def prefix_index(self) -> PrefixIndex:
+        """The names of the whole workspace, sorted again after modules change."""
+        with self._lock:
+            if self._prefix_index is None:
+                self._prefix_index = PrefixIndex(
+                    entry for entries in self.modules.values() for entry in entries
+                )
+            return self._prefix_index
+
+    def _candidates(self, query: str) -> list[SymbolEntry]:
+        with self._lock:
+            if not query:
+                return [entry for entries in self.modules.values() for entry in entries]
+            sets = []
+            for char in set(query):
+                entries = self._chars.get(char)
+                if not entries:
+                    return []
+                sets.append(entries)
+            sets.sort(key=len)
+            return list(sets[0].intersection(*sets[1:]))
+
+    def search(self, query: str, limit: int = 0) -> tuple[list[SymbolEntry], bool]:
+        """
+        The entries matching a query, best first, and whether there were more
+        than `limit` of them. A limit of 0 returns every match.
+        """
+        query = query.lower()
+        ranked = []
+        for entry in self._candidates(query):
+            rank = match_rank(query, entry.name, entry.lower, entry.starts)
+            if rank is not None:
+                ranked.append((rank, len(entry.name), entry.name, entry.module, entry))
+        if limit <= 0 or len(ranked) <= limit:
+            ranked.sort(key=lambda i: i[:4])
+            return [i[-1] for i in ranked], False
+        best = heapq.nsmallest(limit, ranked, key=lambda i: i[:4])
+        return [i[-1] for i in best], True
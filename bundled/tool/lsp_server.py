@@ -1,14 +1,13 @@
 # Copyright (c) Jaseci Labs. All rights reserved.
 # Licensed under the MIT License.
 
+import asyncio
 import json
 import os
 import pathlib
 from typing import Optional
 import subprocess
 import sys
-import threading
-from functools import wraps
 
 
 def update_sys_path(path_to_add: str, strategy: str) -> None:
@@ -30,16 +29,49 @@ update_sys_path(
 
 import lsprotocol.types as lsp  # noqa: E402
 from pygls import server, uris  # noqa: E402
-
-from common.validation import validate  # noqa: E402
-from common.completion import get_completion_items  # noqa: E402
+from pygls.protocol import LanguageServerProtocol, lsp_method  # noqa: E402
+
+from common.validation import (  # noqa: E402
+    SEMANTIC_TIER,
+    SYNTAX_TIER,
+    TYPE_TIER,
+    get_version,
+    is_stale,
+    is_tiered_validation,
+    publish_diagnostics,
+    validate,
+    validate_in_executor,
+)
+from common.completion import get_completion_list  # noqa: E402
+from common.completion_resolver import CompletionResolver  # noqa: E402
 from common.format import format_jac  # noqa: E402
 from common.symbols import (  # noqa: E402
-    fill_workspace,
+    add_modules,
+    build_workspace,
+    discover_workspace,
+    get_importers,
+    rebuild_modules,
+    remove_modules,
+    sync_workspace,
     update_doc_tree,
     update_doc_deps,
 )
+from common.indexing import (  # noqa: E402
+    index_document,
+    is_lazy_indexing,
+    start_background_indexing,
+)
 from common.hover import get_hover_info  # noqa: E402
+from common.executor import CompileExecutor  # noqa: E402
+from common.archetypes import ArchetypeIndex  # noqa: E402
+from common.graph import ImportGraph  # noqa: E402
+from common.introspection import ModuleIntrospector, PythonLibraries  # noqa: E402
+from common.uses import DefUseIndex  # noqa: E402
+from common.symbol_cache import SymbolCache  # noqa: E402
+from common.text_document import BufferedWorkspace  # noqa: E402
+from common.workspace_symbols import WorkspaceSymbolIndex  # noqa: E402
+from common.workers import WorkerPool  # noqa: E402
+from common.scheduler import DebounceScheduler  # noqa: E402
 from common.logging import log_to_output, log_error  # noqa: E402
 from common.constants import (  # noqa: E402
     SEMANTIC_TOKEN_TYPES,
@@ -47,16 +79,37 @@ from common.constants import (  # noqa: E402
 )
 from common.utils import (  # noqa: E402
     normalize_path,
+    get_snapshot,
+    prepare_snapshot,
     get_symbol_at_pos,
     show_doc_info,  # noqa: F401
-    get_all_symbols,
     get_command,
-    sort_chunks_relative_to_previous,
-    flatten_chunks,
-    extract_current_doc_symbols,
+)
+from common.references import find_references  # noqa: E402
+from common.semantic_tokens import (  # noqa: E402
+    get_semantic_tokens,
+    get_semantic_tokens_delta,
+    get_semantic_tokens_range,
 )
 
 
+class JacLanguageServerProtocol(LanguageServerProtocol):
+    """Keeps the open documents in line buffers, updated incrementally."""
+
+    @lsp_method(lsp.INITIALIZE)
+    def lsp_initialize(self, params: lsp.InitializeParams) -> lsp.InitializeResult:
+        # the unwrapped pygls handler, the user handler is called once by ours
+        result = LanguageServerProtocol.lsp_initialize.__wrapped__(self, params)
+        workspace = self._workspace
+        self._workspace = BufferedWorkspace(
+            workspace.root_uri,
+            self._server._text_document_sync_kind,
+            list(workspace.folders.values()),
+            workspace.position_encoding,
+        )
+        return result
+
+
 class JacLanguageServer(server.LanguageServer):
     """Language Server for Jaclang."""
 
@@ -67,14 +120,40 @@ class JacLanguageServer(server.LanguageServer):
     current_doc: Optional[lsp.TextDocumentItem] = None
 
     def __init__(self, name, version, max_workers):
-        super().__init__(name=name, version=version, max_workers=max_workers)
+        super().__init__(
+            name=name,
+            version=version,
+            max_workers=max_workers,
+            protocol_cls=JacLanguageServerProtocol,
+            text_document_sync_kind=lsp.TextDocumentSyncKind.Incremental,
+        )
         self.workspace_filled = False
         self.dep_table = {}
+        self.import_graph = ImportGraph()
+        self.use_index = DefUseIndex()
+        self.symbol_index = WorkspaceSymbolIndex()
+        self.archetype_index = ArchetypeIndex()
+        self.py_introspector = ModuleIntrospector()
+        self.py_libs = PythonLibraries()
+        self.symbol_cache = SymbolCache()
+        self.completion_cache = SymbolCache()
+        self.completion_resolver = CompletionResolver()
+        self.analysis_cache = None
+        self.indexing_task = None
+        self.change_scheduler = DebounceScheduler()
+        self.semantic_scheduler = DebounceScheduler()
+        self.type_check_scheduler = DebounceScheduler()
+        self.published_versions = {}
+        self.tier_diagnostics = {}
+        self.compile_executor = CompileExecutor(max_workers)
+        self.fill_future = None
+        self.worker_pool = None
 
 
 WORKSPACE_SETTINGS = {}
 GLOBAL_SETTINGS = {}
 
+# Default size of the compile executor, see the `maxWorkers` setting
 MAX_WORKERS = 5
 LSP_SERVER = JacLanguageServer(
     name="Jaclang Language Server",
@@ -83,52 +162,89 @@ LSP_SERVER = JacLanguageServer(
 )
 
 
-def debounce(wait):
-    def decorator(fn):
-        @wraps(fn)
-        def debounced(*args, **kwargs):
-            def call_it():
-                fn(*args, **kwargs)
-
-            if hasattr(debounced, "_timer"):
-                debounced._timer.cancel()
-
-            debounced._timer = threading.Timer(wait, call_it)
-            debounced._timer.start()
-
-        return debounced
-
-    return decorator
-
-
 # ************** Language Server features ********************
 
 
 @LSP_SERVER.feature(lsp.TEXT_DOCUMENT_DID_CHANGE)
-@debounce(2)  # Debounce for 2 seconds
 def did_change(ls: server.LanguageServer, params: lsp.DidChangeTextDocumentParams):
     """
-    Update the document tree and validate the changes made to the text document.
+    Schedule the validation of the changed document. Validation is debounced
+    per document, with a delay that adapts to the document's compile time.
+
+    With tiered validation keystrokes only run the parser, the semantic passes
+    run once the document has been idle for `semanticIdleDelay` seconds (or on
+    save) and type checking last, after `typeCheckIdleDelay` seconds.
 
     Args:
         ls (LanguageServer): The language server instance.
         params (lsp.DidChangeTextDocumentParams): The parameters for the text document change.
     """
+    uri = params.text_document.uri
+    if not is_tiered_validation(ls):
+        ls.change_scheduler.schedule(uri, validate_changes, ls, params)
+        return
+    ls.type_check_scheduler.cancel(uri)
+    ls.change_scheduler.schedule(uri, validate_changes, ls, params, SYNTAX_TIER)
+    ls.semantic_scheduler.schedule(
+        uri,
+        validate_changes,
+        ls,
+        params,
+        SEMANTIC_TIER,
+        delay=ls.settings.get("semanticIdleDelay", 3),
+    )
+
+
+async def validate_changes(
+    ls: server.LanguageServer,
+    params: lsp.DidChangeTextDocumentParams,
+    tier: str = SEMANTIC_TIER,
+):
+    """
+    Update the document tree and validate the changes made to the text document.
+    Starts once the document's debounce delay has elapsed, the compile runs in
+    the compile executor.
+
+    The job is bound to the document version it starts on, if the document
+    changes while it compiles its results are discarded.
+    """
     try:
-        diagnostics = validate(ls, params, True, True)
-        ls.publish_diagnostics(params.text_document.uri, diagnostics)
-        if not any(
+        uri = params.text_document.uri
+        version = get_version(ls, uri)
+        diagnostics = await validate_in_executor(
+            ls, params, True, tier != SYNTAX_TIER, tier, version
+        )
+        if is_stale(ls, uri, version):
+            return
+        publish_diagnostics(ls, uri, diagnostics, version, tier)
+        if tier != SYNTAX_TIER and not any(
             diagnostic.severity == lsp.DiagnosticSeverity.Error
             for diagnostic in diagnostics
         ):
-            update_doc_tree(ls, params.text_document.uri)
-            update_doc_deps(ls, params.text_document.uri)
+            update_doc_tree(ls, uri, version)
+            update_doc_deps(ls, uri)
+            prepare_snapshot(ls, ls.workspace.get_text_document(uri))
+            if tier == SEMANTIC_TIER:
+                schedule_type_check(ls, params)
     except Exception as e:
         log_error(ls, f"Error during document change: {e}")
 
 
+def schedule_type_check(ls: server.LanguageServer, params):
+    """Queue the type checking tier of a document that passed the semantic one."""
+    if is_tiered_validation(ls) and ls.settings.get("typeCheck", False):
+        ls.type_check_scheduler.schedule(
+            params.text_document.uri,
+            validate_changes,
+            ls,
+            params,
+            TYPE_TIER,
+            delay=ls.settings.get("typeCheckIdleDelay", 10),
+        )
+
+
 @LSP_SERVER.feature(lsp.TEXT_DOCUMENT_DID_SAVE)
-def did_save(ls, params: lsp.DidSaveTextDocumentParams):
+async def did_save(ls, params: lsp.DidSaveTextDocumentParams):
     """
     Updates the document tree and validates the saved text document.
 
@@ -138,18 +254,25 @@ def did_save(ls, params: lsp.DidSaveTextDocumentParams):
     """
     try:
         doc = ls.workspace.get_text_document(params.text_document.uri)
-        doc.version += 1
+        # saving runs the semantic tier right away
+        ls.change_scheduler.cancel(params.text_document.uri)
+        ls.semantic_scheduler.cancel(params.text_document.uri)
 
-        diagnostics = validate(ls, params, False, True)
-        ls.publish_diagnostics(params.text_document.uri, diagnostics)
+        version = doc.version
+        diagnostics = await validate_in_executor(
+            ls, params, False, True, SEMANTIC_TIER, version
+        )
+        publish_diagnostics(ls, params.text_document.uri, diagnostics, version)
 
         # if any of the diagnostics are errors, then don't update the document tree
         if not any(
             diagnostic.severity == lsp.DiagnosticSeverity.Error
             for diagnostic in diagnostics
         ):
-            update_doc_tree(ls, params.text_document.uri)
+            update_doc_tree(ls, params.text_document.uri, version)
             update_doc_deps(ls, params.text_document.uri)
+            prepare_snapshot(ls, doc)
+            schedule_type_check(ls, params)
     except Exception as e:  # Catch potential errors
         log_error(ls, f"Error during document save {e}")
 
@@ -161,14 +284,26 @@ async def did_open(ls: server.LanguageServer, params: lsp.DidOpenTextDocumentPar
     It fills the workspace if it is not already filled and validates the parameters.
     """
     ls.current_doc = params.text_document
-    if not ls.workspace_filled:
+    if is_lazy_indexing(ls):
+        # Open files (and what they import) are indexed first, the rest of the
+        # workspace follows in the background.
         try:
-            fill_workspace(ls)
+            await index_document(ls, params.text_document.uri)
+        except Exception as e:
+            log_error(ls, f"Error indexing {params.text_document.uri}: {e}")
+        start_background_indexing(ls)
+    elif not ls.workspace_filled:
+        try:
+            await start_filling_workspace(ls)
         except Exception as e:
             ls.show_message(f"Error: {e}", lsp.MessageType.Error)
 
     diagnostics = validate(ls, params)
-    ls.publish_diagnostics(params.text_document.uri, diagnostics)
+    # versions restart when a document is reopened
+    ls.published_versions.pop(params.text_document.uri, None)
+    publish_diagnostics(
+        ls, params.text_document.uri, diagnostics, params.text_document.version
+    )
 
     try:  # if any of the diagnostics are errors, then don't update the document tree
         if not any(
@@ -177,23 +312,81 @@ async def did_open(ls: server.LanguageServer, params: lsp.DidOpenTextDocumentPar
         ):
             update_doc_tree(ls, params.text_document.uri)
             update_doc_deps(ls, params.text_document.uri)
+            prepare_snapshot(
+                ls, ls.workspace.get_text_document(params.text_document.uri)
+            )
 
     except Exception as e:  # Catch potential errors
         log_error(ls, f"Error during document opening: {e}")
 
 
+def start_filling_workspace(ls: server.LanguageServer) -> asyncio.Future:
+    """Fill the workspace in the background, once."""
+    if ls.fill_future is None:
+        ls.fill_future = asyncio.ensure_future(fill_workspace_in_executor(ls))
+        ls.fill_future.add_done_callback(lambda _: _log_fill_stats(ls))
+    return ls.fill_future
+
+
+async def fill_workspace_in_executor(ls: server.LanguageServer) -> None:
+    """
+    Compile the workspace in the compile executor, then make its modules
+    documents on the event loop.
+    """
+    await ls.compile_executor.run(build_workspace, ls)
+    sync_workspace(ls)
+
+
+def _log_fill_stats(ls: server.LanguageServer) -> None:
+    if ls.analysis_cache is not None:
+        log_to_output(ls, f"Analysis cache stats: {ls.analysis_cache.stats}")
+    log_to_output(ls, f"Compile executor stats: {ls.compile_executor.stats}")
+    if ls.worker_pool is not None:
+        log_to_output(ls, f"Compiler worker stats: {ls.worker_pool.stats}")
+
+
 # Handle File Operations
 
 
+async def _update_workspace_files(
+    ls: server.LanguageServer, removed: list[str], added: list[str]
+) -> set[str]:
+    """
+    Apply a batch of file operations to the workspace without rebuilding it.
+
+    Removed modules are dropped, added ones are built and the modules directly
+    importing any of them are rebuilt and revalidated once for the whole batch.
+    Modules are compiled in the compile executor and installed on the event
+    loop. Returns the paths of those importers.
+    """
+    importers = get_importers(ls, removed + added) - set(removed) - set(added)
+    remove_modules(ls, removed)
+    await add_modules(ls, added)
+    await rebuild_modules(ls, sorted(importers))
+    for file_path in sorted(importers):
+        uri = f"file://{file_path}"
+        version = get_version(ls, uri)
+        diagnostics = await validate_in_executor(
+            ls,
+            lsp.DidSaveTextDocumentParams(
+                text_document=lsp.TextDocumentIdentifier(uri=uri)
+            ),
+        )
+        publish_diagnostics(ls, uri, diagnostics, version)
+    return importers
+
+
 @LSP_SERVER.feature(
     lsp.WORKSPACE_DID_CREATE_FILES,
     lsp.FileOperationRegistrationOptions(
         filters=[lsp.FileOperationFilter(pattern=lsp.FileOperationPattern("**/*.jac"))]
     ),
 )
-def did_create_files(ls: server.LanguageServer, params: lsp.CreateFilesParams):
+async def did_create_files(ls: server.LanguageServer, params: lsp.CreateFilesParams):
     try:
-        fill_workspace(ls)
+        await _update_workspace_files(
+            ls, [], [_file.uri.replace("file://", "") for _file in params.files]
+        )
     except Exception as e:  # Catch potential errors
         log_error(ls, f"Error during file creation: {e}")
 
@@ -204,30 +397,23 @@ def did_create_files(ls: server.LanguageServer, params: lsp.CreateFilesParams):
         filters=[lsp.FileOperationFilter(pattern=lsp.FileOperationPattern("**/*.jac"))]
     ),
 )
-def did_rename_files(ls: server.LanguageServer, params: lsp.RenameFilesParams):
-    new_uri = params.files[0].new_uri
-    old_uri = params.files[0].old_uri
+async def did_rename_files(ls: server.LanguageServer, params: lsp.RenameFilesParams):
+    """
+    Moves the renamed modules in the workspace and revalidates their importers.
+    """
     try:
-        ls.workspace_filled = False
-        dep_table_copy = ls.dep_table.copy()
-        for doc in dep_table_copy.keys():
-            if dep_table_copy[doc]:
-                for dep in dep_table_copy[doc]:
-                    if dep["uri"] == old_uri:
-                        ls.show_message(
-                            f"Renamed {new_uri} is a dependency of {doc}",
-                            lsp.MessageType.Warning,
-                        )
-                        del ls.dep_table[doc]
-                        # FUTURE TODO: WINDOW_SHOW_MESSAGE_REQUEST is not yet supported by pygls
-                        # request_result = await show_message_request(ls, f"Renamed {new_uri} is a dependency of {doc}. Do you want to change the import statement?", ["Yes", "No"])
-                        request_result = "Yes"
-                        if request_result == "Yes":
-                            # TODO: Handle the rename of the import statement
-                            log_to_output(ls, "Accepted")
-        ls.workspace.remove_text_document(old_uri)
-        del ls.dep_table[old_uri.replace("file://", "")]
-        fill_workspace(ls)
+        old_paths = [_file.old_uri.replace("file://", "") for _file in params.files]
+        new_paths = [_file.new_uri.replace("file://", "") for _file in params.files]
+        for _file in params.files:
+            for doc in get_importers(ls, [_file.old_uri.replace("file://", "")]):
+                ls.show_message(
+                    f"Renamed {_file.new_uri} is a dependency of {doc}",
+                    lsp.MessageType.Warning,
+                )
+                # FUTURE TODO: WINDOW_SHOW_MESSAGE_REQUEST is not yet supported by pygls
+                # request_result = await show_message_request(ls, f"Renamed {new_uri} is a dependency of {doc}. Do you want to change the import statement?", ["Yes", "No"])
+                # TODO: Handle the rename of the import statement
+        await _update_workspace_files(ls, old_paths, new_paths)
     except Exception as e:  # Catch potential errors
         log_error(ls, f"Error during file rename: {e}")
 
@@ -238,28 +424,22 @@ def did_rename_files(ls: server.LanguageServer, params: lsp.RenameFilesParams):
         filters=[lsp.FileOperationFilter(pattern=lsp.FileOperationPattern("**/*.jac"))]
     ),
 )
-def did_delete_files(ls: server.LanguageServer, params: lsp.DeleteFilesParams):
+async def did_delete_files(ls: server.LanguageServer, params: lsp.DeleteFilesParams):
     """
     Removes the specified files from the workspace and dependency table.
-    If a file is a dependency of another file, it will also be removed from the dependency table.
+    Modules importing a deleted file are rebuilt and revalidated.
     """
-    for _file in params.files:
-        try:
-            ls.workspace.remove_text_document(_file.uri)
-            del ls.dep_table[_file.uri.replace("file://", "")]
-            dep_table_copy = ls.dep_table.copy()
-            for doc in dep_table_copy.keys():
-                if dep_table_copy[doc]:
-                    for dep in dep_table_copy[doc]:
-                        if dep["uri"] == _file.uri:
-                            ls.show_message(
-                                f"Deleted {_file.uri} is a dependency of {doc}",
-                                lsp.MessageType.Warning,
-                            )
-                            del ls.dep_table[doc]
-        except Exception as e:  # Catch potential errors
-            log_error(ls, f"Error during file deletion: {e}")
-    fill_workspace(ls)
+    try:
+        deleted = [_file.uri.replace("file://", "") for _file in params.files]
+        for _file in params.files:
+            for doc in get_importers(ls, [_file.uri.replace("file://", "")]):
+                ls.show_message(
+                    f"Deleted {_file.uri} is a dependency of {doc}",
+                    lsp.MessageType.Warning,
+                )
+        await _update_workspace_files(ls, deleted, [])
+    except Exception as e:  # Catch potential errors
+        log_error(ls, f"Error during file deletion: {e}")
 
 
 # Notebook Support
@@ -312,11 +492,20 @@ def formatting(ls, params: lsp.DocumentFormattingParams):
 
 @LSP_SERVER.feature(
     lsp.TEXT_DOCUMENT_COMPLETION,
-    lsp.CompletionOptions(trigger_characters=[".", ":", ""]),
+    lsp.CompletionOptions(trigger_characters=[".", ":", ""], resolve_provider=True),
 )
 def completions(params: Optional[lsp.CompletionParams] = None) -> lsp.CompletionList:
-    completion_items = get_completion_items(LSP_SERVER, params)
-    return lsp.CompletionList(is_incomplete=False, items=completion_items)
+    return get_completion_list(LSP_SERVER, params)
+
+
+@LSP_SERVER.feature(lsp.COMPLETION_ITEM_RESOLVE)
+def completion_item_resolve(ls, item: lsp.CompletionItem) -> lsp.CompletionItem:
+    """Fill in the documentation and detail of a highlighted completion item."""
+    try:
+        return ls.completion_resolver.resolve(item)
+    except Exception as e:
+        log_error(ls, f"Error resolving completion item: {e}")
+        return item
 
 
 # @LSP_SERVER.feature(lsp.TEXT_DOCUMENT_INLINE_COMPLETION)
@@ -367,15 +556,19 @@ def implementation(ls, params: lsp.ImplementationParams):
         log_error(ls, f"Error during implementation: {e}")
 
 
-@LSP_SERVER.feature(lsp.TEXT_DOCUMENT_REFERENCES)
-def references(ls, params: lsp.ReferenceParams):
+@LSP_SERVER.feature(
+    lsp.TEXT_DOCUMENT_REFERENCES, lsp.ReferenceOptions(work_done_progress=True)
+)
+async def references(ls, params: lsp.ReferenceParams):
     try:
         doc = ls.workspace.get_text_document(params.text_document.uri)
         if not hasattr(doc, "symbols"):
             update_doc_tree(ls, doc.uri)
         symbol = get_symbol_at_pos(ls, doc, params.position)
         if symbol is not None:
-            return [s.location for s in symbol.uses(ls)]
+            return await find_references(
+                ls, symbol, params.partial_result_token, params.work_done_token
+            )
     except Exception as e:
         log_error(ls, f"Error during references: {e}")
 
@@ -389,8 +582,6 @@ def hover(ls, params: lsp.HoverParams) -> Optional[lsp.Hover]:
         uri = params.text_document.uri
         position = params.position
         lsp_document = ls.workspace.get_text_document(uri)
-        all_symbols = list(extract_current_doc_symbols(ls, lsp_document, True, True))
-        log_to_output(ls, f"symbols: {all_symbols}")
         return get_hover_info(ls, lsp_document, position)
     except Exception as e:
         log_error(ls, f"Error during hover: {e}")
@@ -403,14 +594,12 @@ def hover(ls, params: lsp.HoverParams) -> Optional[lsp.Hover]:
 def workspace_symbol(
     ls, params: lsp.WorkspaceSymbolParams
 ) -> list[lsp.SymbolInformation]:
-    """Workspace symbols."""
+    """Workspace symbols matching the query, from the symbols of built modules."""
     try:
-        symbols = []
-        for doc in ls.workspace.documents.values():
-            if not hasattr(doc, "symbols"):
-                update_doc_tree(ls, doc.uri)
-            symbols.extend([s.sym_info for s in doc.symbols])
-        return symbols
+        entries, _ = ls.symbol_index.search(
+            params.query, ls.settings.get("workspaceSymbolLimit", 200)
+        )
+        return [entry.symbol.sym_info for entry in entries]
     except Exception as e:
         log_error(ls, f"Error during workspace symbol: {e}")
 
@@ -421,10 +610,7 @@ def document_symbol(ls, params: lsp.DocumentSymbolParams) -> list[lsp.DocumentSy
     try:
         uri = params.text_document.uri
         doc = ls.workspace.get_text_document(uri)
-        if not hasattr(doc, "symbols"):
-            update_doc_tree(ls, doc.uri)
-        doc_syms = [s.doc_sym for s in doc.symbols if not s.do_skip]
-        return doc_syms
+        return get_snapshot(ls, doc).outline
     except Exception as e:
         log_error(ls, f"Error during document symbol: {e}")
 
@@ -439,21 +625,43 @@ def semantic_tokens_full(ls, params: lsp.SemanticTokensParams) -> lsp.SemanticTo
     try:
         uri = params.text_document.uri
         doc = ls.workspace.get_text_document(uri)
-        if not hasattr(doc, "symbols"):
-            update_doc_tree(ls, doc.uri)
-        all_symbols = list(extract_current_doc_symbols(ls, doc, True, True))
-        data = []
-        for sym in all_symbols:
-            if sym.doc_uri != doc.uri:
-                continue
-            data.append(sym.semantic_token)
-        sorted_chunks = sort_chunks_relative_to_previous(data)
-        sementic_tokens = flatten_chunks(sorted_chunks)
-        return lsp.SemanticTokens(sementic_tokens)
+        return get_semantic_tokens(ls, doc)
     except Exception as e:
         log_error(ls, f"Error during semantic tokens: {e}")
 
 
+@LSP_SERVER.feature(
+    lsp.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL_DELTA,
+    lsp.SemanticTokensLegend(
+        token_types=SEMANTIC_TOKEN_TYPES, token_modifiers=SEMANTIC_TOKEN_MODIFIERS
+    ),
+)
+def semantic_tokens_delta(ls, params: lsp.SemanticTokensDeltaParams):
+    try:
+        uri = params.text_document.uri
+        doc = ls.workspace.get_text_document(uri)
+        return get_semantic_tokens_delta(ls, doc, params.previous_result_id)
+    except Exception as e:
+        log_error(ls, f"Error during semantic tokens delta: {e}")
+
+
+@LSP_SERVER.feature(
+    lsp.TEXT_DOCUMENT_SEMANTIC_TOKENS_RANGE,
+    lsp.SemanticTokensLegend(
+        token_types=SEMANTIC_TOKEN_TYPES, token_modifiers=SEMANTIC_TOKEN_MODIFIERS
+    ),
+)
+def semantic_tokens_range(
+    ls, params: lsp.SemanticTokensRangeParams
+) -> lsp.SemanticTokens:
+    try:
+        uri = params.text_document.uri
+        doc = ls.workspace.get_text_document(uri)
+        return get_semantic_tokens_range(ls, doc, params.range)
+    except Exception as e:
+        log_error(ls, f"Error during semantic tokens range: {e}")
+
+
 # Commands
 
 
@@ -510,7 +718,14 @@ def initialize(params: lsp.InitializeParams) -> None:
     setting = _get_settings_by_path(pathlib.Path(os.getcwd()))
     for extra in setting.get("interpreter", []):
         update_sys_path(extra, import_strategy)
-    fill_workspace(LSP_SERVER)
+    _update_compile_workers(LSP_SERVER)
+    _update_python_libraries(LSP_SERVER)
+    if is_lazy_indexing(LSP_SERVER):
+        discover_workspace(LSP_SERVER)
+        return
+    # the workspace is compiled in the background, the first opened document
+    # waits for it
+    start_filling_workspace(LSP_SERVER)
 
 
 @LSP_SERVER.feature(lsp.WORKSPACE_DID_CHANGE_CONFIGURATION)
@@ -524,6 +739,8 @@ def did_change_configuration(ls, params: lsp.DidChangeConfigurationParams):
         )
         _update_workspace_settings(settings)
         ls.settings = WORKSPACE_SETTINGS[os.getcwd()]
+        _update_compile_workers(ls)
+        _update_python_libraries(ls)
         log_to_output(
             ls,
             f"Settings used to run Server:\r\n{json.dumps(settings, indent=4, ensure_ascii=False)}\r\n",
@@ -535,6 +752,37 @@ def did_change_configuration(ls, params: lsp.DidChangeConfigurationParams):
 # Internal functional and settings management APIs.
 
 
+def _update_compile_workers(ls: server.LanguageServer) -> None:
+    """Size the compile executor and start or stop the isolated compilers."""
+    workers = ls.settings.get("maxWorkers", MAX_WORKERS)
+    ls.compile_executor.resize(workers)
+    isolated = ls.settings.get("isolatedCompiles", False)
+    old_pool = ls.worker_pool
+    if old_pool is not None and (not isolated or old_pool.size != workers):
+        ls.worker_pool = None
+        # jobs already running in the old pool complete before its workers stop
+        old_pool.shutdown()
+    if isolated and ls.worker_pool is None:
+        ls.worker_pool = WorkerPool(workers)
+
+
+def _update_python_libraries(ls: server.LanguageServer) -> None:
+    """
+    List the modules of the selected interpreter in the background, and
+    introspect them with it.
+    """
+    interpreter = ls.settings.get("interpreter", [])
+    if interpreter and os.path.isfile(interpreter[0]):
+        python = interpreter[0]
+    else:
+        python = sys.executable
+    ls.py_libs.start(python)
+    introspector = ls.py_introspector
+    if introspector.python != python:
+        ls.py_introspector = ModuleIntrospector(python, introspector.cache_dir)
+        introspector.shutdown()
+
+
 def _get_global_defaults():
     return {
         "interpreter": GLOBAL_SETTINGS.get("interpreter", []),
@@ -550,6 +798,15 @@ def _get_global_defaults():
         "reportingScope": GLOBAL_SETTINGS.get("reportingScope", "file"),
         "showWarnings": GLOBAL_SETTINGS.get("showWarnings", False),
         "typeCheck": GLOBAL_SETTINGS.get("typeCheck", False),
+        "analysisCache": GLOBAL_SETTINGS.get("analysisCache", True),
+        "compileWorkers": GLOBAL_SETTINGS.get("compileWorkers", 0),
+        "indexingMode": GLOBAL_SETTINGS.get("indexingMode", "eager"),
+        "changeValidation": GLOBAL_SETTINGS.get("changeValidation", "semantic"),
+        "semanticIdleDelay": GLOBAL_SETTINGS.get("semanticIdleDelay", 3),
+        "typeCheckIdleDelay": GLOBAL_SETTINGS.get("typeCheckIdleDelay", 10),
+        "maxWorkers": GLOBAL_SETTINGS.get("maxWorkers", MAX_WORKERS),
+        "isolatedCompiles": GLOBAL_SETTINGS.get("isolatedCompiles", False),
+        "workspaceSymbolLimit": GLOBAL_SETTINGS.get("workspaceSymbolLimit", 200),
     }
 
 
@@ -0,0 +1,39 @@
+"""
+Semantic token encoding of the list based helpers versus the array encoder.
+
+    python bundled/tool/tests/benchmarks/bench_semantic_tokens.py [tokens]
+"""
+
+import random
+import sys
+
+from bench_utils import timeit
+from common.semantic_tokens import encode_tokens
+from common.utils import flatten_chunks, sort_chunks_relative_to_previous
+
+
+def make_tokens(count: int) -> list[tuple[int, int, int, int, int]]:
+    """Absolute tokens of a file with about ten identifiers per line, shuffled."""
+    rng = random.Random(0)
+    tokens = [
+        (i // 10, (i % 10) * 8 + rng.randrange(4), rng.randrange(1, 12), i % 9, 0)
+        for i in range(count)
+    ]
+    rng.shuffle(tokens)
+    return tokens
+
+
+def encode_lists(tokens):
+    return flatten_chunks(sort_chunks_relative_to_previous([list(i) for i in tokens]))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    tokens = make_tokens(count)
+    assert encode_tokens(tokens) == encode_lists(tokens)
+
+    lists = timeit(lambda: encode_lists(tokens), repeat=5)
+    arrays = timeit(lambda: encode_tokens(tokens), repeat=5)
+    print(f"{count} tokens")
+    print(f"list encoder: {lists:.1f} ms")
+    print(f"array encoder: {arrays:.1f} ms ({lists / arrays:.1f}x)")
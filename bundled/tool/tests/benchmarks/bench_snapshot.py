@@ -0,0 +1,60 @@
+"""
+Symbol lookups on a large file, from the Symbol objects versus the snapshot.
+
+    python bundled/tool/tests/benchmarks/bench_snapshot.py [archetypes]
+"""
+
+import sys
+import tracemalloc
+
+from lsprotocol.types import Position
+
+from bench_utils import make_workspace, timeit
+from common.utils import get_all_symbols, get_snapshot, is_contained
+
+
+def scan_symbol_at_pos(ls, doc, pos):
+    for sym in get_all_symbols(ls, doc, True, True):
+        if sym.doc_uri == doc.uri and is_contained(sym.location.range, pos):
+            return sym
+    return None
+
+
+def symbol_tokens(ls, doc):
+    return [
+        sym.semantic_token
+        for sym in get_all_symbols(ls, doc, True, True)
+        if sym.doc_uri == doc.uri and sym.node_origin_file == doc.uri
+    ]
+
+
+def build_snapshot(ls, doc):
+    doc.snapshot = None
+    snapshot = get_snapshot(ls, doc)
+    snapshot.records, snapshot.positions, snapshot.tokens
+    return snapshot
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    ls, file_path = make_workspace(count)
+    doc = ls.workspace.get_text_document(f"file://{file_path}")
+    pos = Position(line=len(doc.source.splitlines()) - 2, character=10)
+
+    build = timeit(lambda: build_snapshot(ls, doc))
+    tracemalloc.start()
+    snapshot = build_snapshot(ls, doc)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{file_path}: {len(snapshot.records)} symbols and uses")
+    print(f"snapshot build: {build:.0f} ms, {memory / 2**20:.1f} MiB")
+
+    scan = timeit(lambda: scan_symbol_at_pos(ls, doc, pos))
+    lookup = timeit(lambda: get_snapshot(ls, doc).symbol_at(pos))
+    print(f"symbol at pos, scan:       {scan:.2f} ms")
+    print(f"symbol at pos, snapshot:   {lookup:.4f} ms")
+
+    tokens = timeit(lambda: symbol_tokens(ls, doc))
+    cached = timeit(lambda: get_snapshot(ls, doc).tokens)
+    print(f"semantic tokens, symbols:  {tokens:.1f} ms")
+    print(f"semantic tokens, snapshot: {cached:.4f} ms")
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from mocks import MockLanguageServer  # noqa: E402
+from common.symbols import fill_workspace  # noqa: E402
+
+ARCHETYPE = '''
+"""Shape number {i}."""
+obj Shape{i} {{
+    has name: str = "shape{i}",
+        size: float = {i}.0;
+
+    can area -> float {{
+        result = self.size * self.size;
+        return result;
+    }}
+
+    can scaled(factor: float) -> float {{
+        value = self.area() * factor;
+        return value;
+    }}
+}}
+'''
+
+
+def generate_jac(count: int) -> str:
+    """A syntactically valid jac module with `count` archetypes."""
+    source = '"""Generated benchmark module."""\n'
+    source += "".join(ARCHETYPE.format(i=i) for i in range(count))
+    source += "\nwith entry {\n"
+    source += "".join(f"    print(Shape{i}().scaled(2.0));\n" for i in range(count))
+    source += "}\n"
+    return source
+
+
+def make_workspace(count: int) -> tuple[MockLanguageServer, str]:
+    """A filled workspace holding a single generated module."""
+    root = tempfile.mkdtemp()
+    file_path = os.path.join(root, "large.jac")
+    with open(file_path, "w") as f:
+        f.write(generate_jac(count))
+    ls = MockLanguageServer(root_path=root)
+    ls.settings = {"analysisCache": False}
+    fill_workspace(ls)
+    return ls, file_path
+
+
+def timeit(fn, repeat: int = 3) -> float:
+    """Best wall time of `repeat` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
@@ -0,0 +1,32 @@
+"""
+Keystroke validation latency on a large file.
+
+Compares the previous pipeline (jac_to_errors followed by a second compile in
+Workspace.rebuild_file) with the single compile done by _validate_jac.
+
+    python bundled/tool/tests/benchmarks/bench_validation.py [archetypes]
+"""
+
+import sys
+
+from bench_utils import make_workspace, timeit
+from common.validation import _validate_jac, jac_to_errors
+
+
+def double_compile(ls, file_path, source):
+    errors, warnings = jac_to_errors(file_path, source)
+    if len(errors) == 0:
+        ls.jlws.rebuild_file(file_path, False, source)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    ls, file_path = make_workspace(count)
+    source = ls.jlws.modules[file_path].ir.source.code
+    print(f"{file_path}: {len(source.splitlines())} lines")
+
+    before = timeit(lambda: double_compile(ls, file_path, source))
+    after = timeit(lambda: _validate_jac(ls, file_path, source, True, True))
+    print(f"jac_to_errors + rebuild_file: {before:.0f} ms")
+    print(f"single compile:               {after:.0f} ms")
+    print(f"speedup:                      {before / after:.2f}x")
@@ -1,11 +1,51 @@
+import sys
+import os
+import atexit
+import shutil
+import tempfile
 from unittest.mock import MagicMock
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.archetypes import ArchetypeIndex  # noqa: E402
+from common.completion_resolver import CompletionResolver  # noqa: E402
+from common.executor import CompileExecutor  # noqa: E402
+from common.graph import ImportGraph  # noqa: E402
+from common.introspection import ModuleIntrospector, PythonLibraries  # noqa: E402
+from common.uses import DefUseIndex  # noqa: E402
+from common.symbol_cache import SymbolCache  # noqa: E402
+from common.workspace_symbols import WorkspaceSymbolIndex  # noqa: E402
+
+# tests must not write to the python module cache of the developer either
+CACHE_DIR = tempfile.mkdtemp(prefix="jac-analyzer-tests-")
+atexit.register(shutil.rmtree, CACHE_DIR, True)
+
 
 class MockLanguageServer(MagicMock):
     def __init__(self, root_path, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.workspace = MockWorkspace(root_path)
         self.dep_table = {}
+        self.import_graph = ImportGraph()
+        self.use_index = DefUseIndex()
+        self.symbol_index = WorkspaceSymbolIndex()
+        self.archetype_index = ArchetypeIndex()
+        self.py_introspector = ModuleIntrospector(cache_dir=CACHE_DIR)
+        self.py_libs = PythonLibraries(cache_dir=CACHE_DIR)
+        self.symbol_cache = SymbolCache()
+        self.completion_cache = SymbolCache()
+        self.completion_resolver = CompletionResolver()
+        # tests must not write to the analysis cache of the developer
+        self.settings = {"analysisCache": False}
+        self.analysis_cache = None
+        self.indexing_task = None
+        self.published_versions = {}
+        self.tier_diagnostics = {}
+        self.compile_executor = CompileExecutor(1)
+        self.worker_pool = None
+
+    def _get_child_mock(self, **kwargs):
+        # Attributes like show_message_log are plain mocks, not language servers
+        return MagicMock(**kwargs)
 
 
 class MockWorkspace:
@@ -16,6 +56,9 @@ class MockWorkspace:
     def put_document(self, doc):
         self.documents[doc.uri] = MockDocument(doc)
 
+    def remove_text_document(self, uri):
+        del self.documents[uri]
+
     def get_text_document(self, uri):
         return self.documents[uri]
 
@@ -29,3 +72,11 @@ class MockDocument:
         self.uri = doc.uri
         self.version = doc.version
         self.language_id = doc.language_id
+
+    @property
+    def lines(self):
+        return self.source.splitlines(True)
+
+    def line(self, index):
+        lines = self.source.splitlines()
+        return lines[index] if index < len(lines) else ""
@@ -0,0 +1,119 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import lsprotocol.types as lsp
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.completion import get_completion_items  # noqa: E402
+from common.symbols import (  # noqa: E402
+    fill_workspace,
+    get_symbol_by_name,
+    remove_modules,
+)
+from common.parallel import compile_source  # noqa: E402
+from common.validation import install_module  # noqa: E402
+
+NESTED = """
+obj Outer {
+    has x: int = 1;
+
+    node Inner {
+        has y: int = 2;
+    }
+}
+"""
+
+
+class TestArchetypeIndex(unittest.TestCase):
+    ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+    fill_workspace(ls)
+    module = "bundled/tool/tests/fixtures/format.jac"
+
+    def complete(self, text):
+        params = lsp.CompletionParams(
+            text_document=lsp.TextDocumentIdentifier(uri=f"file://{self.module}"),
+            position=lsp.Position(line=3, character=len(text)),
+        )
+        doc = self.ls.workspace.get_document(params.text_document.uri)
+        prev_source = doc.source
+        doc.source = "\n".join(
+            doc.source.splitlines()[:3] + [text] + doc.source.splitlines()[3:]
+        )
+        try:
+            return [i.insert_text for i in get_completion_items(self.ls, params)]
+        finally:
+            doc.source = prev_source
+
+    def test_lookup(self):
+        index = self.ls.archetype_index
+        walker = index.get_archetype("walker", "GuessGame", [self.module])
+        self.assertEqual(walker.symbol.sym_name, "GuessGame")
+        self.assertEqual(list(walker.abilities), ["start_game", "process_guess"])
+        self.assertIsNone(index.get_archetype("node", "GuessGame", [self.module]))
+        self.assertEqual(
+            [i.symbol.sym_name for i in index.get_archetypes("node", [self.module])],
+            ["turn"],
+        )
+        self.assertEqual(index.get_archetypes("walker", ["missing.jac"]), [])
+
+    def test_symbol_by_name(self):
+        doc = self.ls.workspace.get_text_document(
+            "file://bundled/tool/tests/fixtures/circle.jac"
+        )
+        # archetypes never scan the symbols of the document
+        with patch("common.utils.get_all_symbols", side_effect=AssertionError):
+            self.assertEqual(
+                get_symbol_by_name(self.ls, doc, "Circle").sym_type, "object"
+            )
+            self.assertEqual(
+                get_symbol_by_name(self.ls, doc, "ShapeType", "enum").sym_name,
+                "ShapeType",
+            )
+            self.assertIsNone(get_symbol_by_name(self.ls, doc, "Circle", "walker"))
+        self.assertEqual(get_symbol_by_name(self.ls, doc, "RAD").sym_name, "RAD")
+        self.assertIsNone(get_symbol_by_name(self.ls, doc, "RAD", "ability"))
+
+    def test_completions(self):
+        self.assertEqual(self.complete(":")[:2], ["walker:GuessGame", "node:turn"])
+        self.assertEqual(self.complete(":walker:"), ["GuessGame"])
+        # the :walker: branch still matches the longer prefixes
+        self.assertEqual(
+            self.complete(":walker:GuessGame:"),
+            ["GuessGame", "ability:start_game", "ability:process_guess"],
+        )
+        self.assertEqual(
+            self.complete(":walker:GuessGame:ability:")[-2:],
+            ["start_game", "process_guess"],
+        )
+        self.assertEqual(self.complete(":node:GuessGame:"), ["turn"])
+
+    def test_removed_module(self):
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        fill_workspace(ls)
+        self.assertIn(self.module, ls.archetype_index.modules)
+        remove_modules(ls, [self.module])
+        self.assertNotIn(self.module, ls.archetype_index.modules)
+
+    def test_nested(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "nested.jac")
+            with open(path, "w") as f:
+                f.write(NESTED)
+            ls = MockLanguageServer(root_path=root)
+            fill_workspace(ls)
+            inner = ls.archetype_index.get_archetype("node", "Inner", [path])
+            self.assertIsNotNone(inner)
+            self.assertEqual(inner.symbol.sym_name, "Inner")
+
+    def test_replaced_module(self):
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        fill_workspace(ls)
+        module = compile_source(self.module, "", False)
+        # installed without a document tree update, e.g. saved with errors
+        install_module(ls, self.module, module)
+        walker = ls.archetype_index.get_archetype("walker", "GuessGame", [self.module])
+        self.assertIs(walker.symbol.node.parent_of_type(type(module.ir)), module.ir)
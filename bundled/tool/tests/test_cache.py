@@ -0,0 +1,135 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.symbols import fill_workspace  # noqa: E402
+from common.cache import get_imported_modules  # noqa: E402
+
+SHAPES = """obj Square {
+    has side: int = 1;
+
+    can double() -> int {
+        return self.side + self.side;
+    }
+}
+
+can make() -> Square {
+    return Square();
+}
+"""
+
+AREA = """import:jac shapes;
+
+can area(s: shapes.Square) -> int {
+    return s.side * s.side;
+}
+"""
+
+APP = """import:jac shapes;
+import:jac area;
+
+with entry {
+    print(area.area(shapes.Square()));
+}
+"""
+
+
+class TestAnalysisCache(unittest.TestCase):
+    def test_warm_start(self):
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"LS_CACHE_DIR": cache_dir}
+        ):
+            cold = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+            cold.settings = {"analysisCache": True}
+            fill_workspace(cold)
+            self.assertEqual(cold.analysis_cache.hits, 0)
+            self.assertGreater(cold.analysis_cache.misses, 0)
+
+            warm = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+            warm.settings = {"analysisCache": True}
+            fill_workspace(warm)
+            self.assertEqual(warm.analysis_cache.misses, 0)
+            self.assertEqual(warm.analysis_cache.hits, cold.analysis_cache.misses)
+            self.assertEqual(
+                sorted(warm.jlws.modules.keys()), sorted(cold.jlws.modules.keys())
+            )
+            doc = warm.workspace.get_text_document(
+                "file://bundled/tool/tests/fixtures/circle.jac"
+            )
+            self.assertGreater(len(doc.symbols), 0)
+
+    def test_disabled(self):
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        ls.settings = {"analysisCache": False}
+        fill_workspace(ls)
+        self.assertIsNone(ls.analysis_cache)
+
+    def test_imported_modules(self):
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"LS_CACHE_DIR": cache_dir}
+        ):
+            for name, source in [("shapes", SHAPES), ("area", AREA), ("app", APP)]:
+                with open(os.path.join(root, f"{name}.jac"), "w") as f:
+                    f.write(source)
+            cold = MockLanguageServer(root_path=root)
+            cold.settings = {"analysisCache": True}
+            fill_workspace(cold)
+            # one entry per module, imports are only referenced
+            entries = os.listdir(cold.analysis_cache.cache_dir)
+            self.assertEqual(len(entries), 3)
+
+            warm = MockLanguageServer(root_path=root)
+            warm.settings = {"analysisCache": True}
+            fill_workspace(warm)
+            self.assertEqual(warm.analysis_cache.misses, 0)
+            modules = warm.jlws.modules
+            shapes = modules[os.path.join(root, "shapes.jac")].ir
+            app = get_imported_modules(modules[os.path.join(root, "app.jac")].ir)
+            area = get_imported_modules(modules[os.path.join(root, "area.jac")].ir)
+            self.assertIs(app[os.path.join(root, "shapes.jac")], shapes)
+            self.assertIs(area[os.path.join(root, "shapes.jac")], shapes)
+
+    def test_warm_references(self):
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"LS_CACHE_DIR": cache_dir}
+        ):
+            for name, source in [("shapes", SHAPES), ("area", AREA), ("app", APP)]:
+                with open(os.path.join(root, f"{name}.jac"), "w") as f:
+                    f.write(source)
+
+            def references(ls):
+                # the importers share the IR of shapes.jac on a warm start, its
+                # uses must only be indexed under shapes.jac
+                found = {}
+                for path in ls.jlws.modules:
+                    doc = ls.workspace.get_text_document(f"file://{path}")
+                    for sym in doc.symbols:
+                        if getattr(sym.node, "sym_link", None) is None:
+                            continue  # an imported module
+                        found[(path, sym.sym_name)] = sorted(
+                            (use.doc_uri, use.location.range.start.line)
+                            for use in sym.uses(ls)
+                        )
+                return found
+
+            cold = MockLanguageServer(root_path=root)
+            cold.settings = {"analysisCache": True}
+            fill_workspace(cold)
+            warm = MockLanguageServer(root_path=root)
+            warm.settings = {"analysisCache": True}
+            fill_workspace(warm)
+            self.assertEqual(warm.analysis_cache.misses, 0)
+            expected = references(cold)
+            self.assertEqual(
+                expected[(os.path.join(root, "shapes.jac"), "Square")],
+                [
+                    (f"file://{os.path.join(root, 'shapes.jac')}", line)
+                    for line in (8, 9)
+                ],
+            )
+            self.assertEqual(references(warm), expected)
@@ -1,13 +1,16 @@
 import sys
 import os
+import time
 import unittest
 import lsprotocol.types as lsp
 
 from mocks import MockLanguageServer
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from common.completion import get_completion_items  # noqa: E402
-from common.symbols import fill_workspace  # noqa: E402
+from common.completion import get_completion_items, get_completion_list  # noqa: E402
+from common.completion_resolver import CompletionResolver  # noqa: E402
+from common.symbols import fill_workspace, update_doc_tree  # noqa: E402
+from common.text_document import BufferedTextDocument  # noqa: E402
 
 
 class TestGetCompletionItems(unittest.TestCase):
@@ -23,7 +26,9 @@ class TestGetCompletionItems(unittest.TestCase):
             position=lsp.Position(line=15, character=0),
         )
         completions = get_completion_items(self.ls, params)
-        self.assertEqual(len(completions), 12)
+        keywords = [i for i in completions if i.kind == lsp.CompletionItemKind.Keyword]
+        self.assertEqual(len(keywords), 12)
+        self.assertIn("GuessGame", [i.label for i in completions])
 
     def test_jac_imports(self):
         # Test when last_word is "include:jac"
@@ -56,8 +61,17 @@ class TestGetCompletionItems(unittest.TestCase):
         doc.source = "\n".join(
             doc.source.splitlines()[:3] + ["import:py "] + doc.source.splitlines()[3:]
         )
-        completions = get_completion_items(self.ls, params)
-        doc.source = prev_source  # reset the doc source
+        try:
+            # the request never waits for the modules to be listed
+            start = time.perf_counter()
+            completions = get_completion_list(self.ls, params)
+            self.assertLess(time.perf_counter() - start, 1)
+            if not completions.items:
+                self.assertTrue(completions.is_incomplete)
+            self.ls.py_libs.get(wait=60)
+            completions = get_completion_items(self.ls, params)
+        finally:
+            doc.source = prev_source  # reset the doc source
         self.assertGreater(len(completions), 0)
 
     def test_py_module_imports(self):
@@ -75,6 +89,134 @@ class TestGetCompletionItems(unittest.TestCase):
             + ["import:py from math, "]
             + doc.source.splitlines()[3:]
         )
-        completions = get_completion_items(self.ls, params)
-        doc.source = prev_source
+        try:
+            # the request never waits for the module to be imported
+            start = time.perf_counter()
+            completions = get_completion_list(self.ls, params)
+            self.assertLess(time.perf_counter() - start, 1)
+            if not completions.items:
+                self.assertTrue(completions.is_incomplete)
+            self.ls.py_introspector.get_members("math", wait=30)
+            completions = get_completion_items(self.ls, params)
+        finally:
+            doc.source = prev_source
         self.assertGreater(len(completions), 0)
+
+    def test_identifier_completion(self):
+        params = lsp.CompletionParams(
+            text_document=lsp.TextDocumentIdentifier(
+                uri="file://bundled/tool/tests/fixtures/main.jac"
+            ),
+            position=lsp.Position(line=3, character=7),
+        )
+        doc = self.ls.workspace.get_document(params.text_document.uri)
+        prev_source = doc.source
+        doc.source = "\n".join(
+            doc.source.splitlines()[:3] + ["    sHAp"] + doc.source.splitlines()[3:]
+        )
+        completions = get_completion_list(self.ls, params)
+        misses = self.ls.completion_cache.misses
+        get_completion_list(self.ls, params)
+        doc.source = prev_source
+        labels = {i.label: i for i in completions.items}
+        self.assertEqual(set(labels), {"Shape", "ShapeType"})
+        self.assertEqual(labels["Shape"].kind, lsp.CompletionItemKind.Class)
+        self.assertEqual(labels["Shape"].detail, "circle.jac")
+        self.assertFalse(completions.is_incomplete)
+        self.assertEqual(self.ls.completion_cache.misses, misses)
+        self.assertGreater(self.ls.completion_cache.hits, 0)
+
+    def test_buffered_document(self):
+        uri = "file://bundled/tool/tests/fixtures/main.jac"
+        mock_doc = self.ls.workspace.get_text_document(uri)
+        doc = BufferedTextDocument(uri, mock_doc.source, version=mock_doc.version)
+        doc.apply_change(
+            lsp.TextDocumentContentChangeEvent_Type1(
+                range=lsp.Range(start=lsp.Position(3, 0), end=lsp.Position(3, 0)),
+                text="    sHAp\r\n",
+            )
+        )
+        self.ls.workspace.documents[uri] = doc
+        try:
+            update_doc_tree(self.ls, uri)
+            completions = get_completion_list(
+                self.ls,
+                lsp.CompletionParams(
+                    text_document=lsp.TextDocumentIdentifier(uri=uri),
+                    position=lsp.Position(line=3, character=8),
+                ),
+            )
+            self.assertEqual(
+                {i.label for i in completions.items}, {"Shape", "ShapeType"}
+            )
+            # positions past the last line complete from an empty line
+            get_completion_list(
+                self.ls,
+                lsp.CompletionParams(
+                    text_document=lsp.TextDocumentIdentifier(uri=uri),
+                    position=lsp.Position(line=len(doc.lines) + 5, character=0),
+                ),
+            )
+        finally:
+            self.ls.workspace.documents[uri] = mock_doc
+            update_doc_tree(self.ls, uri)
+
+    def test_completion_cache_invalidation(self):
+        uri = "file://bundled/tool/tests/fixtures/circle.jac"
+        params = lsp.CompletionParams(
+            text_document=lsp.TextDocumentIdentifier(uri=uri),
+            position=lsp.Position(line=0, character=0),
+        )
+        get_completion_items(self.ls, params)
+        misses = self.ls.completion_cache.misses
+        get_completion_items(self.ls, params)
+        self.assertEqual(self.ls.completion_cache.misses, misses)
+        update_doc_tree(self.ls, uri)
+        get_completion_items(self.ls, params)
+        self.assertEqual(self.ls.completion_cache.misses, misses + 1)
+
+    def test_resolve_completion_item(self):
+        params = lsp.CompletionParams(
+            text_document=lsp.TextDocumentIdentifier(
+                uri="file://bundled/tool/tests/fixtures/format.jac"
+            ),
+            position=lsp.Position(line=3, character=1),
+        )
+        doc = self.ls.workspace.get_document(params.text_document.uri)
+        prev_source = doc.source
+        doc.source = "\n".join(
+            doc.source.splitlines()[:3] + [":"] + doc.source.splitlines()[3:]
+        )
+        try:
+            completions = get_completion_items(self.ls, params)
+        finally:
+            doc.source = prev_source
+        item = next(i for i in completions if i.insert_text == "walker:GuessGame")
+        self.assertIsNone(item.documentation)
+        self.assertIsNotNone(item.data)
+        resolved = self.ls.completion_resolver.resolve(item)
+        self.assertEqual(resolved.detail, "(walker) GuessGame")
+
+
+class TestCompletionResolver(unittest.TestCase):
+    def test_resolve(self):
+        resolver = CompletionResolver()
+        resolver.reset()
+        item = resolver.defer(
+            lsp.CompletionItem(label="area"),
+            documentation=lambda: "Area of the shape.",
+            detail=lambda: "(ability) area",
+        )
+        self.assertIsNone(item.documentation)
+        item = resolver.resolve(item)
+        self.assertEqual(item.documentation, "Area of the shape.")
+        self.assertEqual(item.detail, "(ability) area")
+
+    def test_stale_item(self):
+        resolver = CompletionResolver()
+        item = resolver.defer(
+            lsp.CompletionItem(label="area"), documentation=lambda: "Area."
+        )
+        resolver.reset()
+        self.assertIsNone(resolver.resolve(item).documentation)
+        self.assertIsNone(resolver.resolve(lsp.CompletionItem(label="x")).detail)
@@ -1,18 +1,43 @@
+import asyncio
 import sys
 import os
 import unittest
 from unittest.mock import MagicMock
 
+from lsprotocol.types import Diagnostic, Position, Range
 from mocks import MockLanguageServer
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from common.validation import validate  # noqa: E402
 from common.symbols import fill_workspace  # noqa: E402
+from common.validation import (  # noqa: E402
+    SEMANTIC_TIER,
+    SYNTAX_TIER,
+    merge_tier_diagnostics,
+    publish_diagnostics,
+    validate,
+    validate_in_executor,
+)
 
 
 class TestValidate(unittest.TestCase):
     ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
     fill_workspace(ls)
+    circle_uri = "file://bundled/tool/tests/fixtures/circle.jac"
+    circle_path = "bundled/tool/tests/fixtures/circle.jac"
+
+    def setUp(self):
+        doc = self.ls.workspace.get_text_document(self.circle_uri)
+        self.settings = self.ls.settings
+        self.circle = self.ls.jlws.modules[self.circle_path]
+        self.circle_version = doc.version
+
+    def tearDown(self):
+        doc = self.ls.workspace.get_text_document(self.circle_uri)
+        self.ls.settings = self.settings
+        self.ls.jlws.modules[self.circle_path] = self.circle
+        doc.version = self.circle_version
+        self.ls.published_versions.clear()
+        self.ls.tier_diagnostics.clear()
 
     def test_validate(self):
         self.ls.settings = {"showWarning": True}
@@ -22,3 +47,84 @@ class TestValidate(unittest.TestCase):
         )
         daignostics = validate(self.ls, mock_params)
         self.assertGreater(len(daignostics), 0)
+
+    def test_syntax_tier(self):
+        self.ls.settings = {"showWarning": True}
+        mock_params = MagicMock()
+        mock_params.text_document.uri = (
+            "file://bundled/tool/tests/fixtures/validate.jac"
+        )
+        diagnostics = validate(self.ls, mock_params, True, True, SYNTAX_TIER)
+        self.assertGreater(len(diagnostics), 0)
+
+        # the parser alone never replaces the module of the workspace
+        mock_params.text_document.uri = "file://bundled/tool/tests/fixtures/circle.jac"
+        module = self.ls.jlws.modules["bundled/tool/tests/fixtures/circle.jac"]
+        validate(self.ls, mock_params, True, True, SYNTAX_TIER)
+        self.assertIs(
+            self.ls.jlws.modules["bundled/tool/tests/fixtures/circle.jac"], module
+        )
+        validate(self.ls, mock_params, True, True, SEMANTIC_TIER)
+        self.assertIsNot(
+            self.ls.jlws.modules["bundled/tool/tests/fixtures/circle.jac"], module
+        )
+
+    def test_stale_version(self):
+        uri = "file://bundled/tool/tests/fixtures/circle.jac"
+        doc = self.ls.workspace.get_text_document(uri)
+        doc.version = 3
+        mock_params = MagicMock()
+        mock_params.text_document.uri = uri
+        module = self.ls.jlws.modules["bundled/tool/tests/fixtures/circle.jac"]
+        # a job started on version 2 must not replace the module of version 3
+        validate(self.ls, mock_params, True, True, SEMANTIC_TIER, 2)
+        self.assertIs(
+            self.ls.jlws.modules["bundled/tool/tests/fixtures/circle.jac"], module
+        )
+
+        self.assertTrue(publish_diagnostics(self.ls, uri, [], 3))
+        self.assertFalse(publish_diagnostics(self.ls, uri, [], 2))
+        self.assertTrue(publish_diagnostics(self.ls, uri, [], 3))
+        self.assertEqual(self.ls.published_versions[uri], 3)
+
+    def test_install_on_loop(self):
+        mock_params = MagicMock()
+        mock_params.text_document.uri = self.circle_uri
+        doc = self.ls.workspace.get_text_document(self.circle_uri)
+        doc.version = 3
+        # the job only builds the module, it is installed once it completes
+        diagnostics = asyncio.run(
+            validate_in_executor(self.ls, mock_params, True, True, SEMANTIC_TIER, 2)
+        )
+        self.assertEqual(diagnostics, [])
+        self.assertIs(self.ls.jlws.modules[self.circle_path], self.circle)
+        asyncio.run(
+            validate_in_executor(self.ls, mock_params, True, True, SEMANTIC_TIER, 3)
+        )
+        self.assertIsNot(self.ls.jlws.modules[self.circle_path], self.circle)
+
+    def test_merge_tiers(self):
+        def diagnostic(message):
+            return Diagnostic(
+                range=Range(start=Position(0, 0), end=Position(0, 1)), message=message
+            )
+
+        uri = self.circle_uri
+        parsed, semantic = diagnostic("parse"), diagnostic("semantic")
+        merge_tier_diagnostics(self.ls, uri, [parsed], 2, SYNTAX_TIER)
+        # the semantic passes report the errors of the parser again
+        self.assertEqual(
+            merge_tier_diagnostics(self.ls, uri, [parsed, semantic], 2, SEMANTIC_TIER),
+            [parsed, semantic],
+        )
+        # keystrokes keep the semantic errors until the next semantic result
+        self.assertEqual(
+            merge_tier_diagnostics(self.ls, uri, [], 3, SYNTAX_TIER), [semantic]
+        )
+        other = diagnostic("other")
+        self.assertEqual(
+            merge_tier_diagnostics(self.ls, uri, [other], 4, SYNTAX_TIER),
+            [other, semantic],
+        )
+        self.assertEqual(merge_tier_diagnostics(self.ls, uri, [], 4, SEMANTIC_TIER), [])
+        self.assertEqual(merge_tier_diagnostics(self.ls, uri, [], 5, SYNTAX_TIER), [])
@@ -0,0 +1,40 @@
+import sys
+import os
+import asyncio
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.executor import CompileExecutor  # noqa: E402
+
+
+class TestCompileExecutor(unittest.TestCase):
+    def test_run(self):
+        executor = CompileExecutor(2)
+
+        async def jobs():
+            return await asyncio.gather(
+                executor.run(sum, [1, 2]), executor.run(max, 3, 4)
+            )
+
+        self.assertEqual(asyncio.run(jobs()), [3, 4])
+        self.assertEqual(executor.stats["submitted"], 2)
+        self.assertEqual(executor.stats["pending"], 0)
+        self.assertEqual(executor.stats["failed"], 0)
+        executor.shutdown()
+
+    def test_failure(self):
+        executor = CompileExecutor(1)
+        with self.assertRaises(ZeroDivisionError):
+            executor.submit(divmod, 1, 0).result()
+        self.assertEqual(executor.failed, 1)
+        self.assertEqual(executor.pending, 0)
+        executor.shutdown()
+
+    def test_resize(self):
+        executor = CompileExecutor(1)
+        future = executor.submit(sum, [1])
+        executor.resize(3)
+        self.assertEqual(future.result(), 1)
+        self.assertEqual(executor.stats["workers"], 3)
+        self.assertEqual(executor.submit(sum, [2]).result(), 2)
+        executor.shutdown()
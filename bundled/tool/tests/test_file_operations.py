@@ -0,0 +1,103 @@
+import asyncio
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lsp_server import (  # noqa: E402
+    did_create_files,
+    did_delete_files,
+    did_rename_files,
+)
+from common.symbols import fill_workspace, load_module  # noqa: E402
+
+SHAPES = '''"""Shapes."""
+
+obj Square {
+    has side: int = 1;
+}
+'''
+
+APP = '''"""App."""
+
+include:jac shapes;
+
+with entry {
+    s = Square();
+}
+'''
+
+
+class TestFileOperations(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for name, source in [("shapes.jac", SHAPES), ("app.jac", APP)]:
+            with open(os.path.join(self.root, name), "w") as f:
+                f.write(source)
+        self.ls = MockLanguageServer(root_path=self.root)
+        self.ls.settings = {"analysisCache": False}
+        fill_workspace(self.ls)
+        self.app = os.path.join(self.root, "app.jac")
+        self.shapes = os.path.join(self.root, "shapes.jac")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_delete_rebuilds_importers_only(self):
+        self.assertEqual(len(self.ls.jlws.modules[self.app].errors), 0)
+        os.remove(self.shapes)
+        params = MagicMock()
+        params.files = [MagicMock(uri=f"file://{self.shapes}")]
+        asyncio.run(did_delete_files(self.ls, params))
+
+        self.assertNotIn(self.shapes, self.ls.jlws.modules)
+        self.assertNotIn(f"file://{self.shapes}", self.ls.workspace.documents)
+        self.assertGreater(len(self.ls.jlws.modules[self.app].errors), 0)
+        self.ls.publish_diagnostics.assert_called_once()
+        self.assertEqual(
+            self.ls.publish_diagnostics.call_args[0][0], f"file://{self.app}"
+        )
+
+    def test_create(self):
+        new_file = os.path.join(self.root, "circle.jac")
+        with open(new_file, "w") as f:
+            f.write(SHAPES.replace("Square", "Circle"))
+        params = MagicMock()
+        params.files = [MagicMock(uri=f"file://{new_file}")]
+        asyncio.run(did_create_files(self.ls, params))
+
+        self.assertIn(new_file, self.ls.jlws.modules)
+        doc = self.ls.workspace.get_text_document(f"file://{new_file}")
+        self.assertIn("Circle", [s.sym_name for s in doc.symbols])
+        self.ls.publish_diagnostics.assert_not_called()
+
+    def test_rename_compiles_in_executor(self):
+        renamed = os.path.join(self.root, "square.jac")
+        os.rename(self.shapes, renamed)
+        threads = []
+
+        def load(ls, file_path):
+            threads.append(threading.current_thread())
+            return load_module(ls, file_path)
+
+        params = MagicMock()
+        params.files = [
+            MagicMock(old_uri=f"file://{self.shapes}", new_uri=f"file://{renamed}")
+        ]
+        submitted = self.ls.compile_executor.submitted
+        with patch("common.symbols.load_module", side_effect=load):
+            asyncio.run(did_rename_files(self.ls, params))
+
+        self.assertIn(renamed, self.ls.jlws.modules)
+        self.assertNotIn(self.shapes, self.ls.jlws.modules)
+        # the new module and its importer, then the importer is revalidated
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.main_thread(), threads)
+        self.assertEqual(self.ls.compile_executor.submitted, submitted + 3)
+        self.assertGreater(len(self.ls.jlws.modules[self.app].errors), 0)
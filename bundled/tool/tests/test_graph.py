@@ -0,0 +1,36 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.graph import ImportGraph  # noqa: E402
+
+
+class TestImportGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = ImportGraph()
+        self.graph.set_imports("app.jac", ["shapes.jac", "utils.jac"])
+        self.graph.set_imports("shapes.jac", ["utils.jac"])
+        self.graph.set_imports("cli.jac", ["app.jac"])
+
+    def test_importers(self):
+        self.assertEqual(
+            self.graph.get_importers("utils.jac"), {"app.jac", "shapes.jac"}
+        )
+        self.graph.set_imports("app.jac", ["shapes.jac"])
+        self.assertEqual(self.graph.get_importers("utils.jac"), {"shapes.jac"})
+
+    def test_transitive(self):
+        self.assertEqual(
+            self.graph.get_dependents(["utils.jac"]),
+            {"app.jac", "shapes.jac", "cli.jac"},
+        )
+        self.assertEqual(
+            self.graph.get_dependencies(["cli.jac"]),
+            {"app.jac", "shapes.jac", "utils.jac"},
+        )
+
+    def test_remove_module(self):
+        self.graph.remove_module("shapes.jac")
+        self.assertEqual(self.graph.get_importers("utils.jac"), {"app.jac"})
+        self.assertEqual(self.graph.get_importers("shapes.jac"), {"app.jac"})
@@ -0,0 +1,59 @@
+import sys
+import os
+import asyncio
+import unittest
+
+from lsprotocol.types import TextDocumentItem
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.indexing import index_document, index_workspace, is_indexed  # noqa: E402
+from common.symbols import discover_workspace  # noqa: E402
+from lsp_server import start_filling_workspace  # noqa: E402
+
+
+class TestLazyIndexing(unittest.TestCase):
+    def test_open_file_first(self):
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        ls.settings["indexingMode"] = "lazy"
+        discover_workspace(ls)
+        self.assertFalse(any(is_indexed(ls, i) for i in ls.jlws.file_list()))
+
+        asyncio.run(index_document(ls, "file://bundled/tool/tests/fixtures/circle.jac"))
+        self.assertTrue(is_indexed(ls, "bundled/tool/tests/fixtures/circle.jac"))
+        self.assertFalse(is_indexed(ls, "bundled/tool/tests/fixtures/main.jac"))
+        doc = ls.workspace.get_text_document(
+            "file://bundled/tool/tests/fixtures/circle.jac"
+        )
+        self.assertGreater(len(doc.symbols), 0)
+
+        asyncio.run(index_workspace(ls))
+        self.assertTrue(ls.workspace_filled)
+        self.assertTrue(all(is_indexed(ls, i) for i in ls.jlws.file_list()))
+        self.assertIn(
+            "file://bundled/tool/tests/fixtures/main.jac", ls.workspace.documents
+        )
+
+
+class TestWorkspaceFill(unittest.TestCase):
+    def test_keeps_open_documents(self):
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        ls.fill_future = None
+        uri = "file://bundled/tool/tests/fixtures/circle.jac"
+        with open("bundled/tool/tests/fixtures/circle.jac") as f:
+            source = f.read() + "\n# unsaved\n"
+
+        async def open_while_filling():
+            fill = start_filling_workspace(ls)
+            ls.workspace.put_document(
+                TextDocumentItem(uri=uri, language_id="jac", version=3, text=source)
+            )
+            await fill
+
+        asyncio.run(open_while_filling())
+        self.assertTrue(ls.workspace_filled)
+        doc = ls.workspace.get_text_document(uri)
+        self.assertEqual(doc.source, source)
+        self.assertEqual(doc.version, 3)
+        self.assertGreater(len(doc.symbols), 0)
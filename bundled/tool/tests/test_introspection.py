@@ -0,0 +1,177 @@
+import sys
+import os
+import lsprotocol.types as lsp
+import sysconfig
+import tempfile
+import unittest
+import venv
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from mocks import MockLanguageServer  # noqa: E402
+from lsp_server import _update_python_libraries  # noqa: E402
+from common.completion import get_completion_items  # noqa: E402
+from common.symbols import fill_workspace  # noqa: E402
+from common.introspection import (  # noqa: E402
+    ModuleIntrospector,
+    PythonLibraries,
+    describe_module,
+    sys_path_fingerprint,
+)
+
+
+def make_environment() -> tuple[str, str]:
+    """
+    An isolated environment, which does not see the packages of the server.
+    Returns its interpreter and its site-packages directory.
+    """
+    root = tempfile.mkdtemp()
+    venv.create(root, with_pip=False, symlinks=sys.platform != "win32")
+    paths = sysconfig.get_paths(vars={"base": root, "platbase": root})
+    python = os.path.join(
+        root, "Scripts" if sys.platform == "win32" else "bin", "python"
+    )
+    return python, paths["purelib"]
+
+
+class TestModuleIntrospector(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        patcher = mock.patch.dict(os.environ, {"LS_CACHE_DIR": self.cache_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_describe_module(self):
+        members = {i.name: i for i in describe_module("json")}
+        self.assertEqual(members["dumps"].kind, "function")
+        self.assertEqual(members["JSONDecoder"].kind, "class")
+        self.assertEqual(members["decoder"].kind, "module")
+        self.assertIn("JSON", members["dumps"].doc)
+
+    def test_subprocess(self):
+        introspector = ModuleIntrospector()
+        # prints on import, and must not be imported in the server process
+        members = introspector.get_members("this", wait=30)
+        self.assertIn("s", [i.name for i in members])
+        self.assertNotIn("this", sys.modules)
+        self.assertIs(introspector.get_members("this"), members)
+        self.assertEqual(introspector.stats["misses"], 1)
+        self.assertEqual(introspector.stats["hits"], 1)
+
+    def test_disk_cache(self):
+        members = ModuleIntrospector().get_members("colorsys", wait=30)
+        introspector = ModuleIntrospector()
+        with mock.patch.object(introspector, "_introspect") as introspect:
+            self.assertEqual(introspector.get_members("colorsys"), members)
+            introspect.assert_not_called()
+        self.assertEqual(introspector.stats["hits"], 1)
+
+    def test_missing_module(self):
+        introspector = ModuleIntrospector()
+        self.assertEqual(introspector.get_members("no_such_module_anywhere"), [])
+
+    def test_other_interpreter(self):
+        # an environment with a module the server can not import, and without
+        # the packages of the server
+        interpreter, site = make_environment()
+        with open(os.path.join(site, "only_there.py"), "w") as f:
+            f.write("def hello():\n    pass\n")
+        self.assertEqual(ModuleIntrospector().get_members("only_there", wait=30), [])
+        introspector = ModuleIntrospector(interpreter)
+        members = introspector.get_members("only_there", wait=30)
+        self.assertIn("hello", [i.name for i in members])
+        self.assertIsNone(introspector.key("jaclang"))
+        self.assertEqual(introspector.get_members("jaclang", wait=30), [])
+        self.assertNotEqual(ModuleIntrospector().get_members("jaclang", wait=30), [])
+
+    def test_pending(self):
+        introspector = ModuleIntrospector()
+        self.assertIsNone(introspector.get_members("wave", wait=0))
+        members = introspector.get_members("wave", wait=30)
+        self.assertIn("open", [i.name for i in members])
+        self.assertEqual(introspector.stats["misses"], 1)
+
+
+class TestPythonLibraries(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        patcher = mock.patch.dict(os.environ, {"LS_CACHE_DIR": self.cache_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_in_process(self):
+        libs = PythonLibraries()
+        modules = libs.get(wait=60)
+        self.assertIn("json", modules)
+        self.assertEqual(libs.interpreter, sys.executable)
+        future = libs._future
+        libs.start(sys.executable)
+        self.assertIs(libs._future, future)
+
+    def test_disk_cache(self):
+        modules = PythonLibraries().get(wait=60)
+        with mock.patch("common.introspection.list_modules") as list_modules:
+            self.assertEqual(PythonLibraries().get(wait=60), modules)
+            list_modules.assert_not_called()
+
+    def test_other_interpreter(self):
+        interpreter = os.path.join(tempfile.mkdtemp(), "python")
+        os.symlink(sys.executable, interpreter)
+        libs = PythonLibraries()
+        libs.start(interpreter)
+        self.assertEqual(libs.interpreter, interpreter)
+        self.assertIn("json", libs.get(wait=60))
+
+    def test_fingerprint(self):
+        path = tempfile.mkdtemp()
+        fingerprint = sys_path_fingerprint("python", [path])
+        self.assertEqual(sys_path_fingerprint("python", [path]), fingerprint)
+        self.assertNotEqual(sys_path_fingerprint("python3", [path]), fingerprint)
+        os.mkdir(os.path.join(path, "new_package"))
+        os.utime(path, ns=(0, 0))
+        self.assertNotEqual(sys_path_fingerprint("python", [path]), fingerprint)
+
+
+class TestInterpreterSetting(unittest.TestCase):
+    def test_switch_interpreter(self):
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        interpreter = os.path.join(tempfile.mkdtemp(), "python")
+        os.symlink(sys.executable, interpreter)
+        ls.settings = {"interpreter": [interpreter]}
+        _update_python_libraries(ls)
+        # modules listed from an interpreter are introspected with it
+        self.assertEqual(ls.py_libs.interpreter, interpreter)
+        self.assertEqual(ls.py_introspector.python, interpreter)
+        self.assertEqual(ls.py_introspector.cache_dir, ls.py_libs.cache_dir)
+        ls.settings = {}
+        _update_python_libraries(ls)
+        self.assertEqual(ls.py_introspector.python, sys.executable)
+
+    def test_completions_with_selected_interpreter(self):
+        # member completions come from the selected environment, which does not
+        # see the paths of the server
+        interpreter, site = make_environment()
+        with open(os.path.join(site, "only_there.py"), "w") as f:
+            f.write("def hello():\n    pass\n")
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        fill_workspace(ls)
+        ls.settings = {"analysisCache": False, "interpreter": [interpreter]}
+        _update_python_libraries(ls)
+        self.assertEqual(ls.py_introspector.get_members("jaclang", wait=30), [])
+        ls.py_introspector.get_members("only_there", wait=30)
+
+        uri = "file://bundled/tool/tests/fixtures/main.jac"
+        doc = ls.workspace.get_text_document(uri)
+        doc.source = "\n".join(
+            doc.source.splitlines()[:3]
+            + ["import:py from only_there, "]
+            + doc.source.splitlines()[3:]
+        )
+        completions = get_completion_items(
+            ls,
+            lsp.CompletionParams(
+                text_document=lsp.TextDocumentIdentifier(uri=uri),
+                position=lsp.Position(line=3, character=27),
+            ),
+        )
+        self.assertIn("hello", [i.label for i in completions])
@@ -0,0 +1,79 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.symbols import fill_workspace  # noqa: E402
+from common.parallel import import_waves  # noqa: E402
+
+
+class TestParallelCompile(unittest.TestCase):
+    def test_import_waves(self):
+        imports = {"a": {"b", "c"}, "b": {"c"}, "c": set(), "d": set()}
+        self.assertEqual(
+            import_waves(["c", "b", "a", "d"], imports), [["c", "d"], ["b"], ["a"]]
+        )
+
+    def test_import_cycle(self):
+        imports = {"a": {"b"}, "b": {"a"}}
+        self.assertEqual(import_waves(["a", "b"], imports), [["a"], ["b"]])
+
+    def test_matches_serial_build(self):
+        serial = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        serial.settings = {"analysisCache": False}
+        fill_workspace(serial)
+        parallel = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        parallel.settings = {"analysisCache": False, "compileWorkers": 2}
+        with patch("common.symbols.PARALLEL_MIN_MODULES", 1), patch(
+            "os.cpu_count", return_value=2
+        ):
+            fill_workspace(parallel)
+
+        self.assertEqual(serial.jlws.modules.keys(), parallel.jlws.modules.keys())
+        for mod_path, mod_info in serial.jlws.modules.items():
+            self.assertEqual(
+                len(mod_info.errors), len(parallel.jlws.modules[mod_path].errors)
+            )
+        uri = "file://bundled/tool/tests/fixtures/circle.jac"
+        self.assertEqual(
+            [s.sym_name for s in serial.workspace.get_text_document(uri).symbols],
+            [s.sym_name for s in parallel.workspace.get_text_document(uri).symbols],
+        )
+
+    def test_cache_hits_skip_workers(self):
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"LS_CACHE_DIR": cache_dir}
+        ), patch("common.symbols.PARALLEL_MIN_MODULES", 1), patch(
+            "os.cpu_count", return_value=2
+        ):
+            cold = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+            cold.settings = {"analysisCache": True, "compileWorkers": 2}
+            fill_workspace(cold)
+            warm = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+            warm.settings = {"analysisCache": True, "compileWorkers": 2}
+            with patch("common.symbols.WorkerPool", side_effect=AssertionError):
+                fill_workspace(warm)
+            self.assertEqual(warm.analysis_cache.misses, 0)
+            self.assertTrue(all(i.ir for i in warm.jlws.modules.values()))
+
+    def test_serial_on_single_cpu(self):
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        ls.settings = {"analysisCache": False, "compileWorkers": 4}
+        with patch("common.symbols.PARALLEL_MIN_MODULES", 1), patch(
+            "os.cpu_count", return_value=1
+        ), patch("common.symbols.WorkerPool", side_effect=AssertionError):
+            fill_workspace(ls)
+        self.assertTrue(all(i.ir for i in ls.jlws.modules.values()))
+
+    def test_serial_for_few_misses(self):
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        ls.settings = {"analysisCache": False, "compileWorkers": 4}
+        with patch("os.cpu_count", return_value=4), patch(
+            "common.symbols.WorkerPool", side_effect=AssertionError
+        ):
+            fill_workspace(ls)
+        self.assertTrue(all(i.ir for i in ls.jlws.modules.values()))
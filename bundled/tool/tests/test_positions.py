@@ -0,0 +1,50 @@
+import sys
+import os
+import unittest
+
+from lsprotocol.types import Position
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.symbols import fill_workspace, update_doc_tree  # noqa: E402
+from common.utils import (  # noqa: E402
+    get_all_symbols,
+    get_snapshot,
+    get_symbol_at_pos,
+    is_contained,
+)
+
+
+class TestPositionIndex(unittest.TestCase):
+    ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+    fill_workspace(ls)
+    uri = "file://bundled/tool/tests/fixtures/circle.jac"
+
+    def scan(self, doc, pos):
+        for sym in get_all_symbols(self.ls, doc, True, True):
+            if sym.doc_uri == doc.uri and is_contained(sym.location.range, pos):
+                return sym
+        return None
+
+    def test_matches_linear_scan(self):
+        doc = self.ls.workspace.get_text_document(self.uri)
+        found = 0
+        for line, text in enumerate(doc.source.splitlines()):
+            for character in range(len(text) + 1):
+                pos = Position(line=line, character=character)
+                expected = self.scan(doc, pos)
+                sym = get_symbol_at_pos(self.ls, doc, pos)
+                if expected is None:
+                    self.assertIsNone(sym)
+                    continue
+                found += 1
+                self.assertEqual(sym.location, expected.location)
+                self.assertEqual(sym.sym_name, expected.sym_name)
+        self.assertGreater(found, 0)
+
+    def test_rebuilt_on_symbol_change(self):
+        doc = self.ls.workspace.get_text_document(self.uri)
+        snapshot = get_snapshot(self.ls, doc)
+        self.assertIs(get_snapshot(self.ls, doc), snapshot)
+        update_doc_tree(self.ls, self.uri)
+        self.assertIsNot(get_snapshot(self.ls, doc), snapshot)
@@ -0,0 +1,68 @@
+import asyncio
+import sys
+import os
+import unittest
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+from lsprotocol.types import Position
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lsp_server import references  # noqa: E402
+from common.symbols import fill_workspace  # noqa: E402
+from common.utils import get_symbol_at_pos  # noqa: E402
+
+
+class TestReferences(unittest.TestCase):
+    ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+    fill_workspace(ls)
+    uri = "file://bundled/tool/tests/fixtures/circle.jac"
+
+    def setUp(self):
+        self.ls.progress = MagicMock(tokens={})
+        self.ls.send_notification = MagicMock()
+
+    def find(self, partial_result_token=None, work_done_token=None):
+        params = MagicMock()
+        params.position = Position(line=8, character=5)
+        params.text_document.uri = self.uri
+        params.partial_result_token = partial_result_token
+        params.work_done_token = work_done_token
+        return asyncio.run(references(self.ls, params))
+
+    def expected(self):
+        doc = self.ls.workspace.get_text_document(self.uri)
+        symbol = get_symbol_at_pos(self.ls, doc, Position(line=8, character=5))
+        return [s.location for s in symbol.uses(self.ls)]
+
+    def test_references(self):
+        locations = self.find()
+        self.assertEqual(locations, self.expected())
+        self.assertGreaterEqual(len(locations), 6)
+        self.ls.send_notification.assert_not_called()
+
+    def test_partial_results(self):
+        self.assertEqual(self.find(partial_result_token="partial"), [])
+        streamed = []
+        for call in self.ls.send_notification.call_args_list:
+            method, params = call.args
+            self.assertEqual(method, "$/progress")
+            self.assertEqual(params.token, "partial")
+            streamed.extend(params.value)
+        self.assertEqual(streamed, self.expected())
+
+    def test_work_done_progress(self):
+        self.find(work_done_token="progress")
+        self.ls.progress.begin.assert_called_once()
+        self.ls.progress.report.assert_called()
+        self.ls.progress.end.assert_called_once()
+
+    def test_cancelled_progress(self):
+        cancelled = Future()
+        cancelled.cancel()
+        self.ls.progress.tokens["progress"] = cancelled
+        self.ls.progress.begin.side_effect = lambda token, value: None
+        self.assertEqual(self.find(work_done_token="progress"), [])
+        self.ls.progress.end.assert_called_once()
+        self.assertNotIn("progress", self.ls.progress.tokens)
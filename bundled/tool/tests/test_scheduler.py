@@ -0,0 +1,60 @@
+import sys
+import os
+import asyncio
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.scheduler import DebounceScheduler  # noqa: E402
+
+
+class TestDebounceScheduler(unittest.TestCase):
+    def test_debounce_per_document(self):
+        calls = []
+        scheduler = DebounceScheduler(delay=0.01)
+
+        async def edit():
+            scheduler.schedule("file://a.jac", calls.append, "a1")
+            scheduler.schedule("file://b.jac", calls.append, "b1")
+            scheduler.schedule("file://a.jac", calls.append, "a2")
+            await asyncio.sleep(0.05)
+
+        asyncio.run(edit())
+        self.assertEqual(sorted(calls), ["a2", "b1"])
+        self.assertFalse(scheduler.is_pending("file://a.jac"))
+
+    def test_delay_override(self):
+        calls = []
+        scheduler = DebounceScheduler(delay=10)
+
+        async def edit():
+            scheduler.schedule("file://a.jac", calls.append, "a", delay=0.01)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(edit())
+        self.assertEqual(calls, ["a"])
+
+    def test_coroutine(self):
+        calls = []
+        scheduler = DebounceScheduler(delay=0.01)
+
+        async def job(name):
+            await asyncio.sleep(0.02)
+            calls.append(name)
+
+        async def edit():
+            scheduler.schedule("file://a.jac", job, "a")
+            await asyncio.sleep(0.1)
+
+        asyncio.run(edit())
+        self.assertEqual(calls, ["a"])
+        self.assertGreaterEqual(scheduler.compile_times["file://a.jac"], 0.02)
+
+    def test_adaptive_delay(self):
+        scheduler = DebounceScheduler(delay=2, min_delay=0.25, max_delay=5, factor=1.5)
+        self.assertEqual(scheduler.get_delay("file://a.jac"), 2)
+        scheduler.record("file://a.jac", 0.01)
+        self.assertEqual(scheduler.get_delay("file://a.jac"), 0.25)
+        scheduler.record("file://b.jac", 2)
+        self.assertEqual(scheduler.get_delay("file://b.jac"), 3)
+        scheduler.record("file://c.jac", 10)
+        self.assertEqual(scheduler.get_delay("file://c.jac"), 5)
@@ -0,0 +1,109 @@
+import sys
+import os
+import random
+import unittest
+
+from lsprotocol.types import Position, Range
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.symbols import fill_workspace  # noqa: E402
+from common.semantic_tokens import (  # noqa: E402
+    diff_tokens,
+    encode_tokens,
+    get_semantic_tokens,
+    get_semantic_tokens_delta,
+    get_semantic_tokens_range,
+)
+from common.utils import (  # noqa: E402
+    flatten_chunks,
+    get_snapshot,
+    sort_chunks_relative_to_previous,
+)
+
+
+def apply_edits(data, edits):
+    data = list(data)
+    for edit in sorted(edits, key=lambda i: i.start, reverse=True):
+        data[edit.start : edit.start + edit.delete_count] = edit.data or []
+    return data
+
+
+class TestSemanticTokens(unittest.TestCase):
+    ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+    fill_workspace(ls)
+    doc = ls.workspace.get_text_document(
+        "file://bundled/tool/tests/fixtures/circle.jac"
+    )
+
+    def test_full(self):
+        tokens = get_semantic_tokens(self.ls, self.doc)
+        expected = flatten_chunks(
+            sort_chunks_relative_to_previous(
+                [list(i) for i in get_snapshot(self.ls, self.doc).tokens]
+            )
+        )
+        self.assertEqual(tokens.data, expected)
+        self.assertEqual(len(tokens.data), 300)
+        self.assertIsNotNone(tokens.result_id)
+
+    def test_delta_unchanged(self):
+        tokens = get_semantic_tokens(self.ls, self.doc)
+        delta = get_semantic_tokens_delta(self.ls, self.doc, tokens.result_id)
+        self.assertEqual(delta.edits, [])
+        self.assertEqual(delta.result_id, tokens.result_id)
+
+    def test_delta_unknown_result(self):
+        delta = get_semantic_tokens_delta(self.ls, self.doc, "unknown")
+        self.assertEqual(len(delta.data), 300)
+
+    def test_diff_tokens(self):
+        old = [0, 0, 3, 1, 0, 1, 4, 5, 2, 0, 2, 0, 1, 3, 0]
+        for new in (
+            [0, 0, 3, 1, 0, 1, 4, 6, 2, 0, 2, 0, 1, 3, 0],
+            [0, 0, 3, 1, 0, 2, 0, 1, 3, 0],
+            old + [0, 2, 4, 1, 0],
+            [],
+            old,
+        ):
+            self.assertEqual(apply_edits(old, diff_tokens(old, new)), new)
+        self.assertEqual(diff_tokens(old, old), [])
+
+    def test_encode_tokens(self):
+        rng = random.Random(7)
+        tokens = [
+            [rng.randrange(50), rng.randrange(40), rng.randrange(1, 20), i % 7, i % 3]
+            for i in range(2000)
+        ]
+        expected = flatten_chunks(
+            sort_chunks_relative_to_previous([list(i) for i in tokens])
+        )
+        self.assertEqual(encode_tokens(tokens), expected)
+        self.assertEqual(encode_tokens(tuple(i) for i in tokens), expected)
+        self.assertEqual(encode_tokens([]), [])
+        self.assertEqual(encode_tokens([(3, 4, 5, 1, 0)]), [3, 4, 5, 1, 0])
+
+    def test_encode_negative_tokens(self):
+        tokens = [[2, 0, 3, 1, 0], [0, -1, 3, 1, 0], [2, -4, 1, 0, 0], [-1, 5, 2, 0, 1]]
+        expected = flatten_chunks(
+            sort_chunks_relative_to_previous([list(i) for i in tokens])
+        )
+        self.assertEqual(encode_tokens(tokens), expected)
+        self.assertEqual(
+            encode_tokens([[0, -1, 3, 1, 0], [2, 0, 3, 1, 0]]),
+            [0, -1, 3, 1, 0, 2, 0, 3, 1, 0],
+        )
+
+    def test_range(self):
+        all_tokens = get_snapshot(self.ls, self.doc).sorted_tokens
+        visible = [i for i in all_tokens if 10 <= i[0] <= 20]
+        tokens = get_semantic_tokens_range(
+            self.ls,
+            self.doc,
+            Range(start=Position(line=10, character=0), end=Position(20, 0)),
+        )
+        self.assertEqual(
+            tokens.data, flatten_chunks(sort_chunks_relative_to_previous(visible))
+        )
+        self.assertEqual(tokens.data[0], visible[0][0])
@@ -20,4 +20,4 @@ class TestValidate(unittest.TestCase):
         semantic_tokens = semantic_tokens_full(self.ls, mock_params)
         print(semantic_tokens.data)
         self.assertIsNotNone(semantic_tokens)
-        self.assertEqual(len(semantic_tokens.data), 890)
+        self.assertEqual(len(semantic_tokens.data), 300)
@@ -0,0 +1,71 @@
+import sys
+import os
+import unittest
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.symbols import fill_workspace  # noqa: E402
+from common.utils import (  # noqa: E402
+    extract_current_doc_symbols,
+    get_all_symbols,
+    get_snapshot,
+    prepare_snapshot,
+)
+
+
+class TestDocumentSnapshot(unittest.TestCase):
+    ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+    fill_workspace(ls)
+    doc = ls.workspace.get_text_document(
+        "file://bundled/tool/tests/fixtures/circle.jac"
+    )
+
+    def test_tokens_match_symbols(self):
+        expected = []
+        for sym in extract_current_doc_symbols(self.ls, self.doc, True, True):
+            # repeated uses give a single token
+            if sym.doc_uri == self.doc.uri and sym.semantic_token not in expected:
+                expected.append(sym.semantic_token)
+        tokens = get_snapshot(self.ls, self.doc).tokens
+        self.assertEqual([list(i) for i in tokens], expected)
+
+    def test_unique_records(self):
+        records = get_snapshot(self.ls, self.doc).records
+        keys = {(r.doc_uri, r.range, r.kind) for r in records}
+        self.assertEqual(len(keys), len(records))
+        self.assertLess(
+            len(records),
+            len(
+                [
+                    i
+                    for i in get_all_symbols(self.ls, self.doc, True, True)
+                    if i.doc_uri == self.doc.uri
+                ]
+            ),
+        )
+
+    def test_build_in_executor(self):
+        self.doc.snapshot = None
+        prepare_snapshot(self.ls, self.doc)
+        snapshot = self.doc.snapshot
+        # requests wait for the build instead of starting another one
+        self.assertGreater(len(snapshot.records), 0)
+        self.assertIs(get_snapshot(self.ls, self.doc), snapshot)
+
+    def test_records(self):
+        snapshot = get_snapshot(self.ls, self.doc)
+        record = snapshot.records[0]
+        self.assertEqual(record.location, record.symbol.location)
+        self.assertEqual(record.kind, record.symbol.sym_info.kind)
+        with self.assertRaises(AttributeError):
+            record.name = "other"
+        with self.assertRaises(AttributeError):
+            record.extra = 1
+
+    def test_outline(self):
+        outline = get_snapshot(self.ls, self.doc).outline
+        self.assertEqual(
+            outline, [s.doc_sym for s in self.doc.symbols if not s.do_skip]
+        )
+        self.assertIs(get_snapshot(self.ls, self.doc).outline, outline)
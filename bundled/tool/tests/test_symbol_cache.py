@@ -0,0 +1,75 @@
+import sys
+import os
+import unittest
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.symbol_cache import SymbolCache  # noqa: E402
+from common.symbols import fill_workspace, update_doc_tree  # noqa: E402
+from common.utils import (  # noqa: E402
+    extract_current_doc_symbols,
+    get_all_symbols,
+    iter_all_symbols,
+)
+
+
+class TestSymbolCache(unittest.TestCase):
+    def test_versions(self):
+        cache = SymbolCache()
+        symbols = []
+        self.assertEqual(cache.get("a", "all", (1, symbols), lambda: [1]), [1])
+        self.assertEqual(cache.get("a", "all", (1, symbols), lambda: [2]), [1])
+        self.assertEqual(cache.get("a", "all", (2, symbols), lambda: [3]), [3])
+        self.assertEqual(cache.get("a", "all", (2, []), lambda: [4]), [4])
+        self.assertEqual(cache.stats, {"entries": 1, "hits": 1, "misses": 3})
+
+    def test_lru(self):
+        cache = SymbolCache(max_entries=2)
+        cache.get("a", "all", (0,), lambda: "a")
+        cache.get("b", "all", (0,), lambda: "b")
+        cache.get("a", "all", (0,), lambda: "a2")
+        cache.get("c", "all", (0,), lambda: "c")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a", "all", (0,), lambda: "a3"), "a")
+        self.assertEqual(cache.get("b", "all", (0,), lambda: "b2"), "b2")
+
+    def test_invalidate(self):
+        cache = SymbolCache()
+        cache.get("a", "all", (0,), lambda: "a")
+        cache.get("a", "names", (0,), lambda: "names")
+        cache.get("b", "all", (0,), lambda: "b")
+        cache.invalidate("a")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("a", "all", (0,), lambda: "a2"), "a2")
+
+
+class TestSymbolLists(unittest.TestCase):
+    ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+    fill_workspace(ls)
+    doc = ls.workspace.get_text_document(
+        "file://bundled/tool/tests/fixtures/circle.jac"
+    )
+
+    def test_memoized(self):
+        symbols = get_all_symbols(self.ls, self.doc, True, True)
+        self.assertIs(get_all_symbols(self.ls, self.doc, True, True), symbols)
+        self.assertEqual(
+            [repr(i) for i in symbols],
+            [repr(i) for i in iter_all_symbols(self.ls, self.doc, True, True)],
+        )
+        current = extract_current_doc_symbols(self.ls, self.doc)
+        self.assertIs(extract_current_doc_symbols(self.ls, self.doc), current)
+        self.assertTrue(all(i.node_origin_file == self.doc.uri for i in current))
+
+    def test_rebuild(self):
+        symbols = get_all_symbols(self.ls, self.doc)
+        update_doc_tree(self.ls, self.doc.uri)
+        rebuilt = get_all_symbols(self.ls, self.doc)
+        self.assertIsNot(rebuilt, symbols)
+        self.assertEqual(len(rebuilt), len(symbols))
+
+    def test_version(self):
+        symbols = get_all_symbols(self.ls, self.doc)
+        self.doc.version += 1
+        self.assertIsNot(get_all_symbols(self.ls, self.doc), symbols)
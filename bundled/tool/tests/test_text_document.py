@@ -0,0 +1,98 @@
+import sys
+import os
+import random
+import unittest
+
+from lsprotocol import types as lsp
+from pygls.workspace import TextDocument
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.text_document import (  # noqa: E402
+    BufferedTextDocument,
+    BufferedWorkspace,
+    LineBuffer,
+    LineChange,
+)
+
+URI = "file:///tmp/main.jac"
+
+
+def change(start, end, text):
+    return lsp.TextDocumentContentChangeEvent_Type1(
+        range=lsp.Range(start=lsp.Position(*start), end=lsp.Position(*end)), text=text
+    )
+
+
+class TestLineBuffer(unittest.TestCase):
+    def test_lines(self):
+        buffer = LineBuffer("walker a {\r\n  can b;\n}")
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.line(0), "walker a {")
+        self.assertEqual(buffer.line(2), "}")
+        self.assertEqual(buffer.line(3), "")
+        self.assertEqual(buffer.line_start(1), 12)
+        self.assertEqual(
+            [buffer.line_at(i) for i in (0, 11, 12, 20, 21, 99)], [0, 0, 1, 1, 2, 2]
+        )
+
+    def test_replace(self):
+        buffer = LineBuffer("a\nb\nc\n")
+        self.assertEqual(buffer.replace(1, 0, 1, 1, "x\ny"), LineChange(1, 2, 3))
+        self.assertEqual(buffer.text, "a\nx\ny\nc\n")
+        # deleting a line break joins the next line
+        self.assertEqual(buffer.replace(0, 1, 1, 0, ""), LineChange(0, 2, 1))
+        self.assertEqual(buffer.text, "ax\ny\nc\n")
+        self.assertEqual(buffer.replace(9, 0, 9, 0, "d"), LineChange(3, 3, 4))
+        self.assertEqual(buffer.text, "ax\ny\nc\nd")
+
+    def test_random_edits(self):
+        rng = random.Random(3)
+        pieces = ["a", "bc", "\n", "\r\n", "\r", "é", "😀", "", "walker x {\n"]
+        for _ in range(20):
+            text = "".join(rng.choice(pieces) for _ in range(30))
+            expected = TextDocument(URI, text)
+            document = BufferedTextDocument(URI, text)
+            for _ in range(30):
+                lines = expected.lines
+                start_line = rng.randrange(len(lines) + 1)
+                end_line = rng.randrange(start_line, len(lines) + 1)
+                start = (start_line, rng.randrange(5))
+                end = (
+                    (end_line, rng.randrange(5))
+                    if end_line > start_line
+                    else (
+                        start_line,
+                        start[1] + rng.randrange(3),
+                    )
+                )
+                edit = change(start, end, "".join(rng.choice(pieces) for _ in range(3)))
+                expected.apply_change(edit)
+                document.apply_change(edit)
+                self.assertEqual(document.source, expected.source)
+                self.assertEqual(document.lines, expected.lines)
+
+
+class TestBufferedWorkspace(unittest.TestCase):
+    def test_line_changes(self):
+        workspace = BufferedWorkspace(None)
+        workspace.put_text_document(
+            lsp.TextDocumentItem(
+                uri=URI, language_id="jac", version=1, text="ab\ncd\nef\n"
+            )
+        )
+        document = workspace.get_text_document(URI)
+        self.assertIsInstance(document, BufferedTextDocument)
+        version = lsp.VersionedTextDocumentIdentifier(uri=URI, version=2)
+        workspace.update_text_document(version, change((0, 1), (1, 1), "X"))
+        workspace.update_text_document(version, change((1, 0), (1, 0), "g\n"))
+        self.assertEqual(document.source, "aXd\ng\nef\n")
+        self.assertEqual(
+            document.line_changes, [LineChange(0, 2, 1), LineChange(1, 2, 3)]
+        )
+        workspace.update_text_document(
+            lsp.VersionedTextDocumentIdentifier(uri=URI, version=3),
+            lsp.TextDocumentContentChangeEvent_Type2(text="x\n"),
+        )
+        self.assertEqual(document.line_changes, [LineChange(0, 3, 1)])
+        self.assertEqual(document.line(0), "x")
+        self.assertEqual(document.version, 3)
@@ -0,0 +1,77 @@
+import asyncio
+import sys
+import os
+import unittest
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.symbols import fill_workspace, rebuild_modules, remove_modules  # noqa: E402
+from common.parallel import compile_source  # noqa: E402
+from common.validation import install_module  # noqa: E402
+
+CIRCLE = "bundled/tool/tests/fixtures/circle.jac"
+
+
+class TestDefUseIndex(unittest.TestCase):
+    def setUp(self):
+        self.ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        fill_workspace(self.ls)
+
+    def scan_uses(self, link):
+        return [
+            x
+            for mod_url in self.ls.jlws.modules
+            for x in self.ls.jlws.get_uses(mod_url)
+            if getattr(x, "sym_link", None) is link
+        ]
+
+    def assert_indexed(self, path):
+        indexed = [
+            node
+            for by_module in self.ls.use_index.uses.values()
+            for node in by_module.get(path, [])
+        ]
+        expected = [
+            x
+            for x in self.ls.jlws.get_uses(path)
+            if getattr(x, "sym_link", None) is not None
+        ]
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(len(indexed), len(expected))
+        self.assertTrue(all(any(i is j for j in expected) for i in indexed))
+
+    def test_matches_workspace_scan(self):
+        doc = self.ls.workspace.get_text_document(
+            "file://bundled/tool/tests/fixtures/circle.jac"
+        )
+        checked = 0
+        for sym in doc.symbols:
+            expected = self.scan_uses(sym.ws_symbol)
+            found = [s.node for s in sym.uses(self.ls)]
+            self.assertEqual(len(found), len(expected))
+            self.assertTrue(all(any(i is j for j in expected) for i in found))
+            checked += len(found)
+        self.assertGreater(checked, 0)
+
+    def test_remove_module(self):
+        path = "bundled/tool/tests/fixtures/circle.jac"
+        self.assertIn(path, self.ls.use_index.modules)
+        remove_modules(self.ls, [path])
+        self.assertNotIn(path, self.ls.use_index.modules)
+        self.assertFalse(
+            any(path in by_module for by_module in self.ls.use_index.uses.values())
+        )
+
+    def test_replaced_modules(self):
+        # modules installed without a document tree update, e.g. saved with
+        # errors, are indexed from their new IR
+        old = self.ls.jlws.modules[CIRCLE]
+        install_module(self.ls, CIRCLE, compile_source(CIRCLE, "", False))
+        self.assertIsNot(self.ls.jlws.modules[CIRCLE], old)
+        self.assert_indexed(CIRCLE)
+
+        old = self.ls.jlws.modules[CIRCLE]
+        asyncio.run(rebuild_modules(self.ls, [CIRCLE]))
+        self.assertIsNot(self.ls.jlws.modules[CIRCLE], old)
+        self.assert_indexed(CIRCLE)
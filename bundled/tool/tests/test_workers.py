@@ -0,0 +1,95 @@
+import sys
+import os
+import threading
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.parallel import compile_source, parse_source  # noqa: E402
+from common.workers import (  # noqa: E402
+    WorkerCrashedError,
+    WorkerPool,
+    WorkerTimeoutError,
+)
+
+CIRCLE = "bundled/tool/tests/fixtures/circle.jac"
+
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(1, max_jobs=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_compile(self):
+        module = self.pool.run(compile_source, CIRCLE, "", False)
+        self.assertEqual(module.errors, [])
+        self.assertGreater(len(module.ir.sym_tab.kid), 0)
+
+        errors, _ = self.pool.run(parse_source, "bad.jac", "with entry { x = ; }")
+        self.assertGreater(len(errors), 0)
+        self.assertGreaterEqual(errors[0].loc.first_line, 1)
+
+    def test_recycle(self):
+        pids = [self.pool.run(os.getpid) for _ in range(3)]
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+        self.assertEqual(self.pool.recycled, 1)
+
+    def test_crash(self):
+        with self.assertRaises(WorkerCrashedError):
+            self.pool.run(os._exit, 1)
+        self.assertEqual(self.pool.crashes, 1)
+        # the next job gets a fresh worker
+        self.assertNotEqual(self.pool.run(os.getpid), os.getpid())
+
+    def test_timeout(self):
+        pool = WorkerPool(1, timeout=3)
+        try:
+            start = time.perf_counter()
+            with self.assertRaises(WorkerTimeoutError):
+                pool.run(time.sleep, 30)
+            self.assertLess(time.perf_counter() - start, 10)
+            self.assertEqual(pool.timeouts, 1)
+            self.assertNotEqual(pool.run(os.getpid), os.getpid())
+        finally:
+            pool.shutdown()
+
+    def test_recycle_rss(self):
+        pool = WorkerPool(1, max_rss_mb=1)
+        try:
+            pids = [pool.run(os.getpid) for _ in range(2)]
+            self.assertNotEqual(pids[0], pids[1])
+            self.assertEqual(pool.recycled, 2)
+        finally:
+            pool.shutdown()
+
+    @unittest.skipIf(sys.platform != "linux", "RLIMIT_AS is only enforced on Linux")
+    def test_address_space_limit(self):
+        pool = WorkerPool(1, max_address_space_mb=1024)
+        try:
+            pid = pool.run(os.getpid)
+            # the allocation fails in the worker instead of growing without bound
+            with self.assertRaises(RuntimeError) as e:
+                pool.run(bytearray, 2 * 1024**3)
+            self.assertIn("MemoryError", str(e.exception))
+            self.assertEqual(pool.recycled, 1)
+            # the worker that ran out of memory was replaced
+            self.assertNotEqual(pool.run(os.getpid), pid)
+        finally:
+            pool.shutdown()
+
+    def test_shutdown_drains(self):
+        results = []
+        job = threading.Thread(
+            target=lambda: results.append(self.pool.run(time.sleep, 1))
+        )
+        job.start()
+        time.sleep(0.5)
+        # the running job completes, its worker stops afterwards
+        self.pool.shutdown()
+        job.join()
+        self.assertEqual(results, [None])
+        self.assertEqual(self.pool.crashes, 0)
+        self.assertFalse(any(i.is_alive() for i in self.pool._workers))
@@ -0,0 +1,149 @@
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from mocks import MockLanguageServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lsp_server import workspace_symbol  # noqa: E402
+from common.symbols import fill_workspace, remove_modules  # noqa: E402
+from common.workspace_symbols import (  # noqa: E402
+    PrefixIndex,
+    SymbolEntry,
+    WorkspaceSymbolIndex,
+)
+
+
+def names(entries):
+    return [entry.name for entry in entries]
+
+
+class TestWorkspaceSymbolIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = WorkspaceSymbolIndex()
+        self.index.set_module(
+            "a.jac",
+            [
+                SimpleNamespace(sym_name=name)
+                for name in (
+                    "get_symbol_at_pos",
+                    "GetSymbolAtPos",
+                    "symbol",
+                    "symbols",
+                    "target_symbol",
+                    "misbehaving",
+                    "Area",
+                )
+            ],
+        )
+
+    def test_ranking(self):
+        entries, incomplete = self.index.search("symbol")
+        self.assertEqual(
+            names(entries),
+            [
+                "symbol",
+                "symbols",
+                "target_symbol",
+                "GetSymbolAtPos",
+                "get_symbol_at_pos",
+            ],
+        )
+        self.assertFalse(incomplete)
+
+    def test_humps_and_subsequence(self):
+        entries, _ = self.index.search("gsap")
+        self.assertEqual(names(entries), ["GetSymbolAtPos", "get_symbol_at_pos"])
+        entries, _ = self.index.search("MHG")
+        self.assertEqual(names(entries), ["misbehaving"])
+        self.assertEqual(self.index.search("xyz"), ([], False))
+
+    def test_limit(self):
+        entries, incomplete = self.index.search("s", 2)
+        self.assertEqual(len(entries), 2)
+        self.assertTrue(incomplete)
+        self.assertEqual(len(self.index.search("")[0]), 7)
+
+    def test_update(self):
+        self.index.set_module("a.jac", [SimpleNamespace(sym_name="Area")])
+        self.index.set_module("b.jac", [SimpleNamespace(sym_name="area")])
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.search("symbol"), ([], False))
+        self.index.remove_module("a.jac")
+        entries, _ = self.index.search("are")
+        self.assertEqual([i.module for i in entries], ["b.jac"])
+
+
+class TestPrefixIndex(unittest.TestCase):
+    index = PrefixIndex(
+        SymbolEntry(module, SimpleNamespace(sym_name=name))
+        for module, name in (
+            ("a.jac", "get_symbol_at_pos"),
+            ("a.jac", "GetSymbol"),
+            ("b.jac", "getter"),
+            ("b.jac", "get_symbol_at_pos"),
+            ("b.jac", "Gsa"),
+        )
+    )
+
+    def test_prefix(self):
+        entries, incomplete = self.index.search("GET")
+        self.assertEqual(names(entries), ["get_symbol_at_pos", "GetSymbol", "getter"])
+        self.assertFalse(incomplete)
+
+    def test_humps(self):
+        entries, _ = self.index.search("gsa")
+        self.assertEqual(names(entries), ["Gsa", "get_symbol_at_pos"])
+        self.assertEqual(
+            names(self.index.search("gs")[0]),
+            ["Gsa", "GetSymbol", "get_symbol_at_pos"],
+        )
+
+    def test_limit(self):
+        entries, incomplete = self.index.search("g", 2)
+        self.assertEqual(len(entries), 2)
+        self.assertTrue(incomplete)
+        self.assertEqual(len(self.index.search("")[0]), 4)
+
+    def test_workspace(self):
+        index = WorkspaceSymbolIndex()
+        index.set_module("a.jac", [SimpleNamespace(sym_name="Area")])
+        prefix_index = index.prefix_index
+        self.assertIs(index.prefix_index, prefix_index)
+        index.set_module("b.jac", [SimpleNamespace(sym_name="area_of")])
+        self.assertEqual(names(index.prefix_index.search("ar")[0]), ["Area", "area_of"])
+
+
+class TestWorkspaceSymbol(unittest.TestCase):
+    ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+    fill_workspace(ls)
+
+    def search(self, query):
+        params = MagicMock()
+        params.query = query
+        return workspace_symbol(self.ls, params)
+
+    def test_query(self):
+        symbols = self.search("circ")
+        self.assertEqual(symbols[0].name, "Circle")
+        self.assertTrue(all("c" in i.name.lower() for i in symbols))
+        self.assertTrue(symbols[0].location.uri.endswith("circle.jac"))
+
+    def test_limit(self):
+        settings = self.ls.settings
+        self.ls.settings = {**settings, "workspaceSymbolLimit": 2}
+        try:
+            self.assertEqual(len(self.search("")), 2)
+        finally:
+            self.ls.settings = settings
+        self.assertGreater(len(self.search("")), 2)
+
+    def test_removed_module(self):
+        ls = MockLanguageServer(root_path="bundled/tool/tests/fixtures")
+        fill_workspace(ls)
+        module = next(i for i in ls.jlws.modules if i.endswith("circle.jac"))
+        self.assertIn(module, ls.symbol_index.modules)
+        remove_modules(ls, [module])
+        self.assertNotIn(module, ls.symbol_index.modules)
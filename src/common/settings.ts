@@ -21,6 +21,15 @@ export interface ISettings {
     reportingScope: string;
     showWarning: boolean;
     typeCheck: boolean;
+    analysisCache: boolean;
+    compileWorkers: number;
+    indexingMode: string;
+    changeValidation: string;
+    semanticIdleDelay: number;
+    typeCheckIdleDelay: number;
+    maxWorkers: number;
+    isolatedCompiles: boolean;
+    workspaceSymbolLimit: number;
 }
 
 export function getExtensionSettings(namespace: string, includeInterpreter?: boolean): Promise<ISettings[]> {
@@ -106,6 +115,15 @@ export async function getWorkspaceSettings(
         reportingScope: config.get<string>('reportingScope', 'file'),
         showWarning: config.get<boolean>('showWarning', true),
         typeCheck: config.get<boolean>('typeCheck', false),
+        analysisCache: config.get<boolean>('analysisCache', true),
+        compileWorkers: config.get<number>('compileWorkers', 0),
+        indexingMode: config.get<string>('indexingMode', 'eager'),
+        changeValidation: config.get<string>('changeValidation', 'semantic'),
+        semanticIdleDelay: config.get<number>('semanticIdleDelay', 3),
+        typeCheckIdleDelay: config.get<number>('typeCheckIdleDelay', 10),
+        maxWorkers: config.get<number>('maxWorkers', 5),
+        isolatedCompiles: config.get<boolean>('isolatedCompiles', false),
+        workspaceSymbolLimit: config.get<number>('workspaceSymbolLimit', 200),
     };
     return workspaceSetting;
 }
@@ -136,6 +154,15 @@ export async function getGlobalSettings(namespace: string, includeInterpreter?:
         reportingScope: config.get<string>('reportingScope', 'file'),
         showWarning: getGlobalValue<boolean>(config, 'showWarning', true),
         typeCheck: getGlobalValue<boolean>(config, 'typeCheck', false),
+        analysisCache: getGlobalValue<boolean>(config, 'analysisCache', true),
+        compileWorkers: getGlobalValue<number>(config, 'compileWorkers', 0),
+        indexingMode: getGlobalValue<string>(config, 'indexingMode', 'eager'),
+        changeValidation: getGlobalValue<string>(config, 'changeValidation', 'semantic'),
+        semanticIdleDelay: getGlobalValue<number>(config, 'semanticIdleDelay', 3),
+        typeCheckIdleDelay: getGlobalValue<number>(config, 'typeCheckIdleDelay', 10),
+        maxWorkers: getGlobalValue<number>(config, 'maxWorkers', 5),
+        isolatedCompiles: getGlobalValue<boolean>(config, 'isolatedCompiles', false),
+        workspaceSymbolLimit: getGlobalValue<number>(config, 'workspaceSymbolLimit', 200),
     };
     return setting;
 }
@@ -149,6 +176,15 @@ export function checkIfConfigurationChanged(e: ConfigurationChangeEvent, namespa
         `${namespace}.reportingScope`,
         `${namespace}.showWarning`,
         `${namespace}.typeCheck`,
+        `${namespace}.analysisCache`,
+        `${namespace}.compileWorkers`,
+        `${namespace}.indexingMode`,
+        `${namespace}.changeValidation`,
+        `${namespace}.semanticIdleDelay`,
+        `${namespace}.typeCheckIdleDelay`,
+        `${namespace}.maxWorkers`,
+        `${namespace}.isolatedCompiles`,
+        `${namespace}.workspaceSymbolLimit`,
     ];
     const changed = settings.map((s) => e.affectsConfiguration(s));
     return changed.includes(true);